@@ -0,0 +1,177 @@
+import argparse
+import json
+import sys
+from statistics import median
+from benchmarks.run import parser as suite_parser, run_suite
+from benchmarks.stats import mann_whitney_u
+
+
+def key(result):
+    return (result["benchmark"], result["backend"], result["size"])
+
+
+def collect(suite_args, runs, quiet=False):
+    """
+    Ejecuta la suite `runs` veces y agrupa por benchmark/backend/tamaño las
+    muestras de todas las ejecuciones, la mediana de cada una y su pico de
+    memoria. Repetir en procesos distintos captura también el ruido entre
+    ejecuciones, no solo el de una misma ejecución.
+    """
+    merged = {}
+    meta = None
+    for run in range(runs):
+        if not quiet:
+            print(f"Ejecución {run + 1}/{runs}", file=sys.stderr)
+        report = run_suite(suite_args)
+        meta = report["meta"]
+        for r in report["results"]:
+            entry = merged.setdefault(key(r), {"benchmark": r["benchmark"], "backend": r["backend"],
+                                               "size": r["size"], "samples_ms": [], "run_p50_ms": [],
+                                               "peak_memory_kb": [], "ops_per_sec": []})
+            entry["samples_ms"] += r["samples_ms"]
+            entry["run_p50_ms"].append(r["p50_ms"])
+            entry["peak_memory_kb"].append(r["peak_memory_kb"])
+            entry["ops_per_sec"].append(r["ops_per_sec"])
+    return {"meta": meta, "runs": runs, "results": list(merged.values())}
+
+
+def _values(value):
+    # Las mediciones de collect guardan una lista por ejecución; la salida de
+    # benchmarks.run, un solo número
+    return value if isinstance(value, list) else [value]
+
+
+def compare(baseline, current, alpha=0.01, threshold=0.10, memory_threshold=0.10, memory_floor_kb=64):
+    """
+    Un benchmark es regresión si su latencia mediana empeora más que
+    `threshold` y la diferencia es significativa según Mann-Whitney
+    (p < alpha). Exigir ambas cosas evita fallar por diferencias reales
+    pero irrelevantes o por ruido. La memoria es casi determinista: basta
+    con superar `memory_threshold` y `memory_floor_kb`.
+    """
+    previous = {key(r): r for r in baseline["results"]}
+    rows = []
+    for r in current["results"]:
+        base = previous.get(key(r))
+        if base is None:
+            rows.append({"benchmark": r["benchmark"], "backend": r["backend"], "size": r["size"],
+                         "status": "NEW"})
+            continue
+        base_ms, cur_ms = median(base["samples_ms"]), median(r["samples_ms"])
+        delta = (cur_ms - base_ms) / base_ms if base_ms else 0.0
+        _, p = mann_whitney_u(base["samples_ms"], r["samples_ms"])
+        base_mem, cur_mem = median(_values(base["peak_memory_kb"])), median(_values(r["peak_memory_kb"]))
+        mem_delta = (cur_mem - base_mem) / base_mem if base_mem else 0.0
+
+        reasons = []
+        if p < alpha and delta > threshold:
+            reasons.append("latencia")
+        if mem_delta > memory_threshold and cur_mem - base_mem > memory_floor_kb:
+            reasons.append("memoria")
+        if reasons:
+            status = "FAIL"
+        elif p < alpha and delta < -threshold:
+            status = "FASTER"
+        else:
+            status = "PASS"
+        rows.append({"benchmark": r["benchmark"], "backend": r["backend"], "size": r["size"],
+                     "status": status, "reasons": reasons, "baseline_p50_ms": base_ms,
+                     "current_p50_ms": cur_ms, "delta": delta, "p_value": p,
+                     "baseline_memory_kb": base_mem, "current_memory_kb": cur_mem, "memory_delta": mem_delta})
+    missing = set(previous) - {key(r) for r in current["results"]}
+    for k in sorted(missing):
+        rows.append({"benchmark": k[0], "backend": k[1], "size": k[2], "status": "MISSING"})
+    return rows
+
+
+def failures(rows, allow_missing=False):
+    # Un benchmark que desaparece cuenta como fallo: si no, basta con quitarlo para pasar
+    failing = ("FAIL",) if allow_missing else ("FAIL", "MISSING")
+    return sum(1 for row in rows if row["status"] in failing)
+
+
+def print_report(rows, allow_missing=False):
+    print(f"{'benchmark':<26}{'backend':<10}{'size':>9}{'base ms':>11}{'actual ms':>11}{'delta':>9}"
+          f"{'p':>9}{'mem':>9}  estado")
+    for row in rows:
+        if "delta" not in row:
+            print(f"{row['benchmark']:<26}{row['backend']:<10}{row['size']:>9}{'':>58}  {row['status']}")
+            continue
+        status = row["status"] + (f" ({', '.join(row['reasons'])})" if row["reasons"] else "")
+        print(f"{row['benchmark']:<26}{row['backend']:<10}{row['size']:>9}{row['baseline_p50_ms']:>11.3f}"
+              f"{row['current_p50_ms']:>11.3f}{row['delta']:>+9.1%}{row['p_value']:>9.4f}"
+              f"{row['memory_delta']:>+9.1%}  {status}")
+    failed = failures(rows, allow_missing)
+    print(f"\n{'FALLÓ' if failed else 'OK'}: {failed} regresiones o benchmarks faltantes en {len(rows)} benchmarks")
+
+
+def suite_args(options):
+    # Argumentos de la suite guardados junto al baseline para repetirla igual
+    argv = ["--sizes", *map(str, options["sizes"]), "--backends", *options["backends"],
+            "--seed", str(options["seed"]), "--min-time", str(options["min_time"]),
+            "--min-ops", str(options["min_ops"]), "--max-ops", str(options["max_ops"]), "--quiet"]
+    if options.get("only"):
+        argv += ["--only", *options["only"]]
+    return suite_parser().parse_args(argv)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compara benchmarks contra un baseline y falla si hay regresiones")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    record = sub.add_parser("baseline", help="Ejecuta la suite y guarda el baseline")
+    record.add_argument("--output", default="benchmarks/baseline.json")
+    record.add_argument("--runs", type=int, default=3)
+    record.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    record.add_argument("--backends", nargs="+", default=["json"])
+    record.add_argument("--only", nargs="+")
+    record.add_argument("--seed", type=int, default=0)
+    record.add_argument("--min-time", type=float, default=1.0)
+    record.add_argument("--min-ops", type=int, default=3)
+    record.add_argument("--max-ops", type=int, default=1000)
+
+    check = sub.add_parser("check", help="Vuelve a ejecutar la suite y la compara con el baseline")
+    check.add_argument("--baseline", default="benchmarks/baseline.json")
+    check.add_argument("--current", help="Resultados ya medidos (por defecto se ejecuta la suite)")
+    check.add_argument("--save-current", help="Guarda las mediciones actuales en este archivo")
+    check.add_argument("--runs", type=int, help="Por defecto, las mismas que el baseline")
+    check.add_argument("--alpha", type=float, default=0.01, help="Nivel de significancia")
+    check.add_argument("--threshold", type=float, default=0.10, help="Empeoramiento mínimo de latencia (0.10 = 10%%)")
+    check.add_argument("--memory-threshold", type=float, default=0.10)
+    check.add_argument("--allow-missing", action="store_true",
+                       help="No falla si faltan benchmarks del baseline (p. ej. al ejecutar solo algunos)")
+    check.add_argument("--report", help="Escribe el reporte en JSON")
+    args = parser.parse_args()
+
+    if args.command == "baseline":
+        options = {name: getattr(args, name) for name in
+                   ("sizes", "backends", "only", "seed", "min_time", "min_ops", "max_ops")}
+        data = collect(suite_args(options), args.runs)
+        data["options"] = options
+        with open(args.output, "w") as f:
+            json.dump(data, f, indent=2)
+        print(f"Baseline guardado en {args.output}")
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)
+    if args.current:
+        with open(args.current) as f:
+            current = json.load(f)
+    else:
+        current = collect(suite_args(baseline["options"]), args.runs or baseline["runs"])
+        current["options"] = baseline["options"]
+    if args.save_current:
+        with open(args.save_current, "w") as f:
+            json.dump(current, f, indent=2)
+
+    rows = compare(baseline, current, args.alpha, args.threshold, args.memory_threshold)
+    print_report(rows, args.allow_missing)
+    if args.report:
+        with open(args.report, "w") as f:
+            json.dump({"baseline": baseline["meta"], "current": current["meta"], "results": rows}, f, indent=2)
+    sys.exit(1 if failures(rows, args.allow_missing) else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import argparse
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_isolated(backend, size, args):
+    """
+    Ejecuta una configuración en un proceso nuevo y en un directorio temporal:
+    cada tamaño parte de datos limpios, sin singletons ni cachés de otra
+    ejecución, y el pico de memoria del proceso corresponde solo a ella.
+    """
+    command = [sys.executable, "-m", "benchmarks.run", "--worker", "--backends", backend,
+               "--sizes", str(size), "--seed", str(args.seed), "--min-time", str(args.min_time),
+               "--min-ops", str(args.min_ops), "--max-ops", str(args.max_ops)]
+    if args.only:
+        command += ["--only", *args.only]
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    with tempfile.TemporaryDirectory(prefix="bench-") as folder:
+        done = subprocess.run(command, cwd=folder, env=env, capture_output=True, text=True)
+    if done.returncode != 0:
+        raise RuntimeError(f"Falló {backend}/{size}:\n{done.stderr}")
+    return json.loads(done.stdout)
+
+
+def worker(args):
+    from benchmarks.suite import run_config
+    config = run_config(args.backends[0], args.sizes[0], args.only, args.seed,
+                        args.min_time, args.min_ops, args.max_ops)
+    # ru_maxrss está en KB en Linux y en bytes en macOS
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    config["max_rss_kb"] = maxrss / 1024 if sys.platform == "darwin" else maxrss
+    json.dump(config, sys.stdout)
+
+
+def run_suite(args):
+    configs = []
+    for backend in args.backends:
+        for size in args.sizes:
+            start = time.perf_counter()
+            config = run_isolated(backend, size, args)
+            configs.append(config)
+            if not args.quiet:
+                print(f"{backend} {size}: {time.perf_counter() - start:.1f}s", file=sys.stderr)
+    return {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": args.seed,
+        },
+        "configs": configs,
+        "results": [r for config in configs for r in config["results"]],
+    }
+
+
+def print_table(report):
+    width = max([10] + [len(r["backend"]) + 2 for r in report["results"]])
+    print(f"{'benchmark':<26}{'backend':<{width}}{'size':>9}{'ops/s':>12}{'p50 ms':>10}{'p95 ms':>10}"
+          f"{'p99 ms':>10}{'peak KB':>11}")
+    for r in report["results"]:
+        print(f"{r['benchmark']:<26}{r['backend']:<{width}}{r['size']:>9}{r['ops_per_sec']:>12.1f}"
+              f"{r['p50_ms']:>10.3f}{r['p95_ms']:>10.3f}{r['p99_ms']:>10.3f}{r['peak_memory_kb']:>11.1f}")
+
+
+def parser():
+    from benchmarks.suite import BACKENDS, BENCHMARKS
+    p = argparse.ArgumentParser(description="Benchmarks de repositorios y servicios")
+    p.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000],
+                   help="Jugadores en el conjunto de datos (p. ej. 1000 10000 100000 1000000)")
+    p.add_argument("--backends", nargs="+", default=["json"], choices=sorted(BACKENDS))
+    p.add_argument("--only", nargs="+", choices=[name for name, _ in BENCHMARKS], help="Benchmarks a ejecutar")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--min-time", type=float, default=1.0, help="Segundos mínimos por benchmark")
+    p.add_argument("--min-ops", type=int, default=3)
+    p.add_argument("--max-ops", type=int, default=1000)
+    p.add_argument("--output", help="Archivo JSON de resultados (por defecto se imprime una tabla)")
+    p.add_argument("--quiet", action="store_true")
+    p.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    return p
+
+
+def main():
+    args = parser().parse_args()
+    if args.worker:
+        worker(args)
+        return
+    report = run_suite(args)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    print_table(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from benchmarks.run import ROOT
+
+# Se ejecuta en un proceso nuevo: mide importaciones, configuración (repositorios
+# y servicios del menú) y la primera consulta real
+SCRIPT = """
+import json, time
+t0 = time.perf_counter()
+from main import setup_repositories, MenuSystem
+from database.repository import RepositoryProvider
+t1 = time.perf_counter()
+setup_repositories(lazy={lazy}, warm_cache={warm})
+MenuSystem()
+t2 = time.perf_counter()
+RepositoryProvider.get("Player").find({player_id!r})
+t3 = time.perf_counter()
+print(json.dumps({{"import_s": t1 - t0, "setup_s": t2 - t1, "first_query_s": t3 - t2}}))
+"""
+
+MODES = {
+    "eager": {"lazy": False, "warm": False},
+    "lazy": {"lazy": True, "warm": False},
+    "lazy-warm": {"lazy": True, "warm": True},
+}
+
+
+def run_once(folder, mode, player_id):
+    code = SCRIPT.format(player_id=player_id, **MODES[mode])
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get("PYTHONPATH")])))
+    start = time.perf_counter()
+    done = subprocess.run([sys.executable, "-c", code], cwd=folder, env=env, capture_output=True, text=True)
+    total = time.perf_counter() - start
+    if done.returncode != 0:
+        raise RuntimeError(done.stderr)
+    result = json.loads(done.stdout.strip().splitlines()[-1])
+    result["total_s"] = total
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tiempo de arranque hasta la primera consulta por modo")
+    parser.add_argument("--size", type=int, default=100000, help="Jugadores en la liga sintética")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--modes", nargs="+", default=list(MODES), choices=list(MODES))
+    parser.add_argument("--output", help="Guarda los resultados en JSON")
+    args = parser.parse_args()
+
+    from benchmarks.suite import prepare, register_backend
+    with tempfile.TemporaryDirectory(prefix="startup-") as folder:
+        previous = os.getcwd()
+        os.chdir(folder)
+        try:
+            register_backend("json")
+            league = prepare(args.size)
+        finally:
+            os.chdir(previous)
+        player_id = league["Player"][len(league["Player"]) // 2].get_id()
+        del league
+
+        results = {}
+        for mode in args.modes:
+            cold = None
+            if MODES[mode]["warm"]:
+                # La primera ejecución genera la caché; se reporta aparte
+                for cache in (f for f in os.listdir(os.path.join(folder, "data")) if f.endswith(".cache")):
+                    os.remove(os.path.join(folder, "data", cache))
+                cold = run_once(folder, mode, player_id)
+            runs = [run_once(folder, mode, player_id) for _ in range(args.repeat)]
+            results[mode] = {key: statistics.median(r[key] for r in runs) for key in runs[0]}
+            if cold:
+                results[mode]["cold_total_s"] = cold["total_s"]
+
+    print(f"{'modo':<12}{'total ms':>11}{'import ms':>11}{'setup ms':>11}{'1ª consulta ms':>16}{'en frío ms':>12}")
+    for mode, r in results.items():
+        cold = f"{r['cold_total_s'] * 1000:>12.1f}" if "cold_total_s" in r else f"{'':>12}"
+        print(f"{mode:<12}{r['total_s'] * 1000:>11.1f}{r['import_s'] * 1000:>11.1f}{r['setup_s'] * 1000:>11.1f}"
+              f"{r['first_query_s'] * 1000:>16.1f}{cold}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"size": args.size, "repeat": args.repeat, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
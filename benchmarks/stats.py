@@ -0,0 +1,35 @@
+import math
+
+
+def mann_whitney_u(a, b):
+    """
+    Prueba U de Mann-Whitney de dos colas con aproximación normal,
+    corrección por empates y por continuidad. No asume normalidad, lo que
+    conviene a latencias con colas largas. Retorna (U de `a`, valor p).
+    """
+    n1, n2 = len(a), len(b)
+    if not n1 or not n2:
+        return 0.0, 1.0
+    values = sorted([(v, 0) for v in a] + [(v, 1) for v in b])
+    rank_a = 0.0
+    ties = 0.0
+    i = 0
+    while i < len(values):
+        j = i
+        while j < len(values) and values[j][0] == values[i][0]:
+            j += 1
+        # Rango promedio del grupo empatado (los rangos empiezan en 1)
+        rank = (i + j + 1) / 2
+        rank_a += rank * sum(1 for k in range(i, j) if values[k][1] == 0)
+        t = j - i
+        ties += t ** 3 - t
+        i = j
+    u = rank_a - n1 * (n1 + 1) / 2
+    n = n1 + n2
+    mean = n1 * n2 / 2
+    variance = n1 * n2 / 12 * ((n + 1) - ties / (n * (n - 1))) if n > 1 else 0.0
+    if variance <= 0:
+        return u, 1.0
+    z = (abs(u - mean) - 0.5) / math.sqrt(variance)
+    return u, min(1.0, math.erfc(max(z, 0.0) / math.sqrt(2)))
+
@@ -0,0 +1,61 @@
+import argparse
+import json
+import statistics
+import time
+from database.storage_codecs import CODEC_NAMES, decode, encode, get_codec
+from tools.generate_league import generate_league
+
+
+def records_for(size, seed=0):
+    # Registros tal como quedan en data/players.json para una liga de `size` jugadores
+    per_team = min(25, size)
+    league = generate_league(seed, teams=max(2, size // per_team), players_per_team=per_team,
+                             staff_per_team=2, rounds=2)
+    return [dict(player.serialize(), _version=1) for player in league["Player"]]
+
+
+def timed(fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def bench_codec(name, records, repeat):
+    codec = get_codec(name)
+    raw = encode(records, codec)
+    assert decode(raw) == records
+    return {
+        "codec": name,
+        "bytes": len(raw),
+        "encode_ms": timed(lambda: encode(records, codec), repeat) * 1000,
+        "decode_ms": timed(lambda: decode(raw), repeat) * 1000,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Tamaño y velocidad de cada formato de almacenamiento")
+    parser.add_argument("--size", type=int, default=100000, help="Jugadores en la liga sintética")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--codecs", nargs="+", default=CODEC_NAMES, choices=CODEC_NAMES)
+    parser.add_argument("--output", help="Guarda los resultados en JSON")
+    args = parser.parse_args()
+
+    records = records_for(args.size)
+    results = [bench_codec(name, records, args.repeat) for name in args.codecs]
+
+    # Las proporciones son respecto del formato histórico (JSON con indentación)
+    reference = next((r for r in results if r["codec"] == "json"), results[0])
+    print(f"{'formato':<16}{'tamaño KB':>12}{'tamaño %':>10}{'escritura ms':>14}{'lectura ms':>12}{'lectura x':>11}")
+    for r in results:
+        print(f"{r['codec']:<16}{r['bytes'] / 1024:>12.1f}{r['bytes'] / reference['bytes']:>10.1%}"
+              f"{r['encode_ms']:>14.1f}{r['decode_ms']:>12.1f}{reference['decode_ms'] / r['decode_ms']:>11.2f}")
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"size": args.size, "repeat": args.repeat, "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
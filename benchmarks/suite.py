@@ -0,0 +1,182 @@
+import itertools
+import random
+import time
+import tracemalloc
+from functools import partial
+from database.json_repository import JSONRepository
+from database.lsm_repository import LSMRepository
+from database.repository import RepositoryProvider
+from database.sharded_repository import ShardedRepository
+from database.storage_codecs import CODEC_NAMES
+from main import REPOSITORIES, SHARD_PARTITIONS
+from project import Player, Position
+from tools.generate_league import generate_league, write_league
+from tools.load_test import percentile
+
+# Backends disponibles: nombre -> fábrica que recibe la clase de la entidad
+BACKENDS = {
+    "json": JSONRepository,
+    "json-warm": partial(JSONRepository, warm_cache=True),
+    # Mismo repositorio con otro formato de archivo: "json-marshal+gzip", etc.
+    **{f"json-{name}": partial(JSONRepository, codec=name) for name in CODEC_NAMES if name != "json"},
+    "sharded": partial(ShardedRepository, shards=16),
+    "sharded-team": lambda cls: ShardedRepository(cls, 16, SHARD_PARTITIONS.get(cls.__name__, "_id")),
+    "lsm": LSMRepository,
+}
+
+
+def register_backend(name):
+    for entity, cls in REPOSITORIES.items():
+        RepositoryProvider.register(entity, BACKENDS[name](cls))
+
+
+def prepare(size, seed=0):
+    # Liga sintética con `size` jugadores y solo dos jornadas para que los
+    # partidos no dominen el tamaño del conjunto de datos
+    per_team = min(25, size)
+    league = generate_league(seed, teams=max(2, size // per_team), players_per_team=per_team,
+                             staff_per_team=2, rounds=2)
+    write_league(league)
+    return league
+
+
+class Context:
+    """
+    Estado compartido por los benchmarks de una configuración: servicios ya
+    iniciados, sesión de árbitro y generadores de IDs para las operaciones.
+    """
+    def __init__(self, league, seed=0):
+        from services.auth_service import AuthService
+        from services.player_service import PlayerManagementService
+        from services.report_service import ReportService
+        self.rng = random.Random(seed)
+        self.auth = AuthService.get_instance()
+        self.players = PlayerManagementService.get_instance()
+        self.reports = ReportService.get_instance()
+        self.players_repo = RepositoryProvider.get("Player")
+        self.player_ids = [p.get_id() for p in league["Player"]]
+        referee = league["Referee"][0]
+        self.referee_session = self.auth.login_session(referee.get_id(), "1234", "referee")
+        self._new_ids = itertools.count()
+        self.saved = []
+
+    def random_player_id(self):
+        return self.rng.choice(self.player_ids)
+
+    def new_player(self):
+        player = Player(f"BENCH-{next(self._new_ids):07d}", "Bench Player", 25, "1234", None, Position.MC)
+        self.saved.append(player.get_id())
+        return player
+
+
+def bench_find(ctx):
+    ctx.players_repo.find(ctx.random_player_id())
+
+
+def bench_find_all(ctx):
+    ctx.players_repo.findAll()
+
+
+def bench_save(ctx):
+    ctx.players_repo.save(ctx.new_player())
+
+
+def bench_replace(ctx):
+    player = ctx.players_repo.find(ctx.random_player_id())
+    player.set_goals(player.get_goals() + 1)
+    ctx.players_repo.replace(player.get_id(), player)
+
+
+def bench_delete(ctx):
+    # Borra los jugadores creados por bench_save; si se acaban, crea uno
+    if not ctx.saved:
+        ctx.players_repo.save(ctx.new_player())
+    ctx.players_repo.delete(ctx.saved.pop())
+
+
+def bench_login(ctx):
+    ctx.auth.login_session(ctx.random_player_id(), "1234", "player")
+
+
+def bench_get_all_players(ctx):
+    ctx.players.get_all_players(session=ctx.referee_session)
+
+
+def bench_search_players(ctx):
+    ctx.players.search_players({"_position": Position.DC}, session=ctx.referee_session)
+
+
+def bench_player_report(ctx):
+    ctx.reports.generate_player_report(session=ctx.referee_session)
+
+
+# En orden: las lecturas van antes de las escrituras que modifican el conjunto
+BENCHMARKS = [
+    ("repo.find", bench_find),
+    ("repo.findAll", bench_find_all),
+    ("auth.login", bench_login),
+    ("players.get_all_players", bench_get_all_players),
+    ("players.search_players", bench_search_players),
+    ("reports.player_report", bench_player_report),
+    ("repo.save", bench_save),
+    ("repo.replace", bench_replace),
+    ("repo.delete", bench_delete),
+]
+
+
+def measure(fn, ctx, min_time=1.0, min_ops=3, max_ops=1000):
+    """
+    Ejecuta `fn` hasta cubrir `min_time` segundos (entre min_ops y max_ops
+    llamadas) y luego una vez más con tracemalloc para el pico de memoria,
+    que se mide aparte para no distorsionar las latencias.
+    """
+    fn(ctx)  # Calentamiento
+    samples = []
+    start = time.perf_counter()
+    while len(samples) < max_ops and (len(samples) < min_ops or time.perf_counter() - start < min_time):
+        t0 = time.perf_counter()
+        fn(ctx)
+        samples.append(time.perf_counter() - t0)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        base = tracemalloc.get_traced_memory()[0]
+        fn(ctx)
+        peak = tracemalloc.get_traced_memory()[1] - base
+    finally:
+        tracemalloc.stop()
+
+    ordered = sorted(samples)
+    ms = [s * 1000 for s in ordered]
+    return {
+        "ops": len(samples),
+        "ops_per_sec": len(samples) / elapsed if elapsed else 0.0,
+        "mean_ms": sum(ms) / len(ms),
+        "p50_ms": percentile(ms, 50),
+        "p95_ms": percentile(ms, 95),
+        "p99_ms": percentile(ms, 99),
+        "max_ms": ms[-1],
+        "peak_memory_kb": peak / 1024,
+        "samples_ms": [s * 1000 for s in samples],
+    }
+
+
+def run_config(backend, size, names=None, seed=0, min_time=1.0, min_ops=3, max_ops=1000):
+    # Ejecuta los benchmarks de una combinación backend/tamaño en el directorio actual
+    register_backend(backend)
+    start = time.perf_counter()
+    league = prepare(size, seed)
+    generated = time.perf_counter()
+    ctx = Context(league, seed)
+    ready = time.perf_counter()
+
+    results = []
+    for name, fn in BENCHMARKS:
+        if names and name not in names:
+            continue
+        result = {"benchmark": name, "backend": backend, "size": size}
+        result.update(measure(fn, ctx, min_time, min_ops, max_ops))
+        results.append(result)
+    return {"backend": backend, "size": size, "setup_s": generated - start,
+            "startup_s": ready - generated, "results": results}
@@ -0,0 +1,116 @@
+import asyncio
+from abc import ABC, abstractmethod
+from functools import partial
+from .repository import Repository
+
+class AsyncRepository(ABC):
+    @abstractmethod
+    async def find(self, id):
+        pass
+
+    @abstractmethod
+    async def findAll(self):
+        pass
+
+    @abstractmethod
+    async def save(self, element):
+        pass
+
+    @abstractmethod
+    async def delete(self, id):
+        pass
+
+    @abstractmethod
+    async def replace(self, id, element, expected_version=None):
+        pass
+
+    @abstractmethod
+    async def patch(self, id, fields: dict, expected_version=None):
+        pass
+
+    @abstractmethod
+    async def increment_fields(self, id, deltas: dict):
+        pass
+
+    async def save_many(self, elements):
+        saved = 0
+        for element in elements:
+            if await self.save(element):
+                saved += 1
+        return saved
+
+    async def find_many(self, ids):
+        results = await asyncio.gather(*(self.find(id) for id in ids))
+        return {id: element for id, element in zip(ids, results) if element is not None}
+
+    async def increment(self, id, field, delta=1):
+        return await self.increment_fields(id, {field: delta})
+
+
+class ExecutorAsyncRepository(AsyncRepository):
+    """
+    Adaptador asíncrono sobre un Repository síncrono: cada operación se
+    ejecuta en un executor para no bloquear el event loop. Las lecturas
+    idénticas concurrentes se agrupan (single-flight): mientras una lectura
+    está en curso, las demás esperan el mismo resultado en lugar de volver a
+    leer el archivo. Los objetos retornados se comparten entre quienes
+    esperaban la misma lectura.
+    """
+    def __init__(self, repo: Repository, executor=None):
+        self.repo = repo
+        self.executor = executor
+        self._inflight = {}
+        # Lecturas atendidas por otra ya en curso (hits) y lecturas reales (misses)
+        self.hits = 0
+        self.misses = 0
+
+    async def _run(self, fn, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, partial(fn, *args, **kwargs))
+
+    async def _read(self, key, fn, *args):
+        future = self._inflight.get(key)
+        if future is not None:
+            self.hits += 1
+        else:
+            self.misses += 1
+            future = asyncio.ensure_future(self._run(fn, *args))
+            self._inflight[key] = future
+            future.add_done_callback(lambda f: self._inflight.pop(key, None) if self._inflight.get(key) is f else None)
+        # shield: si quien inició la lectura se cancela, los demás siguen esperando
+        return await asyncio.shield(future)
+
+    async def _write(self, fn, *args, **kwargs):
+        try:
+            return await self._run(fn, *args, **kwargs)
+        finally:
+            # Las lecturas posteriores a una escritura no deben reutilizar lecturas previas
+            self._inflight.clear()
+
+    async def find(self, id):
+        return await self._read(("find", id), self.repo.find, id)
+
+    async def find_many(self, ids):
+        ids = tuple(ids)
+        return dict(await self._read(("find_many", frozenset(ids)), self.repo.find_many, ids))
+
+    async def findAll(self):
+        return list(await self._read(("findAll",), self.repo.findAll))
+
+    async def save(self, element):
+        return await self._write(self.repo.save, element)
+
+    async def save_many(self, elements):
+        return await self._write(self.repo.save_many, list(elements))
+
+    async def delete(self, id):
+        return await self._write(self.repo.delete, id)
+
+    async def replace(self, id, element, expected_version=None):
+        return await self._write(self.repo.replace, id, element, expected_version)
+
+    async def patch(self, id, fields: dict, expected_version=None):
+        return await self._write(self.repo.patch, id, fields, expected_version)
+
+    async def increment_fields(self, id, deltas: dict):
+        return await self._write(self.repo.increment_fields, id, deltas)
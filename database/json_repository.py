@@ -1,59 +1,237 @@
-from .repository import Repository
+from .repository import Repository, VersionConflictError
+from .locks import FileLock
+from . import storage_codecs
 from project import Serializable
-import json
+from contextlib import contextmanager
+import marshal
 import os
+import threading
+
+# Versión del formato de la caché binaria; al cambiarla se descartan las anteriores
+CACHE_FORMAT = 1
 
 class JSONRepository(Repository):
-    def __init__(self, cls: Serializable):
+    def __init__(self, cls: Serializable, warm_cache=False, codec="json"):
+        super().__init__()
         self.cls = cls
+        # Formato con el que se escribe; al leer se detecta por la cabecera del
+        # archivo, así que un archivo en otro formato se convierte al siguiente _save
+        self.codec = storage_codecs.get_codec(codec)
         folder = "data"
         os.makedirs(folder, exist_ok=True)
         self.filename = os.path.join(folder, f"{cls.__name__.lower()}s.json")
+        self.lockfile = self.filename + ".lock"
+        # Caché binaria (marshal) de los registros ya parseados y de su índice por ID
+        self.warm_cache = warm_cache
+        self.cachefile = self.filename + ".cache"
+        self._indexes = threading.local()
+        self._file_lock = FileLock(self.lockfile)
         if not os.path.exists(self.filename):
-            with open(self.filename, "w") as f:
-                json.dump([], f)
-    
+            with open(self.filename, "wb") as f:
+                f.write(storage_codecs.encode([], self.codec))
+
+    @contextmanager
+    def _reading(self):
+        with self._lock.read_lock(), self._file_lock.hold(exclusive=False):
+            try:
+                yield
+            finally:
+                # No retener los registros cargados más allá de la operación
+                self._indexes.last = None
+
+    @contextmanager
+    def _writing(self):
+        with self._lock.write_lock(), self._file_lock.hold(exclusive=True):
+            try:
+                yield
+            finally:
+                self._indexes.last = None
+
     def _load(self):
-        with open(self.filename, "r") as f:
-            return json.load(f)
+        if self.warm_cache:
+            return self._load_cached()
+        return self._read_file()
+
+    def _read_file(self):
+        with open(self.filename, "rb") as f:
+            raw = f.read()
+        self._count_io(read=len(raw))
+        return storage_codecs.decode(raw)
+
+    def _load_cached(self):
+        """
+        Lee los registros desde la caché binaria si corresponde a la versión
+        actual del archivo (mismo inodo, mtime y tamaño: _save siempre crea un
+        archivo nuevo); si no, decodifica el archivo y regenera la caché. marshal
+        carga listas de dicts mucho más rápido que json con indentación.
+        """
+        stamp = self._file_stamp()
+        try:
+            # marshal.load sobre el archivo lee objeto por objeto; loads del contenido es mucho más rápido
+            with open(self.cachefile, "rb") as f:
+                raw = f.read()
+            self._count_io(read=len(raw))
+            version, cached_stamp, records, index = marshal.loads(raw)
+            if version == CACHE_FORMAT and tuple(cached_stamp) == stamp:
+                self._indexes.last = (records, index)
+                return records
+        except (OSError, EOFError, ValueError, TypeError):
+            pass
+        records = self._read_file()
+        self._indexes.last = (records, self._write_cache(records, stamp))
+        return records
+
+    def _write_cache(self, records, stamp):
+        index = {record["_id"]: i for i, record in enumerate(records)}
+        tmp = f"{self.cachefile}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            raw = marshal.dumps((CACHE_FORMAT, stamp, records, index))
+            with open(tmp, "wb") as f:
+                f.write(raw)
+            os.replace(tmp, self.cachefile)
+            self._count_io(written=len(raw))
+        except OSError:
+            # Sin caché se sigue funcionando, solo que sin el arranque rápido
+            pass
+        return index
+
+    def _index_of(self, data):
+        # Índice por ID de los registros que acaba de cargar este hilo, si lo hay
+        last = getattr(self._indexes, "last", None)
+        return last[1] if last is not None and last[0] is data else None
 
     def _save(self, data):
-        with open(self.filename, "w") as f:
-            json.dump(data, f, indent=2)
+        # Escritura atómica: los lectores ven el archivo anterior o el nuevo, nunca uno a medias
+        tmp = f"{self.filename}.{os.getpid()}.{threading.get_ident()}.tmp"
+        raw = storage_codecs.encode(data, self.codec)
+        with open(tmp, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, self.filename)
+        self._count_io(written=len(raw))
+        if self.warm_cache:
+            # Bajo el lock de escritura nadie más cambia el archivo: la caché se
+            # actualiza con la marca del archivo recién escrito, así la próxima
+            # lectura (o escritura) no vuelve a decodificarlo
+            self._write_cache(data, self._file_stamp())
+
+    def _file_stamp(self):
+        try:
+            stat = os.stat(self.filename)
+            return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return None
+
+    def get_version(self, id):
+        # Incluye la marca del archivo para detectar escrituras de otros procesos
+        return super().get_version(id) + (self._file_stamp(),)
+
+    def get_generation(self):
+        return super().get_generation() + (self._file_stamp(),)
 
     def find(self, id):
-        data = self._load()
+        with self._reading():
+            data = self._load()
+            index = self._index_of(data)
+        if index is not None:
+            position = index.get(id)
+            return self._deserialize(data[position]) if position is not None else None
         for element in data:
         
             if element["_id"] == id:
-                return self.cls.deserialize(element)
+                return self._deserialize(element)
         return None
     
+    def find_many(self, ids):
+        wanted = set(ids)
+        with self._reading():
+            data = self._load()
+            index = self._index_of(data)
+        if index is not None:
+            return {id: self._deserialize(data[index[id]]) for id in wanted if id in index}
+        return {e["_id"]: self._deserialize(e) for e in data if e["_id"] in wanted}
+
     def findAll(self):
-        return [self.cls.deserialize(element) for element in self._load()]
+        with self._reading():
+            data = self._load()
+        return [self._deserialize(element) for element in data]
 
     def save(self, element):
         if element == None:
             return False
-        data: list = self._load()
         id = element.get_id()
+        serialized = element.serialize()
+        serialized["_version"] = 1
+        with self._writing():
+            data: list = self._load()
 
-        for e in data:
-            if e["_id"] == id:
-                return False
-        data.append(element.serialize())
-        self._save(data)
+            for e in data:
+                if e["_id"] == id:
+                    return False
+            data.append(serialized)
+            self._save(data)
+            element._version = 1
+            self._notify("save", id, element)
         return True
 
+    def save_many(self, elements):
+        # Inserción masiva: una sola lectura y una sola escritura del archivo
+        with self._writing():
+            data: list = self._load()
+            ids = {e["_id"] for e in data}
+            saved = []
+            for element in elements:
+                if element is None or element.get_id() in ids:
+                    continue
+                serialized = element.serialize()
+                serialized["_version"] = 1
+                data.append(serialized)
+                ids.add(element.get_id())
+                saved.append(element)
+            if saved:
+                self._save(data)
+            for element in saved:
+                element._version = 1
+                self._notify("save", element.get_id(), element)
+        return len(saved)
+
     def delete(self, id):
-        data = self._load()
-        new_data = [d for d in data if d["_id"] != id]
-        self._save(new_data)
-
-    def replace(self, id, element):
-        data = self._load()
-        for i, d in enumerate(data):
-            if d["_id"] == id:
-                data[i] = element.serialize()
-                break
-        self._save(data)
\ No newline at end of file
+        with self._writing():
+            data = self._load()
+            new_data = [d for d in data if d["_id"] != id]
+            if len(new_data) != len(data):
+                self._save(new_data)
+                self._notify("delete", id)
+
+    def replace(self, id, element, expected_version=None):
+        serialized = element.serialize()
+        with self._writing():
+            data = self._load()
+            for i, d in enumerate(data):
+                if d["_id"] == id:
+                    current = d.get("_version", 0)
+                    if expected_version is not None and current != expected_version:
+                        raise VersionConflictError(id, expected_version, current)
+                    serialized["_version"] = current + 1
+                    data[i] = serialized
+                    self._save(data)
+                    element._version = current + 1
+                    self._notify("replace", id, element)
+                    return True
+        return False
+
+    def _modify(self, id, change, expected_version=None):
+        # Read-modify-write de un solo registro bajo el lock de escritura
+        with self._writing():
+            data = self._load()
+            for i, d in enumerate(data):
+                if d["_id"] == id:
+                    current = d.get("_version", 0)
+                    if expected_version is not None and current != expected_version:
+                        raise VersionConflictError(id, expected_version, current)
+                    d = change(d)
+                    d["_version"] = current + 1
+                    data[i] = d
+                    self._save(data)
+                    self._notify("replace", id, self._deserialize(dict(d)))
+                    return True
+        return False
@@ -0,0 +1,96 @@
+import threading
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:
+    # En Windows no hay fcntl: solo se sincronizan los hilos del proceso
+    fcntl = None
+
+class RWLock:
+    """
+    Lock de lectores/escritor: muchos lectores simultáneos o un único escritor.
+    Da prioridad a los escritores en espera para que no queden bloqueados por
+    un flujo continuo de lecturas. El hilo que tiene el lock de escritura puede
+    volver a adquirir lectura o escritura (por ejemplo desde un listener).
+    """
+    def __init__(self):
+        self._cond = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer = None
+        self._writer_depth = 0
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read_lock(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+                reentrant = True
+            else:
+                reentrant = False
+                while self._writer is not None or self._waiting_writers:
+                    self._cond.wait()
+                self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                if reentrant:
+                    self._writer_depth -= 1
+                else:
+                    self._readers -= 1
+                    if self._readers == 0:
+                        self._cond.notify_all()
+
+    @contextmanager
+    def write_lock(self):
+        me = threading.get_ident()
+        with self._cond:
+            if self._writer == me:
+                self._writer_depth += 1
+            else:
+                self._waiting_writers += 1
+                while self._writer is not None or self._readers:
+                    self._cond.wait()
+                self._waiting_writers -= 1
+                self._writer = me
+                self._writer_depth = 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writer_depth -= 1
+                if self._writer_depth == 0:
+                    self._writer = None
+                    self._cond.notify_all()
+
+
+class FileLock:
+    """
+    Lock consultivo entre procesos (flock) sobre un archivo aparte, porque los
+    repositorios reemplazan sus archivos de datos al escribir. Si el hilo ya
+    lo tiene, no se vuelve a pedir (flock sobre otro descriptor se bloquearía).
+    """
+    def __init__(self, path):
+        self.path = path
+        self._held = threading.local()
+
+    @contextmanager
+    def hold(self, exclusive):
+        if fcntl is None or getattr(self._held, "depth", 0):
+            self._held.depth = getattr(self._held, "depth", 0) + 1
+            try:
+                yield
+            finally:
+                self._held.depth -= 1
+            return
+        with open(self.path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            self._held.depth = 1
+            try:
+                yield
+            finally:
+                self._held.depth = 0
+                fcntl.flock(f, fcntl.LOCK_UN)
@@ -0,0 +1,453 @@
+from .repository import Repository, VersionConflictError
+from . import storage_codecs
+from project import Serializable
+import bisect
+import hashlib
+import json
+import marshal
+import os
+import struct
+import threading
+
+try:
+    import fcntl
+except ImportError:
+    # En Windows no hay fcntl: no se detecta si otro proceso abrió el mismo directorio
+    fcntl = None
+
+SEGMENT_MAGIC = b"\x00LSMSEG1"
+MANIFEST_FORMAT = 1
+_LENGTH = struct.Struct(">I")
+_TRAILER = struct.Struct(">Q")
+# Clave ausente en la memtable o en un segmento; None es una lápida (registro borrado)
+_MISSING = object()
+
+
+class BloomFilter:
+    def __init__(self, bits, hashes, data=None):
+        self.bits = bits
+        self.hashes = hashes
+        self.data = bytearray(data) if data is not None else bytearray((bits + 7) // 8)
+
+    @classmethod
+    def for_count(cls, count, bits_per_key=10):
+        # 10 bits por clave y 7 funciones: cerca de 1% de falsos positivos
+        return cls(max(64, count * bits_per_key), max(1, round(bits_per_key * 0.69)))
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(str(key).encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.bits for i in range(self.hashes))
+
+    def add(self, key):
+        for position in self._positions(key):
+            self.data[position >> 3] |= 1 << (position & 7)
+
+    def might_contain(self, key):
+        return all(self.data[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+
+def _entries(buffer):
+    # Recorre las entradas (id, registro o None) de un bloque: largo + marshal
+    view = memoryview(buffer)
+    position = 0
+    while position < len(view):
+        (size,) = _LENGTH.unpack_from(view, position)
+        position += _LENGTH.size
+        yield marshal.loads(view[position:position + size])
+        position += size
+
+
+class Segment:
+    """
+    Archivo inmutable con entradas ordenadas por ID. Al final guarda un
+    índice disperso (una de cada `index_interval` claves con su posición) y
+    un filtro de Bloom, que se cargan en memoria al abrirlo: una búsqueda
+    descarta el segmento con el filtro o lee un solo bloque.
+    """
+    def __init__(self, path, count_io=None):
+        self.path = path
+        self.name = os.path.basename(path)
+        # _count_io del repositorio dueño, para las métricas de bytes leídos
+        self._count_io = count_io
+        self._fd = os.open(path, os.O_RDONLY | getattr(os, "O_BINARY", 0))
+        self._read_lock = threading.Lock()
+        size = os.fstat(self._fd).st_size
+        (self.end,) = _TRAILER.unpack(self._read(size - _TRAILER.size, _TRAILER.size))
+        footer = marshal.loads(self._read(self.end, size - _TRAILER.size - self.end))
+        self.count = footer["count"]
+        self.keys = footer["keys"]
+        self.offsets = footer["offsets"]
+        self.last = footer["last"]
+        self.bloom = BloomFilter(footer["bloom_bits"], footer["bloom_hashes"], footer["bloom"])
+
+    @classmethod
+    def write(cls, path, entries, index_interval=16, count_io=None):
+        # entries: lista ordenada por ID de (id, registro o None)
+        bloom = BloomFilter.for_count(len(entries))
+        keys, offsets, chunks = [], [], [SEGMENT_MAGIC]
+        offset = len(SEGMENT_MAGIC)
+        for i, (id, record) in enumerate(entries):
+            if i % index_interval == 0:
+                keys.append(id)
+                offsets.append(offset)
+            bloom.add(id)
+            payload = marshal.dumps((id, record))
+            chunks.append(_LENGTH.pack(len(payload)))
+            chunks.append(payload)
+            offset += _LENGTH.size + len(payload)
+        chunks.append(marshal.dumps({"count": len(entries), "keys": keys, "offsets": offsets,
+                                     "last": entries[-1][0] if entries else None, "bloom_bits": bloom.bits,
+                                     "bloom_hashes": bloom.hashes, "bloom": bytes(bloom.data)}))
+        chunks.append(_TRAILER.pack(offset))
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        raw = b"".join(chunks)
+        with open(tmp, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, path)
+        if count_io is not None:
+            count_io(written=len(raw))
+        return cls(path, count_io)
+
+    def _read(self, offset, size):
+        if hasattr(os, "pread"):
+            data = os.pread(self._fd, size, offset)
+        else:
+            with self._read_lock:
+                os.lseek(self._fd, offset, os.SEEK_SET)
+                data = os.read(self._fd, size)
+        if self._count_io is not None:
+            self._count_io(read=len(data))
+        return data
+
+    def get(self, id):
+        # Los IDs guardados son str: otro tipo (None, un int de la API) no está y no se puede comparar
+        if not isinstance(id, str):
+            return _MISSING
+        if not self.keys or id < self.keys[0] or id > self.last or not self.bloom.might_contain(id):
+            return _MISSING
+        # Bloque del índice disperso que puede contener la clave
+        i = bisect.bisect_right(self.keys, id) - 1
+        start = self.offsets[i]
+        end = self.offsets[i + 1] if i + 1 < len(self.offsets) else self.end
+        for key, record in _entries(self._read(start, end - start)):
+            if key == id:
+                return record
+            if key > id:
+                break
+        return _MISSING
+
+    def scan(self):
+        return _entries(self._read(len(SEGMENT_MAGIC), self.end - len(SEGMENT_MAGIC)))
+
+    def close(self):
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+
+
+class LSMRepository(Repository):
+    """
+    Repositorio con estructura LSM en data/<entidad>s.lsm/, pensado para
+    cargas con muchas escrituras (una jornada de partidos):
+    - cada escritura se agrega al final del WAL (wal.log) y a la memtable
+      en memoria; un borrado se guarda como lápida (None);
+    - cuando el WAL llega a `memtable_limit` entradas o a `wal_limit`
+      bytes, la memtable se escribe ordenada como un segmento inmutable y
+      el WAL se vacía (se cuentan escrituras, no IDs distintos, para que
+      actualizar muchas veces los mismos registros no haga crecer el WAL
+      sin límite);
+    - find mira la memtable y luego los segmentos del más nuevo al más
+      viejo: el filtro de Bloom descarta la mayoría y en el resto basta
+      una búsqueda binaria en el índice disperso y leer un bloque;
+    - con `merge_threshold` segmentos, un hilo en segundo plano los fusiona
+      en uno solo, descartando versiones viejas y lápidas. Las escrituras
+      siguen mientras tanto.
+    La memtable solo existe en el proceso que abrió el directorio, así que
+    un segundo proceso no puede abrirlo a la vez; close() lo libera. Al abrirlo por primera vez
+    se importa el archivo de JSONRepository (data/<entidad>s.json), si existe.
+    """
+    def __init__(self, cls: Serializable, memtable_limit=2000, merge_threshold=4, wal_limit=1 << 20):
+        super().__init__()
+        self.cls = cls
+        self.memtable_limit = memtable_limit
+        self.wal_limit = wal_limit
+        self.merge_threshold = merge_threshold
+        name = f"{cls.__name__.lower()}s"
+        self.folder = os.path.join("data", f"{name}.lsm")
+        self.legacy_file = os.path.join("data", f"{name}.json")
+        self.manifest_file = os.path.join(self.folder, "manifest.json")
+        self.wal_file = os.path.join(self.folder, "wal.log")
+        os.makedirs(self.folder, exist_ok=True)
+        self._process_lock = self._lock_folder()
+        self._memtable = {}
+        self._wal_entries = 0
+        self._wal_bytes = 0
+        self._closed = False
+        self._segments = []  # Del más nuevo al más viejo
+        self._next_segment = 1
+        self._merge_lock = threading.Lock()
+        self._merge_wanted = threading.Event()
+        self._merger = None
+        self._open()
+
+    def _lock_folder(self):
+        f = open(os.path.join(self.folder, "process.lock"), "a")
+        if fcntl is not None:
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                f.close()
+                raise RuntimeError(f"{self.folder} ya está abierto por otro repositorio (de este u otro proceso)")
+        return f
+
+    def _open(self):
+        if os.path.exists(self.manifest_file):
+            with open(self.manifest_file, encoding="utf-8") as f:
+                manifest = json.load(f)
+            self._segments = [Segment(os.path.join(self.folder, name), self._count_io) for name in manifest["segments"]]
+            self._next_segment = manifest["next"]
+        elif os.path.exists(self.legacy_file):
+            with open(self.legacy_file, "rb") as f:
+                records = storage_codecs.decode(f.read())
+            entries = sorted(((record["_id"], record) for record in records), key=lambda entry: entry[0])
+            self._segments = [Segment.write(self._segment_path(), entries, count_io=self._count_io)]
+            self._write_manifest()
+        # Restos de una fusión o un flush interrumpidos: segmentos fuera del manifiesto y temporales
+        current = {segment.name for segment in self._segments}
+        for name in os.listdir(self.folder):
+            if name.endswith(".tmp") or (name.endswith(".sst") and name not in current):
+                os.remove(os.path.join(self.folder, name))
+        self._replay()
+        self._wal = open(self.wal_file, "ab")
+        if len(self._segments) >= self.merge_threshold:
+            self._schedule_merge()
+
+    def _replay(self):
+        # Reconstruye la memtable desde el WAL. Una última línea sin salto de
+        # línea es una escritura interrumpida por una caída: aunque parezca
+        # JSON válido no se aplica, y se corta del archivo
+        if not os.path.exists(self.wal_file):
+            return
+        valid = 0
+        with open(self.wal_file, "rb") as f:
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break
+                try:
+                    id, record = json.loads(line)
+                except ValueError:
+                    break
+                self._memtable[id] = record
+                self._wal_entries += 1
+                valid += len(line)
+        if valid != os.path.getsize(self.wal_file):
+            os.truncate(self.wal_file, valid)
+        self._wal_bytes = valid
+        self._count_io(read=valid)
+
+    def _segment_path(self):
+        path = os.path.join(self.folder, f"seg-{self._next_segment:06d}.sst")
+        self._next_segment += 1
+        return path
+
+    def _write_manifest(self):
+        manifest = {"format": MANIFEST_FORMAT, "segments": [segment.name for segment in self._segments],
+                    "next": self._next_segment}
+        tmp = f"{self.manifest_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, self.manifest_file)
+
+    def _append(self, entries):
+        # Bajo el lock de escritura: WAL primero, luego la memtable
+        data = b"".join(json.dumps([id, record], separators=(",", ":")).encode("utf-8") + b"\n"
+                        for id, record in entries)
+        self._wal.write(data)
+        self._wal.flush()
+        self._count_io(written=len(data))
+        self._wal_entries += len(entries)
+        self._wal_bytes += len(data)
+        for id, record in entries:
+            self._memtable[id] = record
+        if self._wal_entries >= self.memtable_limit or self._wal_bytes >= self.wal_limit:
+            self._flush()
+
+    def _flush(self):
+        if not self._memtable:
+            return
+        entries = sorted(self._memtable.items(), key=lambda entry: entry[0])
+        self._segments = [Segment.write(self._segment_path(), entries, count_io=self._count_io)] + self._segments
+        self._write_manifest()
+        # Si el proceso muere antes de vaciar el WAL, al reabrir se vuelven a
+        # aplicar entradas que ya están en el segmento, lo que no cambia nada
+        self._wal.close()
+        self._wal = open(self.wal_file, "wb")
+        self._memtable = {}
+        self._wal_entries = 0
+        self._wal_bytes = 0
+        if len(self._segments) >= self.merge_threshold:
+            self._schedule_merge()
+
+    def flush(self):
+        with self._lock.write_lock():
+            self._flush()
+
+    def _schedule_merge(self):
+        if self._merger is None or not self._merger.is_alive():
+            self._merger = threading.Thread(target=self._merge_loop, name=f"lsm-merge-{self.cls.__name__}", daemon=True)
+            self._merger.start()
+        self._merge_wanted.set()
+
+    def _merge_loop(self):
+        while True:
+            self._merge_wanted.wait()
+            self._merge_wanted.clear()
+            if self._closed:
+                return
+            self.compact()
+
+    def close(self):
+        # Detiene la fusión en segundo plano (esperando la que esté en curso) y
+        # libera el WAL, los segmentos y process.lock. La memtable queda en el WAL.
+        if self._closed:
+            return
+        self._closed = True
+        self._merge_wanted.set()
+        if self._merger is not None:
+            self._merger.join()
+        with self._lock.write_lock():
+            self._wal.close()
+            for segment in self._segments:
+                segment.close()
+            self._segments = []
+            self._memtable = {}
+            self._process_lock.close()
+
+    def compact(self):
+        """
+        Fusiona todos los segmentos actuales en uno. La lectura y escritura
+        del nuevo segmento se hacen sin el lock del repositorio (los segmentos
+        son inmutables); solo el reemplazo en la lista toma el lock de
+        escritura. Como se fusionan todos, incluido el más viejo, las lápidas
+        ya no ocultan nada y se descartan.
+        """
+        with self._merge_lock:
+            segments = list(self._segments)
+            if len(segments) < 2:
+                return
+            with self._lock.write_lock():
+                path = self._segment_path()
+            merged = {}
+            for segment in reversed(segments):
+                for id, record in segment.scan():
+                    merged[id] = record
+            entries = sorted(((id, record) for id, record in merged.items() if record is not None),
+                             key=lambda entry: entry[0])
+            result = Segment.write(path, entries, count_io=self._count_io)
+            with self._lock.write_lock():
+                # Los segmentos escritos durante la fusión son más nuevos: quedan delante
+                self._segments = self._segments[:len(self._segments) - len(segments)] + [result]
+                self._write_manifest()
+                for segment in segments:
+                    segment.close()
+                    os.remove(segment.path)
+
+    def _get(self, id):
+        record = self._memtable.get(id, _MISSING)
+        if record is _MISSING:
+            for segment in self._segments:
+                record = segment.get(id)
+                if record is not _MISSING:
+                    break
+        return None if record is _MISSING else record
+
+    def _deserialize(self, data):
+        # Copia: los registros de la memtable no se pueden modificar
+        return super()._deserialize(dict(data))
+
+    def find(self, id):
+        with self._lock.read_lock():
+            record = self._get(id)
+        return self._deserialize(record) if record is not None else None
+
+    def find_many(self, ids):
+        with self._lock.read_lock():
+            records = {id: self._get(id) for id in set(ids)}
+        return {id: self._deserialize(record) for id, record in records.items() if record is not None}
+
+    def findAll(self):
+        merged = {}
+        with self._lock.read_lock():
+            for segment in reversed(self._segments):
+                for id, record in segment.scan():
+                    merged[id] = record
+            merged.update(self._memtable)
+        return [self._deserialize(merged[id]) for id in sorted(merged) if merged[id] is not None]
+
+    def save(self, element):
+        if element == None:
+            return False
+        id = element.get_id()
+        serialized = element.serialize()
+        serialized["_version"] = 1
+        with self._lock.write_lock():
+            if self._get(id) is not None:
+                return False
+            self._append([(id, serialized)])
+            element._version = 1
+            self._notify("save", id, element)
+        return True
+
+    def save_many(self, elements):
+        # Todo el lote va en una sola escritura al WAL
+        with self._lock.write_lock():
+            batch = {}
+            for element in elements:
+                if element is None or element.get_id() in batch or self._get(element.get_id()) is not None:
+                    continue
+                serialized = element.serialize()
+                serialized["_version"] = 1
+                batch[element.get_id()] = (element, serialized)
+            if batch:
+                self._append([(id, serialized) for id, (_, serialized) in batch.items()])
+            for id, (element, _) in batch.items():
+                element._version = 1
+                self._notify("save", id, element)
+        return len(batch)
+
+    def delete(self, id):
+        with self._lock.write_lock():
+            if self._get(id) is not None:
+                self._append([(id, None)])
+                self._notify("delete", id)
+
+    def replace(self, id, element, expected_version=None):
+        serialized = element.serialize()
+        with self._lock.write_lock():
+            current = self._get(id)
+            if current is None:
+                return False
+            version = current.get("_version", 0)
+            if expected_version is not None and version != expected_version:
+                raise VersionConflictError(id, expected_version, version)
+            serialized["_version"] = version + 1
+            self._append([(id, serialized)])
+            element._version = version + 1
+            self._notify("replace", id, element)
+        return True
+
+    def _modify(self, id, change, expected_version=None):
+        with self._lock.write_lock():
+            current = self._get(id)
+            if current is None:
+                return False
+            version = current.get("_version", 0)
+            if expected_version is not None and version != expected_version:
+                raise VersionConflictError(id, expected_version, version)
+            d = change(dict(current))
+            d["_version"] = version + 1
+            self._append([(id, d)])
+            self._notify("replace", id, self._deserialize(d))
+        return True
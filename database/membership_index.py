@@ -0,0 +1,116 @@
+import threading
+from .repository import RepositoryProvider
+
+class MembershipIndex:
+    """
+    Índice bidireccional de pertenencia jugador <-> equipo.
+    La fuente de verdad es el campo _team de cada jugador: el índice se
+    construye al iniciar y se mantiene con las notificaciones del repositorio
+    de jugadores, así una plantilla se obtiene en O(tamaño de la plantilla).
+    Los cambios de otros procesos se detectan con get_generation() del
+    repositorio (incluye la marca del archivo): si cambió, el índice se
+    vuelve a construir antes de responder.
+    """
+    def __init__(self):
+        self._rosters = {}
+        self._teams = {}
+        self._generation = None
+        self._lock = threading.Lock()
+        self._rebuild()
+        RepositoryProvider.get("Player").subscribe(self._on_player_change)
+
+    def _on_player_change(self, event, id, element):
+        self._set(id, None if event == "delete" else element.get_team_id())
+        # La escritura propia ya está reflejada: no obliga a reconstruir
+        self._generation = RepositoryProvider.get("Player").get_generation()
+
+    def _rebuild(self):
+        players_repo = RepositoryProvider.get("Player")
+        # La generación se toma antes de leer: un cambio durante la lectura fuerza otra
+        generation = players_repo.get_generation()
+        rosters, teams = {}, {}
+        for player in players_repo.findAll():
+            team_id = player.get_team_id()
+            if team_id:
+                teams[player.get_id()] = team_id
+                rosters.setdefault(team_id, set()).add(player.get_id())
+        with self._lock:
+            self._rosters = rosters
+            self._teams = teams
+            self._generation = generation
+
+    def _sync(self):
+        if self._generation != RepositoryProvider.get("Player").get_generation():
+            self._rebuild()
+
+    def _set(self, player_id, team_id):
+        with self._lock:
+            previous = self._teams.pop(player_id, None)
+            if previous is not None:
+                roster = self._rosters.get(previous)
+                if roster is not None:
+                    roster.discard(player_id)
+                    if not roster:
+                        del self._rosters[previous]
+            if team_id:
+                self._teams[player_id] = team_id
+                self._rosters.setdefault(team_id, set()).add(player_id)
+
+    def roster(self, team_id):
+        self._sync()
+        with self._lock:
+            return sorted(self._rosters.get(team_id, ()))
+
+    def team_of(self, player_id):
+        self._sync()
+        return self._teams.get(player_id)
+
+    def check(self):
+        """
+        Compara las plantillas guardadas en cada Team con el índice.
+        Retorna una lista de diferencias {"team", "missing", "extra"}:
+        missing son jugadores del equipo que no figuran en Team.players y
+        extra son IDs en Team.players que no pertenecen al equipo.
+        """
+        issues = []
+        self._sync()
+        teams = {t.get_id(): t for t in RepositoryProvider.get("Team").findAll()}
+        with self._lock:
+            team_ids = set(teams) | set(self._rosters)
+            rosters = {team_id: set(self._rosters.get(team_id, ())) for team_id in team_ids}
+        for team_id in sorted(team_ids):
+            team = teams.get(team_id)
+            stored = set(team.serialize()["players"]) if team else set()
+            missing = rosters[team_id] - stored
+            extra = stored - rosters[team_id]
+            if missing or extra or team is None:
+                issues.append({"team": team_id, "exists": team is not None,
+                               "missing": sorted(missing), "extra": sorted(extra)})
+        return issues
+
+    def repair(self, source="players"):
+        """
+        Corrige las diferencias detectadas por check().
+        Con source="players" se reescribe Team.players a partir del _team de
+        cada jugador; con source="teams" se asigna a cada jugador el equipo
+        que lo lista en su plantilla.
+        """
+        teams_repo = RepositoryProvider.get("Team")
+        players_repo = RepositoryProvider.get("Player")
+        fixed = 0
+        for issue in self.check():
+            if source == "players":
+                if not issue["exists"]:
+                    continue
+                roster = self.roster(issue["team"])
+                teams_repo.update(issue["team"], lambda t, roster=roster: setattr(t, "players", list(roster)))
+                fixed += 1
+            else:
+                for player_id in issue["extra"]:
+                    if players_repo.patch(player_id, {"team": issue["team"]}):
+                        fixed += 1
+                for player_id in issue["missing"]:
+                    if self.team_of(player_id) == issue["team"]:
+                        players_repo.patch(player_id, {"team": None})
+                        fixed += 1
+        return fixed
@@ -0,0 +1,122 @@
+import re
+import threading
+import unicodedata
+from collections import defaultdict
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def normalize(text):
+    # Minúsculas, sin tildes y con separadores simples: "José  Núñez" -> "jose nunez"
+    if not text:
+        return ""
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(c for c in text if not unicodedata.combining(c)).casefold()
+    return _NON_ALNUM.sub(" ", text).strip()
+
+
+def trigrams(text, prefix=False):
+    # Cada palabra se rellena con dos espacios al inicio y uno al final, así
+    # los trigramas marcan el comienzo y el final de palabra. En modo prefijo
+    # se omite el relleno final porque la palabra puede continuar.
+    grams = set()
+    for word in text.split():
+        padded = "  " + word + ("" if prefix else " ")
+        for i in range(len(padded) - 2):
+            grams.add(padded[i:i + 3])
+    return grams
+
+
+class TrigramIndex:
+    """
+    Índice invertido de trigramas para búsqueda aproximada de nombres.
+    Las consultas solo recorren las listas de los trigramas de la consulta,
+    nunca el conjunto completo de registros.
+    """
+    def __init__(self):
+        self._postings = defaultdict(set)
+        self._grams = {}
+        self._names = {}
+        self._labels = {}
+        self._lock = threading.RLock()
+
+    def __len__(self):
+        return len(self._names)
+
+    def items(self):
+        # [(key, nombre original)] de todos los registros indexados
+        with self._lock:
+            return list(self._labels.items())
+
+    def add(self, key, name):
+        normalized = normalize(name)
+        grams = trigrams(normalized)
+        with self._lock:
+            self.remove(key)
+            if not normalized:
+                return
+            self._names[key] = normalized
+            self._labels[key] = name
+            self._grams[key] = grams
+            for gram in grams:
+                self._postings[gram].add(key)
+
+    def remove(self, key):
+        with self._lock:
+            grams = self._grams.pop(key, None)
+            if grams is None:
+                return
+            self._names.pop(key, None)
+            self._labels.pop(key, None)
+            for gram in grams:
+                keys = self._postings.get(gram)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._postings[gram]
+
+    def search(self, query, limit=10, prefix=False, min_similarity=0.3, keys_filter=None):
+        """
+        Retorna [(key, nombre, similitud)] ordenado de mayor a menor similitud.
+        En modo prefijo cada palabra de la consulta debe ser el inicio de
+        alguna palabra del nombre.
+        """
+        normalized = normalize(query)
+        if not normalized:
+            return []
+        query_grams = trigrams(normalized, prefix=prefix)
+
+        counts = defaultdict(int)
+        with self._lock:
+            for gram in query_grams:
+                for key in self._postings.get(gram, ()):
+                    counts[key] += 1
+            names = {key: self._names[key] for key in counts}
+            labels = {key: self._labels[key] for key in counts}
+            sizes = {key: len(self._grams[key]) for key in counts}
+
+        results = []
+        query_words = normalized.split()
+        for key, shared in counts.items():
+            if keys_filter and not keys_filter(key):
+                continue
+            if prefix:
+                if shared < len(query_grams):
+                    continue
+                words = names[key].split()
+                if not all(any(w.startswith(q) for w in words) for q in query_words):
+                    continue
+                # Los nombres más cortos completan mejor el prefijo
+                score = shared / sizes[key]
+            else:
+                # Promedio entre la similitud de Jaccard con el nombre completo y la
+                # fracción de la consulta encontrada, para que "mesi" encuentre
+                # "Lionel Messi" aunque el nombre tenga varias palabras
+                jaccard = shared / (len(query_grams) + sizes[key] - shared)
+                score = (jaccard + shared / len(query_grams)) / 2
+                if score < min_similarity:
+                    continue
+            results.append((key, labels[key], score))
+
+        results.sort(key=lambda r: (-r[2], names[r[0]]))
+        return results[:limit]
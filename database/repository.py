@@ -1,6 +1,81 @@
+import random
+import secrets
+import threading
+import time
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from contextvars import ContextVar
+from .locks import RWLock
+
+# Vistas activas en el contexto actual (hilo o tarea asyncio), ver RepositoryProvider.snapshot
+_snapshot = ContextVar("repository_snapshot", default=None)
+
+class VersionConflictError(ValueError):
+    """El registro fue modificado por otro escritor desde que se leyó."""
+    def __init__(self, id, expected, current):
+        super().__init__(f"El registro {id} fue modificado por otro proceso "
+                         f"(versión esperada {expected}, actual {current})")
+        self.id = id
+        self.expected = expected
+        self.current = current
+
+
+def field_name(record, field):
+    # Acepta "goals" o "_goals"; record puede ser un objeto o su diccionario serializado
+    names = record.keys() if isinstance(record, dict) else record._serializable_attr
+    if field in names:
+        return field
+    if "_" + field in names:
+        return "_" + field
+    raise ValueError(f"Campo desconocido: {field}")
+
+
+def apply_fields(element, fields):
+    for field, value in fields.items():
+        setattr(element, field_name(element, field), value)
+    return element
+
 
 class Repository(ABC):
+    def __init__(self):
+        self._listeners = []
+        # Lecturas concurrentes, escrituras exclusivas (incluye el read-modify-write)
+        self._lock = RWLock()
+        # Contadores de versión en memoria: por registro y de la colección completa.
+        # El epoch distingue contadores de distintas ejecuciones del proceso.
+        self._epoch = secrets.token_hex(4)
+        self._versions = {}
+        self._generation = 0
+        # Bytes que el almacenamiento realmente leyó y escribió (ver monitoring.metrics)
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self._io_lock = threading.Lock()
+
+    def _count_io(self, read=0, written=0):
+        with self._io_lock:
+            self.bytes_read += read
+            self.bytes_written += written
+
+    def get_version(self, id):
+        return (self._epoch, self._versions.get(id, 0))
+
+    def get_generation(self):
+        return (self._epoch, self._generation)
+
+    def subscribe(self, listener):
+        # listener(event, id, element) se invoca tras cada "save", "replace" o "delete"
+        self._listeners.append(listener)
+
+    def unsubscribe(self, listener):
+        if listener in self._listeners:
+            self._listeners.remove(listener)
+
+    def _notify(self, event, id, element=None):
+        self._versions[id] = self._versions.get(id, 0) + 1
+        self._generation += 1
+        for listener in self._listeners:
+            listener(event, id, element)
+
     @abstractmethod
     def find(self, id):
         pass
@@ -18,18 +93,167 @@ class Repository(ABC):
         pass
 
     @abstractmethod
-    def replace(self, id, element):
+    def replace(self, id, element, expected_version=None):
         pass
 
+    def find_many(self, ids):
+        # Retorna {id: elemento} con los IDs encontrados; las implementaciones
+        # deberían resolverlos con una sola lectura
+        result = {}
+        for id in ids:
+            element = self.find(id)
+            if element is not None:
+                result[id] = element
+        return result
+
+    def save_many(self, elements):
+        # Guarda varios elementos y retorna cuántos se insertaron; los IDs
+        # repetidos se omiten igual que en save. Las implementaciones
+        # deberían escribir el lote de una sola vez.
+        return sum(1 for element in elements if self.save(element))
+
+    def update(self, id, mutate, retries=10):
+        """
+        Read-modify-write optimista: lee el registro, aplica `mutate` y lo
+        reemplaza solo si nadie lo modificó entretanto; si hubo conflicto
+        vuelve a leer y reintenta.
+        """
+        for attempt in range(retries):
+            element = self.find(id)
+            if element is None:
+                return None
+            mutate(element)
+            try:
+                self.replace(id, element, expected_version=getattr(element, "_version", None))
+                return element
+            except VersionConflictError:
+                if attempt == retries - 1:
+                    raise
+                time.sleep(random.uniform(0, 0.002 * (attempt + 1)))
+
+    def _deserialize(self, data):
+        # _version no es un parámetro del constructor, se guarda aparte en el objeto
+        version = data.pop("_version", 0)
+        obj = self.cls.deserialize(data)
+        obj._version = version
+        return obj
+
+    def _modify(self, id, change, expected_version=None):
+        """
+        Read-modify-write de un solo registro serializado bajo el lock de
+        escritura del almacenamiento: verifica expected_version contra la
+        _version guardada, escribe change(record) con la versión siguiente y
+        notifica "replace". Retorna False si el registro no existe.
+        """
+        raise NotImplementedError
+
+    def patch(self, id, fields: dict, expected_version=None):
+        """
+        Actualiza solo los campos indicados ({"goals": 3, "name": "..."})
+        sin leer ni reescribir el resto de la colección.
+        """
+        def change(record):
+            # Solo se deserializa este registro, para convertir valores como
+            # Position o Team a su forma almacenada mediante serialize()
+            version = record.get("_version", 0)
+            serialized = apply_fields(self._deserialize(dict(record)), fields).serialize()
+            serialized["_version"] = version
+            return serialized
+        return self._modify(id, change, expected_version)
+
+    def increment(self, id, field, delta=1):
+        return self.increment_fields(id, {field: delta})
+
+    def increment_fields(self, id, deltas: dict):
+        # Suma atómicamente cada delta a su campo numérico
+        def change(record):
+            for field, delta in deltas.items():
+                name = field_name(record, field)
+                record[name] = (record[name] or 0) + delta
+            return record
+        return self._modify(id, change)
+
 class RepositoryProvider():
     _repositories = {}
+    _async_repositories = {}
+    _factories = {}
+    _register_listeners = []
+    _lock = threading.Lock()
 
     @classmethod
     def register(cls, name: str, repo):
-        cls._repositories[name] = repo
+        with cls._lock:
+            cls._repositories[name] = repo
+            cls._factories.pop(name, None)
+        for listener in list(cls._register_listeners):
+            listener(name, repo)
+
+    @classmethod
+    def register_lazy(cls, name: str, factory):
+        # El repositorio se crea con factory() la primera vez que se pide
+        with cls._lock:
+            cls._repositories.pop(name, None)
+            cls._factories[name] = factory
+
+    @classmethod
+    def _resolve(cls, name):
+        with cls._lock:
+            repo = cls._repositories.get(name)
+            factory = cls._factories.pop(name, None) if repo is None else None
+            if factory is not None:
+                repo = cls._repositories[name] = factory()
+        if factory is not None:
+            for listener in list(cls._register_listeners):
+                listener(name, repo)
+        return repo
+
+    @classmethod
+    def on_register(cls, listener):
+        # listener(name, repo) se invoca con cada repositorio registrado después
+        cls._register_listeners.append(listener)
+
+    @classmethod
+    def off_register(cls, listener):
+        if listener in cls._register_listeners:
+            cls._register_listeners.remove(listener)
 
     @classmethod
     def get(cls, name) -> Repository:
-        if not name in cls._repositories.keys():
+        repo = cls._resolve(name)
+        if repo is None:
+            return None
+        snapshot = _snapshot.get()
+        if snapshot is not None:
+            if name not in snapshot:
+                from .snapshot_repository import SnapshotRepository
+                snapshot[name] = SnapshotRepository(repo)
+            return snapshot[name]
+        return repo
+
+    @classmethod
+    def get_async(cls, name):
+        # Adaptador asíncrono del repositorio registrado (uno por nombre, así
+        # las lecturas concurrentes se agrupan entre todos los servicios)
+        repo = cls._resolve(name)
+        if repo is None:
             return None
-        return cls._repositories[name]
\ No newline at end of file
+        with cls._lock:
+            adapter = cls._async_repositories.get(name)
+            if adapter is None or adapter.repo is not repo:
+                from .async_repository import ExecutorAsyncRepository
+                adapter = cls._async_repositories[name] = ExecutorAsyncRepository(repo)
+            return adapter
+
+    @classmethod
+    @contextmanager
+    def snapshot(cls):
+        # Dentro del bloque, get() retorna vistas en memoria que leen cada
+        # repositorio una sola vez y comparten los objetos cargados
+        if _snapshot.get() is not None:
+            yield
+            return
+        token = _snapshot.set({})
+        try:
+            yield
+        finally:
+            _snapshot.reset(token)
\ No newline at end of file
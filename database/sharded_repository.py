@@ -0,0 +1,379 @@
+from .repository import Repository, VersionConflictError
+from .locks import FileLock
+from . import storage_codecs
+from project import Serializable
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+import json
+import os
+import threading
+import zlib
+
+# Versión del formato del manifiesto
+MANIFEST_FORMAT = 1
+
+
+def shard_of(value, shards):
+    # crc32 y no hash(): el reparto tiene que ser el mismo en todos los procesos
+    return zlib.crc32(str(value if value is not None else "").encode("utf-8")) % shards
+
+
+def _stamp(path):
+    try:
+        stat = os.stat(path)
+        return (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        return None
+
+
+class ShardedRepository(Repository):
+    """
+    Repositorio que reparte los registros de una entidad en `shards` archivos
+    dentro de data/<entidad>s/, según el hash de un campo serializado
+    (`partition`): "_id" por defecto, o por ejemplo "_team" para que los
+    jugadores de un equipo queden juntos. Un manifiesto (manifest.json)
+    indica la generación actual, el número de shards y el campo de
+    partición; al abrir un repositorio existente manda el manifiesto, no los
+    argumentos.
+
+    Las búsquedas por ID leen un solo shard y las escrituras reescriben solo
+    el shard afectado (dos si un registro cambia de valor de partición).
+    Cuando la partición no es el ID se mantiene en memoria un directorio
+    ID -> shard, que se reconstruye si otro proceso modifica algún shard.
+    findAll lee los shards en paralelo.
+
+    La primera vez, si existe el archivo único de JSONRepository
+    (data/<entidad>s.json), sus registros se reparten en los shards; el
+    archivo no se borra, pero deja de actualizarse.
+    """
+    def __init__(self, cls: Serializable, shards=8, partition="_id", codec="json", workers=4):
+        super().__init__()
+        self.cls = cls
+        self.codec = storage_codecs.get_codec(codec)
+        self.workers = workers
+        self.folder = os.path.join("data", f"{cls.__name__.lower()}s")
+        self.legacy_file = self.folder + ".json"
+        self.manifest_file = os.path.join(self.folder, "manifest.json")
+        os.makedirs(self.folder, exist_ok=True)
+        self._file_lock = FileLock(os.path.join(self.folder, "manifest.lock"))
+        self._reshard_lock = FileLock(os.path.join(self.folder, "reshard.lock"))
+        # Excluye a los escritores del proceso durante un reshard sin bloquear a los lectores
+        self._mutation = threading.RLock()
+        self._manifest_cache = None
+        self._directory = None
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        if not os.path.exists(self.manifest_file):
+            self._create(shards, partition)
+
+    @contextmanager
+    def _reading(self):
+        with self._lock.read_lock(), self._file_lock.hold(exclusive=False):
+            yield
+
+    @contextmanager
+    def _writing(self):
+        with self._mutation, self._lock.write_lock(), self._file_lock.hold(exclusive=True):
+            yield
+
+    def _read(self, operation):
+        # Un reshard puede borrar los shards de la generación anterior entre
+        # que se lee el manifiesto y se abren: se reintenta con el nuevo
+        while True:
+            with self._reading():
+                manifest = self._manifest()
+                try:
+                    return operation(manifest)
+                except FileNotFoundError:
+                    if self._manifest()["generation"] == manifest["generation"]:
+                        raise
+
+    def _manifest(self):
+        stamp = _stamp(self.manifest_file)
+        cached = self._manifest_cache
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        with open(self.manifest_file, encoding="utf-8") as f:
+            manifest = json.load(f)
+        self._manifest_cache = (stamp, manifest)
+        return manifest
+
+    def _path(self, manifest, shard):
+        return os.path.join(self.folder, f"shard-{manifest['generation']:04d}-{shard:03d}.json")
+
+    def _target(self, manifest, record):
+        return shard_of(record.get(manifest["partition"]), manifest["shards"])
+
+    def _load(self, path):
+        with open(path, "rb") as f:
+            raw = f.read()
+        self._count_io(read=len(raw))
+        return storage_codecs.decode(raw)
+
+    def _save(self, path, data):
+        tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        raw = storage_codecs.encode(data, self.codec)
+        with open(tmp, "wb") as f:
+            f.write(raw)
+        os.replace(tmp, path)
+        self._count_io(written=len(raw))
+
+    def _map(self, fn, items):
+        # Lee varios shards a la vez: la lectura del archivo y la descompresión
+        # liberan el GIL, el parseo de JSON o marshal no
+        items = list(items)
+        if len(items) < 2 or self.workers < 2:
+            return [fn(item) for item in items]
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="shards")
+        return list(self._executor.map(fn, items))
+
+    def _load_all(self, manifest):
+        return self._map(self._load, [self._path(manifest, i) for i in range(manifest["shards"])])
+
+    def _stamps(self, manifest):
+        return (manifest["generation"],) + tuple(_stamp(self._path(manifest, i)) for i in range(manifest["shards"]))
+
+    def _directory_for(self, manifest):
+        # Directorio ID -> shard cuando la partición no es el ID; se valida con
+        # la marca de cada shard para detectar escrituras de otros procesos
+        stamps = self._stamps(manifest)
+        directory = self._directory
+        if directory is not None and directory[0] == stamps:
+            return directory[1]
+        index = {record["_id"]: shard for shard, records in enumerate(self._load_all(manifest)) for record in records}
+        self._directory = (stamps, index)
+        return index
+
+    def _locate(self, manifest, id):
+        # Shard donde está (o estaría) el registro; None si no existe
+        if manifest["partition"] == "_id":
+            return shard_of(id, manifest["shards"])
+        return self._directory_for(manifest).get(id)
+
+    def _moved(self, manifest, changes):
+        # Tras una escritura propia (bajo el lock de escritura) se actualiza el
+        # directorio y sus marcas en vez de reconstruirlo. changes: {id: shard o None}
+        if manifest["partition"] == "_id" or self._directory is None:
+            return
+        index = self._directory[1]
+        for id, shard in changes.items():
+            if shard is None:
+                index.pop(id, None)
+            else:
+                index[id] = shard
+        self._directory = (self._stamps(manifest), index)
+
+    def _write_generation(self, generation, shards, partition, records):
+        manifest = {"format": MANIFEST_FORMAT, "generation": generation, "shards": shards, "partition": partition}
+        buckets = [[] for _ in range(shards)]
+        for record in records:
+            buckets[shard_of(record.get(partition), shards)].append(record)
+        for shard, bucket in enumerate(buckets):
+            self._save(self._path(manifest, shard), bucket)
+        # El reemplazo atómico del manifiesto es el momento en que la nueva generación pasa a ser la vigente
+        tmp = f"{self.manifest_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp, self.manifest_file)
+        return manifest
+
+    def _create(self, shards, partition):
+        with self._writing():
+            if os.path.exists(self.manifest_file):
+                return
+            records = []
+            if os.path.exists(self.legacy_file):
+                with open(self.legacy_file, "rb") as f:
+                    records = storage_codecs.decode(f.read())
+            self._write_generation(1, shards, partition, records)
+
+    def reshard(self, shards=None, partition=None):
+        """
+        Redistribuye los registros en `shards` archivos según `partition` sin
+        detener las lecturas: se escribe la nueva generación completa y luego
+        se reemplaza el manifiesto. Mientras tanto las escrituras esperan (las
+        de este proceso por _mutation, las de otros por el lock de archivo
+        compartido). Los lectores que alcanzaron a leer el manifiesto anterior
+        y no encuentran sus shards reintentan con el nuevo.
+        """
+        with self._reshard_lock.hold(exclusive=True), self._mutation, self._file_lock.hold(exclusive=False):
+            old = self._manifest()
+            records = [record for shard in self._load_all(old) for record in shard]
+            manifest = self._write_generation(old["generation"] + 1, shards or old["shards"],
+                                              partition or old["partition"], records)
+            self._directory = None
+            for shard in range(old["shards"]):
+                try:
+                    os.remove(self._path(old, shard))
+                except FileNotFoundError:
+                    pass
+        return manifest
+
+    def get_version(self, id):
+        # Con partición por ID basta la marca del shard del registro
+        manifest = self._manifest()
+        if manifest["partition"] == "_id":
+            path = self._path(manifest, shard_of(id, manifest["shards"]))
+            return super().get_version(id) + (manifest["generation"], _stamp(path))
+        return super().get_version(id) + self._stamps(manifest)
+
+    def get_generation(self):
+        return super().get_generation() + self._stamps(self._manifest())
+
+    def find(self, id):
+        def lookup(manifest):
+            shard = self._locate(manifest, id)
+            if shard is None:
+                return None
+            for record in self._load(self._path(manifest, shard)):
+                if record["_id"] == id:
+                    return record
+            return None
+        record = self._read(lookup)
+        return self._deserialize(record) if record is not None else None
+
+    def find_many(self, ids):
+        wanted = set(ids)
+
+        def lookup(manifest):
+            groups = defaultdict(set)
+            for id in wanted:
+                shard = self._locate(manifest, id)
+                if shard is not None:
+                    groups[shard].add(id)
+            shards = list(groups)
+            loaded = self._map(self._load, [self._path(manifest, shard) for shard in shards])
+            return [record for shard, records in zip(shards, loaded) for record in records
+                    if record["_id"] in groups[shard]]
+        return {record["_id"]: self._deserialize(record) for record in self._read(lookup)}
+
+    def findAll(self):
+        shards = self._read(self._load_all)
+        return [self._deserialize(record) for records in shards for record in records]
+
+    def save(self, element):
+        if element == None:
+            return False
+        id = element.get_id()
+        serialized = element.serialize()
+        serialized["_version"] = 1
+        with self._writing():
+            manifest = self._manifest()
+            shard = self._target(manifest, serialized)
+            path = self._path(manifest, shard)
+            if manifest["partition"] != "_id" and id in self._directory_for(manifest):
+                return False
+            data = self._load(path)
+            if any(e["_id"] == id for e in data):
+                return False
+            data.append(serialized)
+            self._save(path, data)
+            self._moved(manifest, {id: shard})
+            element._version = 1
+            self._notify("save", id, element)
+        return True
+
+    def save_many(self, elements):
+        # Una lectura y una escritura por cada shard que recibe registros
+        with self._writing():
+            manifest = self._manifest()
+            known = self._directory_for(manifest) if manifest["partition"] != "_id" else {}
+            batches = defaultdict(list)
+            seen = set()
+            for element in elements:
+                if element is None or element.get_id() in seen or element.get_id() in known:
+                    continue
+                serialized = element.serialize()
+                serialized["_version"] = 1
+                seen.add(element.get_id())
+                batches[self._target(manifest, serialized)].append((element, serialized))
+            saved = []
+            placed = {}
+            for shard, batch in batches.items():
+                path = self._path(manifest, shard)
+                data = self._load(path)
+                ids = {e["_id"] for e in data}
+                batch = [(element, serialized) for element, serialized in batch if serialized["_id"] not in ids]
+                if not batch:
+                    continue
+                data.extend(serialized for _, serialized in batch)
+                self._save(path, data)
+                for element, _ in batch:
+                    saved.append(element)
+                    placed[element.get_id()] = shard
+            self._moved(manifest, placed)
+            for element in saved:
+                element._version = 1
+                self._notify("save", element.get_id(), element)
+        return len(saved)
+
+    def delete(self, id):
+        with self._writing():
+            manifest = self._manifest()
+            shard = self._locate(manifest, id)
+            if shard is None:
+                return
+            path = self._path(manifest, shard)
+            data = self._load(path)
+            new_data = [d for d in data if d["_id"] != id]
+            if len(new_data) != len(data):
+                self._save(path, new_data)
+                self._moved(manifest, {id: None})
+                self._notify("delete", id)
+
+    def _rewrite(self, id, change, expected_version=None):
+        """
+        Read-modify-write de un registro bajo el lock de escritura. Si cambia
+        el campo de partición el registro se mueve de shard: primero se
+        escribe el destino y luego se quita del origen, así una caída a mitad
+        de camino deja un duplicado en vez de perder el registro.
+        """
+        manifest = self._manifest()
+        shard = self._locate(manifest, id)
+        if shard is None:
+            return None
+        path = self._path(manifest, shard)
+        data = self._load(path)
+        for i, d in enumerate(data):
+            if d["_id"] == id:
+                break
+        else:
+            return None
+        current = d.get("_version", 0)
+        if expected_version is not None and current != expected_version:
+            raise VersionConflictError(id, expected_version, current)
+        d = change(d)
+        d["_version"] = current + 1
+        target = self._target(manifest, d)
+        if target == shard:
+            data[i] = d
+        else:
+            destination = self._path(manifest, target)
+            moved = self._load(destination)
+            moved.append(d)
+            self._save(destination, moved)
+            del data[i]
+        self._save(path, data)
+        self._moved(manifest, {id: target})
+        return d
+
+    def replace(self, id, element, expected_version=None):
+        serialized = element.serialize()
+        with self._writing():
+            record = self._rewrite(id, lambda d: serialized, expected_version)
+            if record is None:
+                return False
+            element._version = record["_version"]
+            self._notify("replace", id, element)
+        return True
+
+    def _modify(self, id, change, expected_version=None):
+        with self._writing():
+            record = self._rewrite(id, change, expected_version)
+            if record is None:
+                return False
+            self._notify("replace", id, self._deserialize(dict(record)))
+        return True
@@ -0,0 +1,93 @@
+from .repository import Repository, VersionConflictError
+
+class SnapshotRepository(Repository):
+    """
+    Vista en memoria de un repositorio durante un lote de operaciones.
+    Lee todos los registros una sola vez y resuelve las búsquedas siguientes
+    sin volver a tocar el almacenamiento; las escrituras se delegan al
+    repositorio real y se reflejan en la vista.
+    """
+    def __init__(self, base: Repository):
+        super().__init__()
+        self.base = base
+        self._records = None
+
+    def _all(self):
+        if self._records is None:
+            self._records = {e.get_id(): e for e in self.base.findAll()}
+        return self._records
+
+    def find(self, id):
+        return self._all().get(id)
+
+    def find_many(self, ids):
+        records = self._all()
+        return {id: records[id] for id in ids if id in records}
+
+    def findAll(self):
+        return list(self._all().values())
+
+    def save(self, element):
+        saved = self.base.save(element)
+        if saved and self._records is not None:
+            self._records[element.get_id()] = element
+        return saved
+
+    def save_many(self, elements):
+        elements = list(elements)
+        saved = self.base.save_many(elements)
+        if saved:
+            # Los repetidos no se insertan: se vuelve a leer la colección
+            self._records = None
+        return saved
+
+    def delete(self, id):
+        result = self.base.delete(id)
+        if self._records is not None:
+            self._records.pop(id, None)
+        return result
+
+    def replace(self, id, element, expected_version=None):
+        try:
+            result = self.base.replace(id, element, expected_version)
+        except VersionConflictError:
+            # La vista quedó desactualizada para este registro
+            if self._records is not None:
+                self._records.pop(id, None)
+                fresh = self.base.find(id)
+                if fresh is not None:
+                    self._records[id] = fresh
+            raise
+        if self._records is not None and id in self._records:
+            self._records[id] = element
+        return result
+
+    def _refresh(self, id):
+        if self._records is not None:
+            element = self.base.find(id)
+            if element is not None:
+                self._records[id] = element
+
+    def patch(self, id, fields, expected_version=None):
+        try:
+            return self.base.patch(id, fields, expected_version)
+        finally:
+            self._refresh(id)
+
+    def increment_fields(self, id, deltas):
+        try:
+            return self.base.increment_fields(id, deltas)
+        finally:
+            self._refresh(id)
+
+    def get_version(self, id):
+        return self.base.get_version(id)
+
+    def get_generation(self):
+        return self.base.get_generation()
+
+    def subscribe(self, listener):
+        self.base.subscribe(listener)
+
+    def unsubscribe(self, listener):
+        self.base.unsubscribe(listener)
@@ -0,0 +1,116 @@
+import gzip
+import json
+import lzma
+import marshal
+from abc import ABC, abstractmethod
+
+# Cabecera de los formatos nuevos: MAGIC + largo del nombre (1 byte) + nombre
+# del codec. Empieza con un byte nulo, que ningún JSON válido puede tener, así
+# los archivos antiguos (JSON con indentación, sin cabecera) se siguen leyendo.
+MAGIC = b"\x00SCDB"
+
+
+class Codec(ABC):
+    """
+    Formato de almacenamiento de una colección (lista de dicts). Los codecs
+    base serializan y los compresores (gzip, lzma) envuelven a uno base:
+    "compact+gzip" es JSON compacto comprimido con gzip.
+    """
+    name = None
+    header = True
+
+    @abstractmethod
+    def encode(self, records) -> bytes:
+        pass
+
+    @abstractmethod
+    def decode(self, raw: bytes):
+        pass
+
+
+class PrettyJSONCodec(Codec):
+    # Formato histórico: legible y sin cabecera, para que los archivos sigan siendo JSON
+    name = "json"
+    header = False
+
+    def encode(self, records):
+        return json.dumps(records, indent=2).encode("utf-8")
+
+    def decode(self, raw):
+        return json.loads(raw)
+
+
+class CompactJSONCodec(Codec):
+    name = "compact"
+
+    def encode(self, records):
+        return json.dumps(records, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+
+    def decode(self, raw):
+        return json.loads(raw)
+
+
+class MarshalCodec(Codec):
+    # Binario nativo de Python: los registros son dicts con str/int/float/None/list,
+    # que marshal serializa directamente y carga varias veces más rápido que json
+    name = "marshal"
+
+    def encode(self, records):
+        return marshal.dumps(records)
+
+    def decode(self, raw):
+        return marshal.loads(raw)
+
+
+class CompressedCodec(Codec):
+    def __init__(self, inner: Codec, compressor: str):
+        self.inner = inner
+        self.compressor = compressor
+        self.name = f"{inner.name}+{compressor}"
+
+    def encode(self, records):
+        raw = self.inner.encode(records)
+        if self.compressor == "gzip":
+            return gzip.compress(raw, compresslevel=6, mtime=0)
+        # Cada _save reescribe el archivo completo: el preset por defecto (6)
+        # comprime algo más pero escribe más de diez veces más lento que el 1
+        return lzma.compress(raw, preset=1)
+
+    def decode(self, raw):
+        raw = gzip.decompress(raw) if self.compressor == "gzip" else lzma.decompress(raw)
+        return self.inner.decode(raw)
+
+
+BASE_CODECS = {codec.name: codec for codec in (PrettyJSONCodec(), CompactJSONCodec(), MarshalCodec())}
+COMPRESSORS = ("gzip", "lzma")
+CODEC_NAMES = list(BASE_CODECS) + [f"{base}+{c}" for base in ("compact", "marshal") for c in COMPRESSORS]
+
+
+def get_codec(name) -> Codec:
+    base, _, compressor = name.partition("+")
+    if base not in BASE_CODECS or (compressor and compressor not in COMPRESSORS):
+        raise ValueError(f"Codec desconocido: {name}")
+    codec = BASE_CODECS[base]
+    return CompressedCodec(codec, compressor) if compressor else codec
+
+
+def encode(records, codec: Codec) -> bytes:
+    body = codec.encode(records)
+    if not codec.header:
+        return body
+    name = codec.name.encode("ascii")
+    return MAGIC + bytes([len(name)]) + name + body
+
+
+def detect(raw: bytes) -> tuple:
+    # Retorna (codec, posición donde empieza el contenido)
+    if raw.startswith(MAGIC):
+        size = raw[len(MAGIC)]
+        start = len(MAGIC) + 1
+        return get_codec(raw[start:start + size].decode("ascii")), start + size
+    return BASE_CODECS["json"], 0
+
+
+def decode(raw: bytes):
+    codec, start = detect(raw)
+    return codec.decode(raw[start:] if start else raw)
@@ -0,0 +1,107 @@
+import threading
+from .repository import RepositoryProvider
+
+class UserDirectory:
+    """
+    Índice en memoria que mapea el ID de un usuario al tipo (y repositorio)
+    donde está almacenado. Los tres tipos de usuario comparten el espacio de
+    IDs, así que el directorio también detecta colisiones entre tipos.
+    Las escrituras de este proceso llegan por los listeners; las de otros
+    procesos se detectan con get_generation() de cada repositorio (que
+    incluye la marca del archivo) y el tipo afectado se vuelve a leer.
+    """
+    def __init__(self, type_names):
+        self._entries = {}
+        self._order = list(type_names)
+        self._generations = {}
+        self._lock = threading.Lock()
+        for type_name in type_names:
+            repo = RepositoryProvider.get(type_name)
+            if repo is None:
+                continue
+            self._rebuild(type_name, repo)
+            repo.subscribe(self._listener(type_name, repo))
+
+    def _listener(self, type_name, repo):
+        def on_change(event, id, element):
+            if event == "save":
+                self._add(id, type_name)
+            elif event == "delete":
+                self._remove(id, type_name)
+            # La escritura propia ya está reflejada: no obliga a releer el tipo
+            self._generations[type_name] = repo.get_generation()
+        return on_change
+
+    def _rebuild(self, type_name, repo):
+        # La generación se toma antes de leer: un cambio durante la lectura fuerza otra
+        generation = repo.get_generation()
+        ids = [user.get_id() for user in repo.findAll()]
+        with self._lock:
+            entries = {}
+            for id, types in self._entries.items():
+                kept = [t for t in types if t != type_name]
+                if kept:
+                    entries[id] = kept
+            for id in ids:
+                entries[id] = sorted(entries.get(id, []) + [type_name], key=self._order.index)
+            self._entries = entries
+            self._generations[type_name] = generation
+
+    def _sync(self):
+        for type_name in self._order:
+            repo = RepositoryProvider.get(type_name)
+            if repo is not None and self._generations.get(type_name) != repo.get_generation():
+                self._rebuild(type_name, repo)
+
+    def _add(self, id, type_name):
+        with self._lock:
+            types = self._entries.get(id, [])
+            if type_name not in types:
+                # Se reemplaza la lista en lugar de mutarla para que los lectores
+                # sin lock nunca vean un estado intermedio
+                self._entries[id] = sorted(types + [type_name], key=self._order.index)
+
+    def _remove(self, id, type_name):
+        with self._lock:
+            types = self._entries.get(id)
+            if types and type_name in types:
+                types = [t for t in types if t != type_name]
+                if types:
+                    self._entries[id] = types
+                else:
+                    del self._entries[id]
+
+    def _types(self, id):
+        self._sync()
+        return self._entries.get(id, [])
+
+    def __contains__(self, id):
+        return bool(self._types(id))
+
+    def get_types(self, id):
+        return list(self._types(id))
+
+    def has(self, id, type_name):
+        return type_name in self._types(id)
+
+    def locate(self, id, type_name=None):
+        # Retorna (tipo, repositorio). Si el ID está repetido entre tipos y no se
+        # indica el tipo, se usa el primero según el orden de registro.
+        types = self._types(id)
+        if not types:
+            return None
+        if type_name is None:
+            type_name = types[0]
+        elif type_name not in types:
+            return None
+        return type_name, RepositoryProvider.get(type_name)
+
+    def resolve(self, id, type_name=None):
+        location = self.locate(id, type_name)
+        if location is None:
+            return None
+        return location[1].find(id)
+
+    def collisions(self):
+        self._sync()
+        return {id: list(types) for id, types in self._entries.items() if len(types) > 1}
@@ -1,10 +1,14 @@
-from database.json_repository import JSONRepository
+import argparse
+import atexit
+from database.storage_codecs import CODEC_NAMES
 from database.repository import RepositoryProvider
-from project import User, Player, Referee, Team, ClubMember, Position
+from project import User, Player, Referee, Team, ClubMember, Position, Match, TeamRating
 from services.auth_service import AuthService
 from services.player_service import PlayerManagementService
 from services.team_service import TeamService
 from services.report_service import ReportService
+from services.match_service import MatchService
+from services.search_service import SearchService
 from utils import title_style, default_text, separator, options, WIDTH
 
 
@@ -14,6 +18,8 @@ class MenuSystem:
         self.player_service: PlayerManagementService = PlayerManagementService.get_instance()
         self.team_service: TeamService = TeamService.get_instance()
         self.report_service: ReportService = ReportService.get_instance()
+        self.match_service: MatchService = MatchService.get_instance()
+        self.search_service: SearchService = SearchService.get_instance()
 
     def main_menu(self):
         while True:
@@ -252,11 +258,11 @@ class MenuSystem:
             print(default_text(f"Nombre: {team.get_name()}"))
             
             # Obtener jugadores del equipo
-            all_players = self.player_service.get_all_players(team.get_id())
+            all_players = self.team_service.get_team_players(team.get_id())
             print("\n" + default_text("Compañeros de equipo:"))
             for teammate in all_players:
-                if teammate.get('_id') != player.get_id():
-                    print(default_text(f"- {teammate.get('_name')} ({teammate.get('_position')})"))
+                if teammate.get_id() != player.get_id():
+                    print(default_text(f"- {teammate.get_name()} ({teammate.serialize().get('_position')})"))
             print(separator())
         except Exception as e:
             print(default_text(f"Error al obtener información del equipo: {e}"))
@@ -284,7 +290,7 @@ class MenuSystem:
         
         if updates:
             try:
-                self.player_service.update_player_profile(**updates)
+                self.player_service.update_player_profile(updates=updates)
                 print(default_text("Perfil actualizado con éxito"))
                 # Actualizar el objeto player local
                 if name:
@@ -345,7 +351,7 @@ class MenuSystem:
             return
         try:
             players = self.player_service.get_all_players()
-            if len(players):
+            if not players:
                 print(default_text("El equipo no tiene jugadores."))
                 input(default_text("Presiona Enter para continuar..."))
                 return
@@ -360,11 +366,27 @@ class MenuSystem:
             print(default_text(f"Error: {e}"))
         input(default_text("Presiona Enter para continuar..."))
 
+    def select_player(self, query):
+        # Acepta un ID exacto o un nombre aproximado ("mesi", "maldi")
+        if self.auth_service.players_repo.find(query):
+            return query
+        results = self.search_service.search_by_name(query, types=["Player"], prefix=len(query) < 4)
+        if not results:
+            return query
+        if len(results) == 1:
+            return results[0]["_id"]
+        print(default_text("Jugadores encontrados:"))
+        choice = options(*[f"{r['_name']} ({r['_id']})" for r in results], center=True)
+        if not choice.isdigit() or not 1 <= int(choice) <= len(results):
+            raise ValueError("Opción inválida")
+        return results[int(choice) - 1]["_id"]
+
     def view_specific_player_stats(self):
     
-        player_id = input("ID del jugador: ".center(WIDTH)).strip()
+        query = input("ID o nombre del jugador: ".center(WIDTH)).strip()
         
         try:
+            player_id = self.select_player(query)
             stats = self.player_service.get_player_stats(player_id)
             print("\n" + separator())
             print(title_style(f"ESTADÍSTICAS DE {stats.get('_name', 'N/A')}"))
@@ -461,6 +483,7 @@ class MenuSystem:
                     "Ver información de cualquier equipo",
                     "Ver todos los jugadores",
                     "Buscar jugadores con filtros",
+                    "Validar partido",
                     "Ver mi perfil",
                     "Cerrar sesión",
                     center=True
@@ -475,8 +498,10 @@ class MenuSystem:
                 elif opcion == "4":
                     self.search_players_with_filters()
                 elif opcion == "5":
-                    self.view_referee_profile(referee)
+                    self.validate_match()
                 elif opcion == "6":
+                    self.view_referee_profile(referee)
+                elif opcion == "7":
                     self.auth_service.logout()
                     print(default_text("Sesión cerrada"))
                     break
@@ -487,9 +512,10 @@ class MenuSystem:
                 input(default_text("Presiona Enter para continuar..."))
 
     def view_any_player_stats(self):
-        player_id = input("ID del jugador: ".center(WIDTH)).strip()
+        query = input("ID o nombre del jugador: ".center(WIDTH)).strip()
         
         try:
+            player_id = self.select_player(query)
             stats = self.player_service.get_player_stats(player_id)
             print(stats)
             print("\n" + separator())
@@ -572,6 +598,29 @@ class MenuSystem:
             print(default_text(f"Error: {e}"))
         input(default_text("Presiona Enter para continuar..."))
 
+    def validate_match(self):
+        print("\n" + separator())
+        print(title_style("VALIDAR PARTIDO"))
+        print(separator())
+
+        try:
+            pending = self.match_service.get_matches("finished")
+            if not pending:
+                print(default_text("No hay partidos pendientes de validar"))
+                input(default_text("Presiona Enter para continuar..."))
+                return
+            for match in pending:
+                print(default_text(f"{match.get_id()}: {match.get_home_team()} {match.get_home_score()} - "
+                                   f"{match.get_away_score()} {match.get_away_team()}"))
+            match_id = input("ID del partido: ".center(WIDTH)).strip()
+            if self.match_service.validate_match(match_id):
+                print(default_text("Partido validado con éxito"))
+            else:
+                print(default_text("Partido no encontrado"))
+        except Exception as e:
+            print(default_text(f"Error: {e}"))
+        input(default_text("Presiona Enter para continuar..."))
+
     def view_referee_profile(self, referee: Referee):
         print("\n" + separator())
         print(title_style("MI PERFIL"))
@@ -584,17 +633,68 @@ class MenuSystem:
         input(default_text("Presiona Enter para continuar..."))
 
 
-def main():
-    players_repo = JSONRepository(Player)
-    club_members_repo = JSONRepository(ClubMember)
-    teams_repo = JSONRepository(Team)
-    referee_repo = JSONRepository(Referee)
+MENU_LOOPS = ("main_menu", "register_flow", "login_flow", "player_menu", "club_member_menu", "referee_menu")
+
+
+REPOSITORIES = {"Player": Player, "Team": Team, "ClubMember": ClubMember, "Referee": Referee,
+                "Match": Match, "TeamRating": TeamRating}
+
+
+# Campo por el que se reparten en shards las entidades que no se reparten por ID
+SHARD_PARTITIONS = {"Player": "_team", "ClubMember": "_team"}
+
 
-    RepositoryProvider.register("Player", players_repo)
-    RepositoryProvider.register("Team", teams_repo)
-    RepositoryProvider.register("ClubMember", club_members_repo)
-    RepositoryProvider.register("Referee", referee_repo)
+def _repository_factory(name, cls, warm_cache, codec, shards, lsm):
+    # El módulo del backend se importa al abrir el repositorio, no al importar main
+    def open_repository():
+        if lsm:
+            from database.lsm_repository import LSMRepository
+            return LSMRepository(cls)
+        if shards:
+            from database.sharded_repository import ShardedRepository
+            return ShardedRepository(cls, shards, SHARD_PARTITIONS.get(name, "_id"), codec)
+        from database.json_repository import JSONRepository
+        return JSONRepository(cls, warm_cache, codec)
+    return open_repository
+
+
+def setup_repositories(lazy=True, warm_cache=False, codec="json", shards=None, lsm=False):
+    # En modo lazy cada repositorio se abre la primera vez que se usa, así
+    # una invocación corta solo paga por los archivos que realmente lee
+    for name, cls in REPOSITORIES.items():
+        factory = _repository_factory(name, cls, warm_cache, codec, shards, lsm)
+        if lazy:
+            RepositoryProvider.register_lazy(name, factory)
+        else:
+            RepositoryProvider.register(name, factory())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sistema de scouting de fútbol")
+    parser.add_argument("--metrics", metavar="ARCHIVO", help="Instrumenta la aplicación y escribe las métricas (Prometheus) al salir")
+    parser.add_argument("--trace", metavar="ARCHIVO", help="Escribe una traza JSONL por cada acción del menú")
+    parser.add_argument("--profile-memory", metavar="ARCHIVO", help="Perfil de memoria por operación (tracemalloc) al salir, en JSON")
+    parser.add_argument("--warm-cache", action="store_true", help="Usa una caché binaria de los registros para arrancar más rápido")
+    parser.add_argument("--codec", default="json", choices=CODEC_NAMES, help="Formato con el que se escriben los archivos de datos")
+    parser.add_argument("--shards", type=int, metavar="N", help="Reparte cada entidad en N archivos (data/<entidad>s/)")
+    parser.add_argument("--lsm", action="store_true", help="Usa el motor LSM (data/<entidad>s.lsm/), para muchas escrituras")
+    args = parser.parse_args()
 
+    setup_repositories(warm_cache=args.warm_cache, codec=args.codec, shards=args.shards, lsm=args.lsm)
+    if args.metrics:
+        from monitoring import metrics
+        metrics.enable()
+        atexit.register(metrics.write_prometheus, args.metrics)
+    if args.trace:
+        from monitoring import hooks, tracing
+        # Cada opción del menú es una traza; los bucles de menú no, porque
+        # contendrían toda la sesión
+        hooks.register_class("menu", MenuSystem, skip=MENU_LOOPS)
+        tracing.enable(args.trace)
+    if args.profile_memory:
+        from monitoring import profiling
+        profiling.enable()
+        atexit.register(profiling.write_report, args.profile_memory)
     menu_system = MenuSystem()
     menu_system.main_menu()
 
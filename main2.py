@@ -270,7 +270,7 @@ class MenuSystem:
                 return
         
         if updates:
-            self.player_service.update_player_profile(player.get_id(), **updates)
+            self.player_service.update_player_profile(player.get_id(), updates)
             print(default_text("Perfil actualizado con éxito"))
         else:
             print(default_text("No se realizaron cambios"))
@@ -0,0 +1,141 @@
+import functools
+import importlib
+import threading
+from database.repository import RepositoryProvider
+
+# Métodos instrumentados en cada repositorio registrado (los que existan)
+REPOSITORY_METHODS = ("_load", "_save", "find", "find_many", "findAll", "save", "save_many", "replace",
+                      "delete", "update", "patch", "increment_fields")
+# Servicios instrumentados: se envuelven sus métodos públicos a nivel de clase
+SERVICES = (
+    ("services.auth_service", "AuthService"),
+    ("services.player_service", "PlayerManagementService"),
+    ("services.team_service", "TeamService"),
+    ("services.report_service", "ReportService"),
+    ("services.match_service", "MatchService"),
+    ("services.search_service", "SearchService"),
+    ("services.rating_service", "RatingService"),
+    ("services.schedule_service", "ScheduleService"),
+    ("services.batch_service", "BatchService"),
+    ("services.cached_read_service", "CachedReadService"),
+)
+
+_MISSING = object()
+_lock = threading.RLock()
+_probes = []
+_active = ()
+_installed = []
+_classes = []
+
+
+class Probe:
+    """
+    Observador de llamadas instrumentadas. before() se ejecuta al entrar y
+    su valor de retorno se entrega a after() al salir, junto con la
+    excepción lanzada (o None).
+    """
+    def before(self, component, target, method, instance):
+        return None
+
+    def after(self, state, error):
+        pass
+
+
+def add_probe(probe):
+    """
+    Activa un probe. Los métodos solo se envuelven mientras haya al menos
+    un probe activo: sin probes el código no pasa por ningún wrapper y la
+    instrumentación no tiene costo.
+    """
+    global _active
+    with _lock:
+        if probe in _probes:
+            return
+        _probes.append(probe)
+        _active = tuple(_probes)
+        if len(_probes) == 1:
+            _install()
+
+
+def remove_probe(probe):
+    global _active
+    with _lock:
+        if probe not in _probes:
+            return
+        _probes.remove(probe)
+        _active = tuple(_probes)
+        if not _probes:
+            _uninstall()
+
+
+def register_class(component, cls, skip=()):
+    """
+    Agrega una clase cuyos métodos públicos se instrumentan igual que los
+    servicios (por ejemplo MenuSystem con component="menu"). `skip` excluye
+    métodos que no deben medirse como una operación, como los bucles de menú.
+    """
+    with _lock:
+        _classes.append((component, cls, tuple(skip)))
+        if _probes:
+            _instrument_class(component, cls, skip)
+
+
+def _wrap(component, target, method, original, instance=None):
+    @functools.wraps(original)
+    def wrapper(*args, **kwargs):
+        probes = _active
+        states = [probe.before(component, target, method, instance) for probe in probes]
+        error = None
+        try:
+            return original(*args, **kwargs)
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            for probe, state in zip(reversed(probes), reversed(states)):
+                probe.after(state, error)
+    wrapper.__instrumented__ = True
+    return wrapper
+
+
+def _patch(owner, name, wrapper):
+    previous = vars(owner).get(name, _MISSING)
+    setattr(owner, name, wrapper)
+    _installed.append((owner, name, previous))
+
+
+def _instrument_repository(name, repo):
+    with _lock:
+        if not _probes or any(owner is repo for owner, _, _ in _installed):
+            return
+        for method in REPOSITORY_METHODS:
+            original = getattr(repo, method, None)
+            if original is not None and not getattr(original, "__instrumented__", False):
+                _patch(repo, method, _wrap("repository", name, method, original, repo))
+
+
+def _install():
+    for name, repo in list(RepositoryProvider._repositories.items()):
+        _instrument_repository(name, repo)
+    RepositoryProvider.on_register(_instrument_repository)
+    for module_name, class_name in SERVICES:
+        _instrument_class("service", getattr(importlib.import_module(module_name), class_name))
+    for component, cls, skip in _classes:
+        _instrument_class(component, cls, skip)
+
+
+def _instrument_class(component, cls, skip=()):
+    for method, original in list(vars(cls).items()):
+        if method.startswith("_") or method == "get_instance" or method in skip or not callable(original):
+            continue
+        _patch(cls, method, _wrap(component, cls.__name__, method, original))
+
+
+def _uninstall():
+    RepositoryProvider.off_register(_instrument_repository)
+    while _installed:
+        owner, name, previous = _installed.pop()
+        if previous is _MISSING:
+            delattr(owner, name)
+        else:
+            setattr(owner, name, previous)
@@ -0,0 +1,179 @@
+import bisect
+import os
+import threading
+import time
+from database.repository import RepositoryProvider
+from .hooks import Probe, add_probe, remove_probe
+
+# Límites (segundos) de los buckets de latencia, al estilo de Prometheus
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class Histogram:
+    def __init__(self, buckets=BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # El último es +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+class Metrics(Probe):
+    """
+    Probe que acumula por operación (componente, destino, método) el número
+    de llamadas y errores y un histograma de latencias. Los bytes leídos y
+    escritos los cuenta cada repositorio (ver storage_io).
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.calls = {}
+        self.errors = {}
+        self.latency = {}
+
+    def before(self, component, target, method, instance):
+        return component, target, method, instance, time.perf_counter()
+
+    def after(self, state, error):
+        component, target, method, instance, start = state
+        elapsed = time.perf_counter() - start
+        key = (component, target, method)
+        with self._lock:
+            self.calls[key] = self.calls.get(key, 0) + 1
+            if error is not None:
+                self.errors[key] = self.errors.get(key, 0) + 1
+            histogram = self.latency.get(key)
+            if histogram is None:
+                histogram = self.latency[key] = Histogram()
+            histogram.observe(elapsed)
+
+    def reset(self):
+        with self._lock:
+            self.calls.clear()
+            self.errors.clear()
+            self.latency.clear()
+
+
+_metrics = None
+
+
+def enable():
+    global _metrics
+    if _metrics is None:
+        _metrics = Metrics()
+        add_probe(_metrics)
+    return _metrics
+
+
+def disable():
+    global _metrics
+    if _metrics is not None:
+        remove_probe(_metrics)
+        _metrics = None
+
+
+def get_metrics():
+    return _metrics
+
+
+def caches():
+    """
+    Cachés con contadores hits/misses: la de respuestas de CachedReadService
+    y cualquier repositorio (síncrono o asíncrono) que los exponga.
+    """
+    found = {}
+    from services.cached_read_service import CachedReadService
+    if CachedReadService._instance is not None:
+        found["responses"] = CachedReadService._instance.cache
+    for name, repo in list(RepositoryProvider._repositories.items()):
+        if hasattr(repo, "hits") and hasattr(repo, "misses"):
+            found[f"repository:{name}"] = repo
+    for name, repo in list(RepositoryProvider._async_repositories.items()):
+        found[f"single_flight:{name}"] = repo
+    return found
+
+
+def storage_io():
+    """
+    Bytes leídos y escritos por cada repositorio registrado, contados por el
+    propio repositorio según lo que realmente pasa por el almacenamiento:
+    la caché binaria en modo warm, el archivo ya codificado (comprimido o
+    no), cada shard, el WAL y los segmentos LSM.
+    """
+    return {name: (repo.bytes_read, repo.bytes_written)
+            for name, repo in list(RepositoryProvider._repositories.items())
+            if hasattr(repo, "bytes_read")}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items())
+
+
+def export_prometheus(metrics=None):
+    # Formato de texto de Prometheus (versión 0.0.4)
+    metrics = metrics or _metrics
+    lines = []
+    if metrics is not None:
+        with metrics._lock:
+            calls = dict(metrics.calls)
+            errors = dict(metrics.errors)
+            latency = {k: (list(h.cumulative()), h.sum, h.count) for k, h in metrics.latency.items()}
+
+        lines += ["# HELP app_calls_total Llamadas por operación",
+                  "# TYPE app_calls_total counter"]
+        for (component, target, method), value in sorted(calls.items()):
+            lines.append(f"app_calls_total{{{_labels(component=component, target=target, method=method)}}} {value}")
+        lines += ["# HELP app_errors_total Llamadas que terminaron con excepción",
+                  "# TYPE app_errors_total counter"]
+        for (component, target, method), value in sorted(errors.items()):
+            lines.append(f"app_errors_total{{{_labels(component=component, target=target, method=method)}}} {value}")
+        lines += ["# HELP app_call_duration_seconds Latencia por operación",
+                  "# TYPE app_call_duration_seconds histogram"]
+        for (component, target, method), (buckets, total, count) in sorted(latency.items()):
+            labels = _labels(component=component, target=target, method=method)
+            for bound, cumulative in buckets:
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'app_call_duration_seconds_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f"app_call_duration_seconds_sum{{{labels}}} {total}")
+            lines.append(f"app_call_duration_seconds_count{{{labels}}} {count}")
+
+    io = storage_io()
+    lines += ["# HELP app_bytes_read_total Bytes leídos del almacenamiento por los repositorios",
+              "# TYPE app_bytes_read_total counter"]
+    lines += [f"app_bytes_read_total{{{_labels(target=name)}}} {read}" for name, (read, _) in sorted(io.items())]
+    lines += ["# HELP app_bytes_written_total Bytes escritos en el almacenamiento por los repositorios",
+              "# TYPE app_bytes_written_total counter"]
+    lines += [f"app_bytes_written_total{{{_labels(target=name)}}} {written}"
+              for name, (_, written) in sorted(io.items())]
+
+    found = caches()
+    lines += ["# HELP app_cache_hits_total Aciertos de caché", "# TYPE app_cache_hits_total counter"]
+    lines += [f"app_cache_hits_total{{{_labels(cache=name)}}} {cache.hits}" for name, cache in sorted(found.items())]
+    lines += ["# HELP app_cache_misses_total Fallos de caché", "# TYPE app_cache_misses_total counter"]
+    lines += [f"app_cache_misses_total{{{_labels(cache=name)}}} {cache.misses}" for name, cache in sorted(found.items())]
+    lines += ["# HELP app_cache_hit_ratio Proporción de aciertos", "# TYPE app_cache_hit_ratio gauge"]
+    for name, cache in sorted(found.items()):
+        total = cache.hits + cache.misses
+        lines.append(f"app_cache_hit_ratio{{{_labels(cache=name)}}} {cache.hits / total if total else 0.0}")
+    return "\n".join(lines) + "\n"
+
+
+def write_prometheus(path, metrics=None):
+    # Escritura atómica para que un recolector (node_exporter textfile) nunca lea un archivo a medias
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w") as f:
+        f.write(export_prometheus(metrics))
+    os.replace(tmp, path)
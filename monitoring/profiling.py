@@ -0,0 +1,182 @@
+import json
+import threading
+import tracemalloc
+from . import hooks
+from .hooks import Probe, add_probe, remove_probe
+
+
+class OperationMemory:
+    def __init__(self):
+        self.calls = 0
+        self.peak_max = 0
+        self.peak_total = 0
+        self.net_bytes = 0
+        self.net_blocks = 0
+        # Llamadas con snapshot: solo en ellas se pueden contar bloques
+        self.sampled = 0
+        self.sites = {}
+
+    def to_dict(self, top=10):
+        sites = sorted(self.sites.items(), key=lambda item: -item[1][0])[:top]
+        result = {"calls": self.calls, "peak_max_kb": self.peak_max / 1024,
+                  "peak_mean_kb": self.peak_total / self.calls / 1024 if self.calls else 0.0,
+                  "net_kb": self.net_bytes / 1024,
+                  "sites": [{"site": site, "kb": size / 1024, "blocks": count} for site, (size, count) in sites]}
+        # net_blocks solo se informa si cubre las mismas llamadas que net_kb
+        if self.sampled == self.calls:
+            result["net_blocks"] = self.net_blocks
+        return result
+
+
+class MemoryProfiler(Probe):
+    """
+    Probe que atribuye memoria a cada operación instrumentada con tracemalloc:
+    - pico: memoria máxima sobre la del inicio mientras dura la operación
+      (incluye lo que se libera antes de terminar, como los dicts crudos
+      de _load durante un findAll);
+    - neto: memoria que sigue asignada al salir y, con snapshot, los bloques;
+    - sitios: líneas que más memoria neta asignaron, comparando snapshots.
+    Los snapshots son costosos, así que solo se toman hasta `site_depth`
+    niveles de anidamiento (2: la operación y sus llamadas directas, como
+    findAll y su _load); una operación que se ejecutó más abajo alguna vez
+    no informa net_blocks ni tiene todos sus sitios. El pico de tracemalloc es global al proceso: con
+    varios hilos a la vez la atribución es aproximada.
+    """
+    def __init__(self, frames=1, site_depth=2):
+        self.frames = frames
+        self.site_depth = site_depth
+        self.operations = {}
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._owns_tracing = False
+        # Las asignaciones de tracemalloc y de la propia instrumentación no cuentan como sitios
+        self._filters = tuple(tracemalloc.Filter(False, path) for path in (tracemalloc.__file__, __file__, hooks.__file__))
+
+    def start(self):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._owns_tracing = True
+
+    def stop(self):
+        if self._owns_tracing:
+            tracemalloc.stop()
+            self._owns_tracing = False
+
+    def _stack(self):
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def before(self, component, target, method, instance):
+        if not tracemalloc.is_tracing():
+            return None
+        stack = self._stack()
+        current, peak = tracemalloc.get_traced_memory()
+        # El pico se reinicia para medir esta operación: antes se traslada al padre
+        if stack:
+            stack[-1]["peak"] = max(stack[-1]["peak"], peak)
+        snapshot = None
+        overhead = 0
+        if len(stack) < self.site_depth:
+            snapshot = self._snapshot()
+            # El snapshot sigue vivo durante la operación: no se le cobra al padre
+            overhead = tracemalloc.get_traced_memory()[0] - current
+            current += overhead
+        tracemalloc.reset_peak()
+        frame = {"key": (component, target, method), "start": current, "peak": current,
+                 "snapshot": snapshot, "overhead": overhead}
+        stack.append(frame)
+        return frame
+
+    def after(self, frame, error):
+        if frame is None or not tracemalloc.is_tracing():
+            return
+        current, peak = tracemalloc.get_traced_memory()
+        frame_peak = max(frame["peak"], peak)
+        sites = []
+        blocks = None
+        if frame["snapshot"] is not None:
+            diff = self._snapshot().compare_to(frame["snapshot"], "lineno")
+            sites = [(f"{s.traceback[0].filename}:{s.traceback[0].lineno}", s.size_diff, s.count_diff)
+                     for s in diff if s.size_diff > 0]
+            blocks = sum(s.count_diff for s in diff)
+            frame["snapshot"] = diff = None
+        stack = self._stack()
+        if stack and stack[-1] is frame:
+            stack.pop()
+        if stack:
+            stack[-1]["peak"] = max(stack[-1]["peak"], frame_peak - frame["overhead"])
+        # Descarta del pico lo asignado por los snapshots de esta operación
+        tracemalloc.reset_peak()
+        with self._lock:
+            op = self.operations.get(frame["key"])
+            if op is None:
+                op = self.operations[frame["key"]] = OperationMemory()
+            op.calls += 1
+            op.peak_max = max(op.peak_max, frame_peak - frame["start"])
+            op.peak_total += frame_peak - frame["start"]
+            op.net_bytes += current - frame["start"]
+            if blocks is not None:
+                op.sampled += 1
+                op.net_blocks += blocks
+            for site, size, count in sites:
+                total = op.sites.setdefault(site, [0, 0])
+                total[0] += size
+                total[1] += count
+
+    def _snapshot(self):
+        return tracemalloc.take_snapshot().filter_traces(self._filters)
+
+    def report(self, top=10):
+        with self._lock:
+            return {f"{target}.{method}": dict(op.to_dict(top), component=component)
+                    for (component, target, method), op in self.operations.items()}
+
+
+def print_report(report, top=5, baseline=None):
+    print(f"{'operación':<44}{'llamadas':>9}{'pico máx KB':>13}{'pico prom KB':>14}{'neto KB':>11}"
+          + (f"{'Δ pico':>10}" if baseline else ""))
+    for name, op in sorted(report.items(), key=lambda item: -item[1]["peak_max_kb"]):
+        line = (f"{name:<44}{op['calls']:>9}{op['peak_max_kb']:>13.1f}{op['peak_mean_kb']:>14.1f}"
+                f"{op['net_kb']:>11.1f}")
+        if baseline:
+            before = baseline.get(name, {}).get("peak_max_kb")
+            line += f"{(op['peak_max_kb'] - before) / before:>+10.1%}" if before else f"{'nuevo':>10}"
+        print(line)
+    for name, op in sorted(report.items(), key=lambda item: -item[1]["peak_max_kb"]):
+        if not op["sites"]:
+            continue
+        print(f"\n{name}")
+        for site in op["sites"][:top]:
+            print(f"  {site['kb']:>10.1f} KB {site['blocks']:>8} bloques  {site['site']}")
+
+
+_profiler = None
+
+
+def enable(frames=1, site_depth=2):
+    global _profiler
+    if _profiler is None:
+        _profiler = MemoryProfiler(frames, site_depth)
+        _profiler.start()
+        add_probe(_profiler)
+    return _profiler
+
+
+def disable():
+    global _profiler
+    if _profiler is not None:
+        remove_probe(_profiler)
+        _profiler.stop()
+        _profiler = None
+
+
+def get_profiler():
+    return _profiler
+
+
+def write_report(path, top=10):
+    if _profiler is not None:
+        with open(path, "w") as f:
+            json.dump({"operations": _profiler.report(top)}, f, indent=2)
@@ -0,0 +1,130 @@
+import json
+import secrets
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from .hooks import Probe, add_probe, remove_probe
+
+# Componentes que abren una traza nueva; el resto solo se registra dentro de una
+ROOT_COMPONENTS = ("menu", "api")
+
+_current = ContextVar("current_span", default=None)
+
+
+class Span:
+    def __init__(self, component, target, method, parent=None):
+        self.component = component
+        self.target = target
+        self.method = method
+        self.parent = parent
+        self.id = secrets.token_hex(4)
+        self.start = time.perf_counter()
+        self.end = None
+        self.error = None
+        self.attrs = {}
+        if parent is None:
+            self.trace_id = secrets.token_hex(8)
+            self.wall_start = time.time()
+            self.spans = []
+        else:
+            self.trace_id = parent.trace_id
+            self.spans = parent.spans
+        self.spans.append(self)
+
+    def finish(self, error=None):
+        self.end = time.perf_counter()
+        if error is not None:
+            self.error = type(error).__name__
+
+    def to_dict(self, origin):
+        return {"id": self.id, "parent": self.parent.id if self.parent else None,
+                "component": self.component, "target": self.target, "method": self.method,
+                "start_ms": (self.start - origin) * 1000, "duration_ms": (self.end - self.start) * 1000,
+                "error": self.error, **({"attrs": self.attrs} if self.attrs else {})}
+
+
+class Tracer(Probe):
+    """
+    Probe que arma un árbol de spans por acción de MenuSystem o petición a
+    la API: cada llamada instrumentada dentro de la acción es un span hijo
+    de la llamada que la contiene. Al terminar la raíz se escribe la traza
+    completa como una línea JSON, con el total de llamadas a _load.
+    """
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def before(self, component, target, method, instance):
+        parent = _current.get()
+        if parent is None and component not in ROOT_COMPONENTS:
+            return None
+        span = Span(component, target, method, parent)
+        return span, _current.set(span)
+
+    def after(self, state, error):
+        if state is None:
+            return
+        span, token = state
+        span.finish(error)
+        _current.reset(token)
+        if span.parent is None:
+            self.write(span)
+
+    def write(self, root):
+        spans = [s for s in root.spans if s.end is not None]
+        record = {
+            "trace_id": root.trace_id,
+            "name": f"{root.target}.{root.method}",
+            "component": root.component,
+            "timestamp": root.wall_start,
+            "duration_ms": (root.end - root.start) * 1000,
+            "load_calls": sum(1 for s in spans if s.method == "_load"),
+            "error": root.error,
+            "attrs": root.attrs,
+            "spans": [s.to_dict(root.start) for s in spans],
+        }
+        line = json.dumps(record, default=str)
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+
+_tracer = None
+
+
+def enable(path):
+    global _tracer
+    if _tracer is None:
+        _tracer = Tracer(path)
+        add_probe(_tracer)
+    return _tracer
+
+
+def disable():
+    global _tracer
+    if _tracer is not None:
+        remove_probe(_tracer)
+        _tracer = None
+
+
+@contextmanager
+def root(component, target, method):
+    """
+    Abre explícitamente un span (raíz si no hay uno activo), por ejemplo
+    por petición HTTP. Si el tracing está desactivado no hace nada y
+    entrega None.
+    """
+    tracer = _tracer
+    if tracer is None:
+        yield None
+        return
+    state = tracer.before(component, target, method, None)
+    error = None
+    try:
+        yield state[0] if state else None
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        tracer.after(state, error)
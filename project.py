@@ -204,6 +204,15 @@ class ClubMember(User):
             teams_repo = RepositoryProvider.get("Team")
             self._team = teams_repo.find(self._team)
         return self._team
+
+    def get_team_id(self):
+        """
+        Retorna el ID del equipo sin consultar el repositorio.
+        
+        Returns:
+        str: ID del equipo o None si no tiene
+        """
+        return self._team.get_id() if isinstance(self._team, Team) else self._team
     
     def set_team(self, team):
         """
@@ -255,8 +264,9 @@ class Referee(User):
     
     Attributes:
     _license (str): Número de licencia único que identifica al árbitro
+    _club (str): ID del equipo con el que el árbitro tiene conflicto de interés
     """
-    def __init__(self, id, name, age, password=None, license=None):
+    def __init__(self, id, name, age, password=None, license=None, club=None):
         """
         Constructor de Referee.
         
@@ -266,10 +276,12 @@ class Referee(User):
         age (int): Edad
         password (str, optional): Contraseña
         license (str, optional): Número de licencia único
+        club (str, optional): ID del equipo con conflicto de interés
         """
         super().__init__(id, name, age, password)
         self._license = license
-        self._serializable_attr += ["_license"]
+        self._club = club
+        self._serializable_attr += ["_license", "_club"]
 
     def get_license(self):
         """Retorna el número de licencia del árbitro."""
@@ -284,6 +296,19 @@ class Referee(User):
         """
         self._license = license
 
+    def get_club(self):
+        """Retorna el ID del equipo con el que el árbitro tiene conflicto."""
+        return self._club
+
+    def set_club(self, club):
+        """
+        Actualiza el equipo con el que el árbitro tiene conflicto.
+        
+        Args:
+        club (str): ID del equipo
+        """
+        self._club = club
+
 
 # -------------------------------
 # Team
@@ -357,16 +382,34 @@ class Team(Serializable):
         Retorna la lista de jugadores del equipo.
         
         Si los jugadores están almacenados como IDs, los convierte en
-        objetos Player consultando el repositorio (lazy loading).
+        objetos Player consultando el repositorio (lazy loading). Todos los
+        IDs se resuelven en una sola consulta al repositorio.
         
         Returns:
         list: Lista de objetos Player
         """
-        if self.players and isinstance(self.players[0], str):
-            players_repo = RepositoryProvider.get("Player")
-            self.players = [players_repo.find(player) for player in self.players]
+        self.players = self._resolve(self.players, "Player")
         return self.players
 
+    def _resolve(self, members, repo_name):
+        """
+        Convierte los IDs de una relación en objetos con una única llamada
+        a find_many. Los IDs que ya no existen se descartan.
+        
+        Args:
+        members (list): IDs u objetos ya cargados
+        repo_name (str): Nombre del repositorio registrado
+            
+        Returns:
+        list: Lista de objetos
+        """
+        ids = [m for m in members if isinstance(m, str)]
+        if not ids:
+            return members
+        found = RepositoryProvider.get(repo_name).find_many(ids)
+        return [found.get(m) if isinstance(m, str) else m for m in members
+                if not isinstance(m, str) or m in found]
+
     def add_player(self, player):
         """
         Agrega un jugador al equipo.
@@ -397,11 +440,35 @@ class Team(Serializable):
         Returns:
         list: Lista de objetos ClubMember
         """
-        if self.staff and isinstance(self.staff[0], str):
-            players_repo = RepositoryProvider.get("ClubMember")
-            self.players = [players_repo.find(player) for player in self.players]
+        self.staff = self._resolve(self.staff, "ClubMember")
         return self.staff
 
+    def load_graph(self):
+        """
+        Carga de forma anticipada jugadores, staff y entrenador del equipo.
+        
+        Pensado para pantallas de plantilla: resuelve cada relación con una
+        consulta por repositorio (en lugar de una por miembro) y enlaza cada
+        miembro con este mismo objeto Team para que get_team() no vuelva a
+        consultar el repositorio.
+        
+        Returns:
+        Team: El mismo equipo con sus relaciones cargadas
+        """
+        self.players = self._resolve(self.players, "Player")
+        # Staff y entrenador están en el mismo repositorio: una sola consulta
+        members = self.staff + ([self.coach] if isinstance(self.coach, str) else [])
+        ids = [m for m in members if isinstance(m, str)]
+        found = RepositoryProvider.get("ClubMember").find_many(ids) if ids else {}
+        self.staff = [found.get(s) if isinstance(s, str) else s for s in self.staff
+                      if not isinstance(s, str) or s in found]
+        if isinstance(self.coach, str) and self.coach in found:
+            self.coach = found[self.coach]
+        for member in self.players + self.staff + [self.coach]:
+            if isinstance(member, (Player, ClubMember)) and member.get_team_id() == self._id:
+                member.set_team(self)
+        return self
+
     def add_staff(self, staff):
         """
         Agrega un miembro al staff técnico.
@@ -514,6 +581,17 @@ class Player(User):
             teams_repo = RepositoryProvider.get("Team")
             self._team = teams_repo.find(self._team)
         return self._team
+
+    def get_team_id(self):
+        """
+        Retorna el ID del equipo sin consultar el repositorio.
+        
+        Útil para filtrar listas de jugadores sin cargar un Team por cada uno.
+        
+        Returns:
+        str: ID del equipo o None si no tiene
+        """
+        return self._team.get_id() if isinstance(self._team, Team) else self._team
     
     def set_team(self, team):
         """
@@ -735,6 +813,15 @@ class Match(Serializable):
         """Retorna el ID del árbitro."""
         return self._referee
 
+    def set_referee(self, referee_id):
+        """
+        Asigna el árbitro del partido.
+        
+        Args:
+        referee_id (str): ID del árbitro
+        """
+        self._referee = referee_id
+
     def get_status(self):
         """Retorna el estado actual del partido."""
         return self._status
@@ -748,6 +835,19 @@ class Match(Serializable):
         """
         self._status = status
 
+    def get_validated_by(self):
+        """Retorna el ID del árbitro que validó el partido."""
+        return self._validated_by
+
+    def set_validated_by(self, referee_id):
+        """
+        Registra el árbitro que validó el partido.
+        
+        Args:
+        referee_id (str): ID del árbitro
+        """
+        self._validated_by = referee_id
+
     def get_player_stats(self):
         """Retorna el diccionario de estadísticas por jugador."""
         return self._player_stats
@@ -804,4 +904,101 @@ class Match(Serializable):
         # Convierte ISO string a datetime
         if "_date" in data and isinstance(data["_date"], str):
             data["_date"] = datetime.fromisoformat(data["_date"])
-        return super().deserialize(data)
\ No newline at end of file
+        return super().deserialize(data)
+
+# -------------------------------
+# TeamRating
+# -------------------------------
+class TeamRating(Serializable):
+    """
+    Representa la puntuación Elo de un equipo.
+    
+    Se actualiza con cada partido validado y se persiste junto a su
+    historial, de modo que al iniciar el sistema no es necesario volver
+    a procesar toda la temporada.
+    
+    Attributes:
+    _id (str): ID del equipo al que pertenece la puntuación
+    _rating (float): Puntuación Elo actual
+    _matches (int): Número de partidos procesados
+    _last_match (str): ID del último partido aplicado
+    _last_date (datetime): Fecha del último partido aplicado
+    _history (list): Lista de cambios {"match", "date", "rating", "delta"}
+    """
+    def __init__(self, id, rating=1500.0, matches=0, last_match=None, last_date=None, history=None):
+        """
+        Constructor de TeamRating.
+        
+        Args:
+        id (str): ID del equipo
+        rating (float, optional): Puntuación inicial. Por defecto 1500
+        matches (int, optional): Partidos procesados. Por defecto 0
+        last_match (str, optional): ID del último partido aplicado
+        last_date (datetime|str, optional): Fecha del último partido (ISO si es string)
+        history (list, optional): Historial de cambios de puntuación
+        """
+        self._id = id
+        self._rating = rating
+        self._matches = matches
+        self._last_match = last_match
+        # Convierte string ISO a datetime si es necesario
+        self._last_date = datetime.fromisoformat(last_date) if isinstance(last_date, str) else last_date
+        self._history = history or []
+        self._serializable_attr = ["_id", "_rating", "_matches", "_last_match", "_last_date", "_history"]
+
+    def get_id(self):
+        """Retorna el ID del equipo."""
+        return self._id
+
+    def get_rating(self):
+        """Retorna la puntuación actual."""
+        return self._rating
+
+    def get_matches(self):
+        """Retorna el número de partidos procesados."""
+        return self._matches
+
+    def get_last_match(self):
+        """Retorna el ID del último partido aplicado."""
+        return self._last_match
+
+    def get_last_date(self):
+        """Retorna la fecha del último partido aplicado."""
+        return self._last_date
+
+    def get_history(self):
+        """Retorna el historial de cambios de puntuación."""
+        return self._history
+
+    def apply(self, match_id, date, delta):
+        """
+        Aplica el resultado de un partido a la puntuación.
+        
+        Args:
+        match_id (str): ID del partido
+        date (datetime): Fecha del partido
+        delta (float): Variación de la puntuación
+        """
+        self._rating += delta
+        self._matches += 1
+        self._last_match = match_id
+        self._last_date = date
+        self._history.append({
+            "match": match_id,
+            "date": date.isoformat() if isinstance(date, datetime) else date,
+            "rating": round(self._rating, 2),
+            "delta": round(delta, 2)
+        })
+
+    def serialize(self):
+        """
+        Serializa la puntuación a diccionario.
+        
+        Convierte la fecha del último partido a string ISO.
+        
+        Returns:
+        dict: Diccionario serializable de la puntuación
+        """
+        data = super().serialize()
+        data["_last_date"] = self._last_date.isoformat() if isinstance(self._last_date, datetime) else self._last_date
+        return data
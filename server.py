@@ -0,0 +1,346 @@
+import argparse
+import asyncio
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit, parse_qs
+from database.storage_codecs import CODEC_NAMES
+from main import setup_repositories
+from project import Position
+from services.auth_service import AuthService
+from services.player_service import PlayerManagementService
+from services.team_service import TeamService
+from services.report_service import ReportService
+from services.batch_service import BatchService
+from services.cached_read_service import CachedReadService
+from services.response_cache import NOT_MODIFIED
+from monitoring import metrics, tracing
+
+REASONS = {200: "OK", 204: "No Content", 304: "Not Modified", 400: "Bad Request", 401: "Unauthorized", 403: "Forbidden",
+           404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large", 500: "Internal Server Error"}
+MAX_BODY = 1024 * 1024
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+
+
+class Request:
+    def __init__(self, method, path, query, headers, body):
+        self.method = method
+        self.path = path
+        self.query = query
+        self.headers = headers
+        self.body = body
+        self.params = {}
+
+    def json(self):
+        if not self.body:
+            return {}
+        try:
+            return json.loads(self.body)
+        except ValueError:
+            raise HTTPError(400, "JSON inválido")
+
+    def token(self):
+        auth = self.headers.get("authorization", "")
+        return auth[7:].strip() if auth.lower().startswith("bearer ") else None
+
+    def arg(self, name, default=None):
+        values = self.query.get(name)
+        return values[0] if values else default
+
+
+def public(data):
+    # Nunca se exponen contraseñas a través de la API
+    if isinstance(data, dict):
+        return {k: public(v) for k, v in data.items() if k != "_password"}
+    if isinstance(data, list):
+        return [public(v) for v in data]
+    return data
+
+
+class APIServer:
+    """
+    Servidor HTTP/JSON sobre asyncio que expone la capa de servicios.
+    Las llamadas a servicios (que hacen I/O bloqueante sobre los repositorios)
+    se ejecutan en un pool de hilos acotado para no bloquear el event loop.
+    No se usan los servicios de services/async_services.py: un handler
+    encadena varias llamadas síncronas (sesión, permisos, caché, servicio) y
+    el error de cada una se traduce a un código HTTP en _call, así que se
+    ejecuta completo en un solo hilo en lugar de saltar al pool por cada
+    lectura de repositorio.
+    """
+    def __init__(self, host="127.0.0.1", port=8080, max_workers=8, idle_timeout=30, expose_metrics=False):
+        self.host = host
+        self.port = port
+        self.idle_timeout = idle_timeout
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="api")
+        self.auth_service: AuthService = AuthService.get_instance()
+        self.player_service: PlayerManagementService = PlayerManagementService.get_instance()
+        self.team_service: TeamService = TeamService.get_instance()
+        self.report_service: ReportService = ReportService.get_instance()
+        self.batch_service: BatchService = BatchService.get_instance()
+        self.cached_reads: CachedReadService = CachedReadService.get_instance()
+        self.routes = []
+        self._register_routes()
+        if expose_metrics:
+            metrics.enable()
+            self.route("GET", "/metrics", self.metrics)
+
+    def route(self, method, pattern, handler):
+        self.routes.append((method, re.compile(f"^{pattern}$"), handler))
+
+    def _register_routes(self):
+        self.route("POST", "/login", self.login)
+        self.route("POST", "/logout", self.logout)
+        self.route("GET", "/me", self.me)
+        self.route("GET", "/players", self.list_players)
+        self.route("POST", "/players/search", self.search_players)
+        self.route("GET", r"/players/(?P<player_id>[^/]+)", self.player_stats)
+        self.route("PATCH", r"/players/(?P<player_id>[^/]+)", self.update_player)
+        self.route("GET", "/teams", self.list_teams)
+        self.route("GET", r"/teams/(?P<team_id>[^/]+)", self.team_info)
+        self.route("GET", r"/teams/(?P<team_id>[^/]+)/roster", self.team_roster)
+        self.route("POST", r"/teams/(?P<team_id>[^/]+)/players", self.add_player)
+        self.route("DELETE", r"/teams/(?P<team_id>[^/]+)/players/(?P<player_id>[^/]+)", self.remove_player)
+        self.route("GET", "/reports/players", self.player_report)
+        self.route("POST", "/batch", self.batch)
+
+    # ---- Handlers (se ejecutan en el pool de hilos) ----
+
+    def _session(self, request: Request):
+        token = request.token()
+        session = self.auth_service.get_session(token) if token else None
+        if session is None:
+            raise HTTPError(401, "Sesión inválida o expirada")
+        return session
+
+    def login(self, request: Request):
+        data = request.json()
+        token = self.auth_service.login_session(data.get("id"), data.get("password"), data.get("user_type", ""))
+        if not token:
+            raise HTTPError(401, "Credenciales incorrectas")
+        return 200, {"token": token}
+
+    def logout(self, request: Request):
+        self.auth_service.logout_session(self._session(request))
+        return 204, None
+
+    def me(self, request: Request):
+        return 200, self._session(request).get_user().serialize()
+
+    def _cached(self, token, payload):
+        # Respuesta con ETag; 304 sin cuerpo si el cliente ya tiene esta versión
+        if payload is NOT_MODIFIED:
+            return 304, None, {"ETag": token}
+        return 200, payload, {"ETag": token}
+
+    def list_players(self, request: Request):
+        session = self._session(request)
+        token, payload = self.cached_reads.get_all_players(request.arg("team_id"), session=session,
+                                                           if_none_match=request.headers.get("if-none-match"))
+        return self._cached(token, payload)
+
+    def search_players(self, request: Request):
+        session = self._session(request)
+        filters = request.json().get("filters", {})
+        if filters.get("_position"):
+            filters["_position"] = Position(filters["_position"])
+        return 200, self.player_service.search_players(filters, session=session)
+
+    def player_stats(self, request: Request):
+        session = self._session(request)
+        player_id = request.params["player_id"]
+        token, stats = self.cached_reads.get_player_stats(None if player_id == "me" else player_id, session=session,
+                                                          if_none_match=request.headers.get("if-none-match"))
+        if not stats:
+            raise HTTPError(404, "Jugador no encontrado")
+        return self._cached(token, stats)
+
+    def update_player(self, request: Request):
+        session = self._session(request)
+        player_id = request.params["player_id"]
+        updates = request.json()
+        if not isinstance(updates, dict):
+            raise HTTPError(400, "Se esperaba un objeto JSON con los campos a actualizar")
+        if not self.player_service.update_player_profile(None if player_id == "me" else player_id, updates,
+                                                          session=session):
+            raise HTTPError(404, "Jugador no encontrado")
+        return 204, None
+
+    def list_teams(self, request: Request):
+        self._session(request)
+        return 200, [t.serialize() for t in self.team_service.get_all_teams()]
+
+    def team_info(self, request: Request):
+        session = self._session(request)
+        token, team = self.cached_reads.get_team_info(request.params["team_id"], session=session,
+                                                      if_none_match=request.headers.get("if-none-match"))
+        if not team:
+            raise HTTPError(404, "Equipo no encontrado")
+        return self._cached(token, team)
+
+    def team_roster(self, request: Request):
+        session = self._session(request)
+        roster = self.team_service.get_team_roster(request.params["team_id"], session=session)
+        if not roster:
+            raise HTTPError(404, "Equipo no encontrado")
+        return 200, roster
+
+    def add_player(self, request: Request):
+        session = self._session(request)
+        player_id = request.json().get("player_id")
+        if not self.team_service.add_player_to_team(request.params["team_id"], player_id, session=session):
+            raise HTTPError(404, "Equipo o jugador no encontrado")
+        return 204, None
+
+    def remove_player(self, request: Request):
+        session = self._session(request)
+        if not self.team_service.remove_player_to_team(request.params["team_id"], request.params["player_id"],
+                                                       session=session):
+            raise HTTPError(404, "Equipo o jugador no encontrado")
+        return 204, None
+
+    def player_report(self, request: Request):
+        session = self._session(request)
+        top = int(request.arg("top", 5))
+        return 200, self.report_service.generate_player_report(request.arg("team_id"), top, session=session)
+
+    def batch(self, request: Request):
+        session = self._session(request)
+        operations = request.json().get("operations")
+        if not isinstance(operations, list):
+            raise HTTPError(400, "Se esperaba una lista de operaciones")
+        return 200, self.batch_service.execute(operations, session=session)
+
+    def metrics(self, request: Request):
+        # Texto plano en formato Prometheus, sin sesión para que el recolector pueda leerlo
+        return 200, metrics.export_prometheus(), {"Content-Type": "text/plain; version=0.0.4; charset=utf-8"}
+
+    # ---- Protocolo HTTP ----
+
+    def _call(self, handler, request: Request):
+        try:
+            return handler(request)
+        except HTTPError as e:
+            return e.status, {"error": str(e)}
+        except ValueError as e:
+            status = 403 if "permisos" in str(e) else 400
+            return status, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": f"Error interno: {e}"}
+
+    def dispatch(self, request: Request):
+        allowed = False
+        for method, pattern, handler in self.routes:
+            match = pattern.match(request.path)
+            if not match:
+                continue
+            allowed = True
+            if method != request.method:
+                continue
+            request.params = match.groupdict()
+            # Un span raíz por petición cuando el tracing está activo
+            with tracing.root("api", "APIServer", handler.__name__) as span:
+                response = self._call(handler, request)
+                if span is not None:
+                    span.attrs.update(method=request.method, path=request.path, status=response[0])
+                return response
+        if allowed:
+            return 405, {"error": "Método no permitido"}
+        return 404, {"error": "Ruta no encontrada"}
+
+    async def _read_request(self, reader: asyncio.StreamReader):
+        head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), self.idle_timeout)
+        lines = head.decode("latin-1").split("\r\n")
+        method, target, version = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                key, value = line.split(":", 1)
+                headers[key.strip().lower()] = value.strip()
+        length = int(headers.get("content-length", 0))
+        if length > MAX_BODY:
+            raise HTTPError(413, "Cuerpo demasiado grande")
+        body = await reader.readexactly(length) if length else b""
+        url = urlsplit(target)
+        return Request(method.upper(), url.path.rstrip("/") or "/", parse_qs(url.query), headers, body), version
+
+    def _response(self, status, payload, keep_alive, extra_headers=None):
+        if isinstance(payload, str):
+            body = payload.encode("utf-8")
+        else:
+            body = b"" if payload is None else json.dumps(public(payload), default=str).encode("utf-8")
+        headers = [
+            f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+            f"Content-Length: {len(body)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        headers += [f"{k}: {v}" for k, v in (extra_headers or {}).items()]
+        if body and "Content-Type" not in (extra_headers or {}):
+            headers.append("Content-Type: application/json; charset=utf-8")
+        return ("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + body
+
+    async def handle_client(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        loop = asyncio.get_running_loop()
+        try:
+            while True:
+                try:
+                    request, version = await self._read_request(reader)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except (HTTPError, ValueError, asyncio.LimitOverrunError) as e:
+                    status = e.status if isinstance(e, HTTPError) else 400
+                    writer.write(self._response(status, {"error": str(e)}, False))
+                    await writer.drain()
+                    break
+
+                connection = request.headers.get("connection", "").lower()
+                keep_alive = connection != "close" and (version != "HTTP/1.0" or connection == "keep-alive")
+                status, payload, *extra = await loop.run_in_executor(self.executor, self.dispatch, request)
+                writer.write(self._response(status, payload, keep_alive, *extra))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    async def serve(self):
+        server = await asyncio.start_server(self.handle_client, self.host, self.port)
+        print(f"Servidor escuchando en http://{self.host}:{self.port}")
+        async with server:
+            await server.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor HTTP/JSON del sistema de scouting")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--workers", type=int, default=8, help="Hilos para I/O de repositorios")
+    parser.add_argument("--metrics", action="store_true", help="Instrumenta repositorios y servicios y expone /metrics")
+    parser.add_argument("--trace", metavar="ARCHIVO", help="Escribe una traza JSONL por petición")
+    parser.add_argument("--warm-cache", action="store_true", help="Usa una caché binaria de los registros para arrancar más rápido")
+    parser.add_argument("--codec", default="json", choices=CODEC_NAMES, help="Formato con el que se escriben los archivos de datos")
+    parser.add_argument("--shards", type=int, metavar="N", help="Reparte cada entidad en N archivos (data/<entidad>s/)")
+    parser.add_argument("--lsm", action="store_true", help="Usa el motor LSM (data/<entidad>s.lsm/), para muchas escrituras")
+    args = parser.parse_args()
+
+    setup_repositories(warm_cache=args.warm_cache, codec=args.codec, shards=args.shards, lsm=args.lsm)
+    if args.trace:
+        tracing.enable(args.trace)
+    server = APIServer(args.host, args.port, args.workers, expose_metrics=args.metrics)
+    try:
+        asyncio.run(server.serve())
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
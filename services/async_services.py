@@ -0,0 +1,166 @@
+import asyncio
+import threading
+from functools import partial
+from project import Player, ClubMember, Referee
+from .auth_service import AuthService
+from .player_service import PlayerManagementService
+from .team_service import TeamService
+from .report_service import ReportService
+from database.repository import RepositoryProvider
+
+
+# Versiones asyncio de los servicios para código que corre en un event loop
+# y quiere esperar el I/O de repositorios sin bloquearlo. server.py no las usa:
+# ejecuta cada handler completo en su pool de hilos (ver APIServer).
+
+
+async def run_blocking(fn, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, partial(fn, *args, **kwargs))
+
+
+class AsyncAuthService:
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.auth_service: AuthService = AuthService.get_instance()
+
+    async def login_session(self, id, password, user_type: str):
+        types = {"player": "Player", "clubmember": "ClubMember", "referee": "Referee"}
+        type_name = types.get(user_type.lower())
+        if type_name is None:
+            return None
+        # El directorio se construye con la primera consulta (un findAll por tipo)
+        # y puede releer un repositorio: no se toca desde el event loop
+        if not await run_blocking(lambda: self.auth_service.directory.has(id, type_name)):
+            return None
+        user = await RepositoryProvider.get_async(type_name).find(id)
+        if not user or not user.verify_password(password):
+            return None
+        return self.auth_service.sessions.create(user).token
+
+    async def logout_session(self, session):
+        return self.auth_service.logout_session(session)
+
+    def get_current_user(self, session=None):
+        # Las sesiones están en memoria, no requiere await
+        return self.auth_service.get_current_user(session)
+
+    async def update_user_profile(self, name, age, user_id=None, session=None):
+        return await run_blocking(self.auth_service.update_user_profile, name, age, user_id, session=session)
+
+    def get_instance():
+        if AsyncAuthService._instance is None:
+            with AsyncAuthService._lock:
+                if AsyncAuthService._instance is None:
+                    AsyncAuthService._instance = AsyncAuthService()
+        return AsyncAuthService._instance
+
+
+class AsyncPlayerManagementService:
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.auth_service: AuthService = AuthService.get_instance()
+        self.player_service: PlayerManagementService = PlayerManagementService.get_instance()
+
+    @property
+    def players_repo(self):
+        return RepositoryProvider.get_async("Player")
+
+    async def get_player_stats(self, player_id=None, session=None):
+        current_user = self.auth_service.get_current_user(session)
+        if player_id and isinstance(current_user, Player):
+            raise ValueError("No tienes permisos")
+        player = await self.players_repo.find(player_id) if player_id else current_user
+        if not isinstance(player, Player):
+            return False
+        return player.serialize()
+
+    async def update_player_profile(self, player_id=None, updates=None, session=None):
+        return await run_blocking(self.player_service.update_player_profile, player_id, updates, session=session)
+
+    async def get_all_players(self, team_id=None, session=None):
+        current_user = self.auth_service.get_current_user(session)
+        if isinstance(current_user, ClubMember):
+            team_id = current_user.get_team_id()
+            if not team_id:
+                return []
+        elif not isinstance(current_user, Referee):
+            raise ValueError("No tienes permisos")
+        players = await self.players_repo.findAll()
+        if team_id:
+            return [p.serialize() for p in players if p.get_team_id() == team_id]
+        return [p.serialize() for p in players]
+
+    async def search_players(self, filters, session=None):
+        current_user = self.auth_service.get_current_user(session)
+        if not isinstance(current_user, (ClubMember, Referee)):
+            raise ValueError("No tienes permisos")
+        players = await self.players_repo.findAll()
+        return [p.serialize() for p in players
+                if all(getattr(p, key, None) == value for key, value in filters.items())]
+
+    def get_instance():
+        if AsyncPlayerManagementService._instance is None:
+            with AsyncPlayerManagementService._lock:
+                if AsyncPlayerManagementService._instance is None:
+                    AsyncPlayerManagementService._instance = AsyncPlayerManagementService()
+        return AsyncPlayerManagementService._instance
+
+
+class AsyncTeamService:
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.team_service: TeamService = TeamService.get_instance()
+
+    @property
+    def teams_repo(self):
+        return RepositoryProvider.get_async("Team")
+
+    async def create_team(self, team_id, name=None, session=None):
+        return await run_blocking(self.team_service.create_team, team_id, name, session=session)
+
+    async def get_team_info(self, team_id=None, session=None):
+        return await self.teams_repo.find(team_id) if team_id else None
+
+    async def add_player_to_team(self, team_id, player_id, session=None):
+        return await run_blocking(self.team_service.add_player_to_team, team_id, player_id, session=session)
+
+    async def remove_player_to_team(self, team_id, player_id, session=None):
+        return await run_blocking(self.team_service.remove_player_to_team, team_id, player_id, session=session)
+
+    async def get_all_teams(self, session=None):
+        return await self.teams_repo.findAll()
+
+    def get_instance():
+        if AsyncTeamService._instance is None:
+            with AsyncTeamService._lock:
+                if AsyncTeamService._instance is None:
+                    AsyncTeamService._instance = AsyncTeamService()
+        return AsyncTeamService._instance
+
+
+class AsyncReportService:
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.report_service: ReportService = ReportService.get_instance()
+
+    async def generate_player_report(self, team_id=None, top=5, session=None):
+        return await run_blocking(self.report_service.generate_player_report, team_id, top, session=session)
+
+    async def export_to_csv(self, data, fileName):
+        return await run_blocking(self.report_service.export_to_csv, data, fileName)
+
+    def get_instance():
+        if AsyncReportService._instance is None:
+            with AsyncReportService._lock:
+                if AsyncReportService._instance is None:
+                    AsyncReportService._instance = AsyncReportService()
+        return AsyncReportService._instance
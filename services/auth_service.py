@@ -1,28 +1,68 @@
+import threading
 from project import User, ClubMember, Player, Referee
 from database.repository import RepositoryProvider
+from database.user_directory import UserDirectory
+from .session_store import Session, SessionStore
 
 class AuthService:
     _instance = None
+    _lock = threading.Lock()
 
     def __init__(self):
-        self.players_repo = RepositoryProvider.get("Player")
-        self.club_members_repo = RepositoryProvider.get("ClubMember")
-        self.referee_repo = RepositoryProvider.get("Referee")
-        self.teams_repo = RepositoryProvider.get("Team")
+        self._directory = None
+        self._directory_lock = threading.Lock()
+        self.sessions = SessionStore()
+        # Usuario de la sesión local (menú de consola)
         self._current_user = None
 
+    @property
+    def directory(self):
+        # Se construye con la primera consulta, no al iniciar la aplicación
+        if self._directory is None:
+            with self._directory_lock:
+                if self._directory is None:
+                    self._directory = UserDirectory(("Player", "ClubMember", "Referee"))
+        return self._directory
+
+    @property
+    def players_repo(self):
+        return RepositoryProvider.get("Player")
+
+    @property
+    def club_members_repo(self):
+        return RepositoryProvider.get("ClubMember")
+
+    @property
+    def referee_repo(self):
+        return RepositoryProvider.get("Referee")
+
+    @property
+    def teams_repo(self):
+        return RepositoryProvider.get("Team")
+
+    def _check_available_id(self, id):
+        # Verificación previa entre los tres tipos; la definitiva es la de save
+        if id in self.directory:
+            raise ValueError("El usuario ya existe")
+
+    def _save_new_user(self, repo, user):
+        # save revisa el ID bajo el lock de escritura del repositorio, así que
+        # detecta también un registro hecho por otro proceso entretanto
+        if not repo.save(user):
+            raise ValueError("El usuario ya existe")
+
+
     def register_player(self, id, name, age, password, team_id, position):
         if self._current_user:
             return None
-        if self.players_repo.find(id):
-            raise ValueError("El usuario ya existe")
+        self._check_available_id(id)
         
         if age <= 0:
             raise ValueError("Edad inválida")
 
         team = self.teams_repo.find(team_id) if team_id != None else None
         player = Player(id, name, age, password, team, position)
-        self.players_repo.save(player)
+        self._save_new_user(self.players_repo, player)
         self._current_user = player
         return player
 
@@ -30,14 +70,13 @@ class AuthService:
         if self._current_user:
             return None
         
-        if self.club_members_repo.find(id):
-            raise ValueError("El usuario ya existe")
+        self._check_available_id(id)
         
         if age <= 0:
             raise ValueError("Edad inválida")
 
         club_member = ClubMember(id, name, age, password, None, role.lower())
-        self.club_members_repo.save(club_member)
+        self._save_new_user(self.club_members_repo, club_member)
         self._current_user = club_member
         return club_member
 
@@ -45,84 +84,106 @@ class AuthService:
         if self._current_user:
             return None
         
-        if self.referee_repo.find(id):
-            raise ValueError("El usuario ya existe")
+        self._check_available_id(id)
         
         if age <= 0:
             raise ValueError("Edad inválida")
 
         ref = Referee(id, name, age, password, license)
-        self.referee_repo.save(ref)
+        self._save_new_user(self.referee_repo, ref)
         self._current_user = ref
         return ref
 
-    def login(self, id, password, user_type: str):
-        if self._current_user:
-            return False
+    def _authenticate(self, id, password, user_type: str):
         user: User = None
         match user_type.lower():
             case "player":
-                user = self.players_repo.find(id)
+                user = self.directory.resolve(id, "Player")
             case "clubmember":
-                user = self.club_members_repo.find(id)
+                user = self.directory.resolve(id, "ClubMember")
             case "referee":
-                user = self.referee_repo.find(id)
+                user = self.directory.resolve(id, "Referee")
             case _:
-                return False
+                return None
+        if user and user.verify_password(password):
+            return user
+        return None
+
+    def login(self, id, password, user_type: str):
+        if self._current_user:
+            return False
+        user = self._authenticate(id, password, user_type)
         if not user:
             return False
-        if user.verify_password(password):
-            self._current_user = user
-            return True
-
+        self._current_user = user
+        return True
 
-    def get_current_user(self):
-        return self._current_user
+    def login_session(self, id, password, user_type: str):
+        # Inicia una sesión independiente y retorna su token
+        user = self._authenticate(id, password, user_type)
+        if not user:
+            return None
+        return self.sessions.create(user).token
+
+    def logout_session(self, session):
+        token = session.token if isinstance(session, Session) else session
+        return self.sessions.revoke(token) is not None
+
+    def get_session(self, token):
+        return self.sessions.get(token)
+
+    def get_current_user(self, session=None):
+        # Sin sesión se usa el usuario de la consola; con sesión (token u objeto
+        # Session) se resuelve el usuario de esa sesión
+        if session is None:
+            return self._current_user
+        if not isinstance(session, Session):
+            session = self.sessions.get(session)
+        elif self.sessions.get(session.token) is None:
+            return None
+        return session.get_user() if session else None
     
     def set_current_user(self, user):
         self._current_user = user
 
-    def update_user_profile(self, name, age, user_id=None):
-        user = None
+    def update_user_profile(self, name, age, user_id=None, session=None):
+        current = None
         if not user_id:
-             user = self._current_user
-        else:
-            user = self.players_repo.find(user_id)
-            if user is None:
-                user = self.club_members_repo.find(user_id)
-            if user is None:
-                user = self.referee_repo.find(user_id)
-
-        if user is None:
+            current = self.get_current_user(session)
+            if current is None:
+                return False
+            user_id = current.get_id()
+        location = self.directory.locate(user_id, type(current).__name__ if current else None)
+        if location is None:
             return False
 
-        if name:
-            user.set_name(name)
-        if age:
-            user.set_age(age)
-
-        if isinstance(user, Player):
-            self.players_repo.replace(user.get_id(), user)
-        elif isinstance(user, ClubMember):
-            self.club_members_repo.replace(user.get_id(), user)
-        elif isinstance(user, Referee):
-            self.referee_repo.replace(user.get_id(), user)
+        def apply(user):
+            if name:
+                user.set_name(name)
+            if age:
+                user.set_age(age)
+
+        # Se aplica sobre la versión almacenada para no pisar cambios de otros procesos
+        updated = location[1].update(user_id, apply)
+        if updated is None:
+            return False
+        if current is not None:
+            apply(current)
+            current._version = updated._version
         return True
 
     def logout(self):
-        user = self._current_user
-        if user:
-            if isinstance(user, Player):
-                self.players_repo.replace(user.get_id(), user)
-            elif isinstance(user, ClubMember):
-                self.club_members_repo.replace(user.get_id(), user)
-            elif isinstance(user, Referee):
-                self.referee_repo.replace(user.get_id(), user)
+        # Cada cambio ya se persiste al hacerlo; no se reescribe el usuario de la
+        # sesión para no sobrescribir cambios posteriores con una copia vieja
+        if self._current_user:
             self._current_user = None
             return True
         return False
 
     def get_instance():
+        # Doble verificación: el lock solo se toma mientras no exista la instancia
         if AuthService._instance is None:
-            AuthService._instance = AuthService()
+            with AuthService._lock:
+                if AuthService._instance is None:
+                    AuthService._instance = AuthService()
         return AuthService._instance
\ No newline at end of file
@@ -0,0 +1,87 @@
+import threading
+from project import Serializable
+from .auth_service import AuthService
+from .player_service import PlayerManagementService
+from .team_service import TeamService
+from .report_service import ReportService
+from database.repository import RepositoryProvider
+
+class BatchService:
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.auth_service: AuthService = AuthService.get_instance()
+        self.player_service: PlayerManagementService = PlayerManagementService.get_instance()
+        self.team_service: TeamService = TeamService.get_instance()
+        self.report_service: ReportService = ReportService.get_instance()
+        self.operations = {
+            "me": lambda session: self.auth_service.get_current_user(session),
+            "player_stats": self.player_service.get_player_stats,
+            "all_players": self.player_service.get_all_players,
+            "search_players": self.player_service.search_players,
+            "team_info": self.team_service.get_team_info,
+            "team_roster": self.team_service.get_team_roster,
+            "all_teams": self.team_service.get_all_teams,
+            "player_report": self.report_service.generate_player_report,
+        }
+
+    def _resolve(self, value, results):
+        # "$0._team" se reemplaza por el campo _team del resultado de la operación 0
+        if isinstance(value, str) and value.startswith("$"):
+            index, *path = value[1:].split(".")
+            index = int(index)
+            # Solo se puede referenciar una operación anterior del lote
+            if not 0 <= index < len(results):
+                raise ValueError(f"Referencia inválida ${index}: no es una operación anterior")
+            current = results[index]
+            if not current["ok"]:
+                raise ValueError(f"La operación {index} falló")
+            current = current["result"]
+            for key in path:
+                current = current.get(key) if isinstance(current, dict) else None
+            return current
+        if isinstance(value, dict):
+            return {k: self._resolve(v, results) for k, v in value.items()}
+        if isinstance(value, list):
+            return [self._resolve(v, results) for v in value]
+        return value
+
+    def _serialize(self, value):
+        if isinstance(value, Serializable):
+            return value.serialize()
+        if isinstance(value, list):
+            return [self._serialize(v) for v in value]
+        return value
+
+    def execute(self, operations, session=None):
+        """
+        Ejecuta una lista de operaciones [{"op": nombre, "args": {...}}] sobre
+        una misma vista de los repositorios: cada archivo se lee una vez para
+        todo el lote y los objetos cargados se comparten entre operaciones.
+        """
+        if session is not None and not isinstance(session, str):
+            session = session.token
+        if self.auth_service.get_current_user(session) is None:
+            raise ValueError("No tienes permisos")
+
+        results = []
+        with RepositoryProvider.snapshot():
+            for operation in operations:
+                try:
+                    handler = self.operations.get(operation.get("op"))
+                    if handler is None:
+                        raise ValueError(f"Operación desconocida: {operation.get('op')}")
+                    args = self._resolve(operation.get("args") or {}, results)
+                    result = handler(session=session, **args)
+                    results.append({"ok": True, "result": self._serialize(result)})
+                except (ValueError, TypeError) as e:
+                    results.append({"ok": False, "error": str(e)})
+        return results
+
+    def get_instance():
+        if BatchService._instance is None:
+            with BatchService._lock:
+                if BatchService._instance is None:
+                    BatchService._instance = BatchService()
+        return BatchService._instance
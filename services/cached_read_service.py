@@ -0,0 +1,61 @@
+import threading
+from project import Player, ClubMember
+from .auth_service import AuthService
+from .player_service import PlayerManagementService
+from .team_service import TeamService
+from .response_cache import ResponseCache
+from database.repository import RepositoryProvider
+
+class CachedReadService:
+    """
+    Lecturas frecuentes con caché de respuestas. Cada método retorna
+    (token, datos); datos es NOT_MODIFIED si el cliente ya tiene la versión
+    actual. La clave incluye al usuario porque el resultado depende de sus
+    permisos y de su equipo.
+    """
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.auth_service: AuthService = AuthService.get_instance()
+        self.player_service: PlayerManagementService = PlayerManagementService.get_instance()
+        self.team_service: TeamService = TeamService.get_instance()
+        self.cache = ResponseCache()
+
+    def _user_key(self, session):
+        user = self.auth_service.get_current_user(session)
+        if user is None:
+            raise ValueError("No tienes permisos")
+        team_id = user.get_team_id() if isinstance(user, (Player, ClubMember)) else None
+        return type(user).__name__, user.get_id(), team_id
+
+    def get_player_stats(self, player_id=None, session=None, if_none_match=None):
+        user_key = self._user_key(session)
+        players_repo = RepositoryProvider.get("Player")
+        versions = players_repo.get_version(player_id or user_key[1])
+        return self.cache.get(("player_stats", user_key, player_id), versions,
+                              lambda: self.player_service.get_player_stats(player_id, session=session),
+                              if_none_match)
+
+    def get_team_info(self, team_id, session=None, if_none_match=None):
+        self._user_key(session)
+        versions = RepositoryProvider.get("Team").get_version(team_id)
+
+        def compute():
+            team = self.team_service.get_team_info(team_id, session=session)
+            return team.serialize() if team else None
+        return self.cache.get(("team_info", team_id), versions, compute, if_none_match)
+
+    def get_all_players(self, team_id=None, session=None, if_none_match=None):
+        user_key = self._user_key(session)
+        versions = RepositoryProvider.get("Player").get_generation()
+        return self.cache.get(("all_players", user_key, team_id), versions,
+                              lambda: self.player_service.get_all_players(team_id, session=session),
+                              if_none_match)
+
+    def get_instance():
+        if CachedReadService._instance is None:
+            with CachedReadService._lock:
+                if CachedReadService._instance is None:
+                    CachedReadService._instance = CachedReadService()
+        return CachedReadService._instance
@@ -0,0 +1,63 @@
+import threading
+from project import Match, Referee
+from .auth_service import AuthService
+from .rating_service import RatingService
+from database.repository import RepositoryProvider
+
+class MatchService:
+    _instance = None
+    _lock = threading.Lock()
+    PLAYER_STATS = ("goals", "assists", "shots", "shots_on_target", "clearances")
+
+    def __init__(self):
+        self.auth_service: AuthService = AuthService.get_instance()
+        self.rating_service: RatingService = RatingService.get_instance()
+
+    @property
+    def matches_repo(self):
+        return RepositoryProvider.get("Match")
+
+    def get_match(self, match_id):
+        return self.matches_repo.find(match_id)
+
+    def get_matches(self, status=None):
+        matches = self.matches_repo.findAll()
+        if status:
+            matches = [m for m in matches if m.get_status() == status]
+        return sorted(matches, key=lambda m: m.get_date())
+
+    def validate_match(self, match_id, session=None):
+        current_user = self.auth_service.get_current_user(session)
+        if not isinstance(current_user, Referee):
+            raise ValueError("No tienes permisos")
+        match: Match = self.matches_repo.find(match_id)
+        if not match:
+            return False
+        if match.get_status() == "validated":
+            raise ValueError("El partido ya fue validado")
+        # Solo un partido jugado y con resultado puede mover el Elo y las estadísticas
+        if match.get_status() != "finished":
+            raise ValueError("El partido aún no ha terminado")
+        if not isinstance(match.get_home_score(), int) or not isinstance(match.get_away_score(), int):
+            raise ValueError("El partido no tiene un resultado registrado")
+        match.set_status("validated")
+        match.set_validated_by(current_user.get_id())
+        self.matches_repo.replace(match.get_id(), match, expected_version=getattr(match, "_version", None))
+        self.rating_service.update_from_match(match)
+        self._apply_player_stats(match)
+        return True
+
+    def _apply_player_stats(self, match: Match):
+        # Suma las estadísticas del partido a cada jugador sin reescribir la entidad completa
+        players_repo = RepositoryProvider.get("Player")
+        for player_id, stats in match.get_player_stats().items():
+            deltas = {stat: stats[stat] for stat in self.PLAYER_STATS if stats.get(stat)}
+            if deltas:
+                players_repo.increment_fields(player_id, deltas)
+
+    def get_instance():
+        if MatchService._instance is None:
+            with MatchService._lock:
+                if MatchService._instance is None:
+                    MatchService._instance = MatchService()
+        return MatchService._instance
@@ -1,24 +1,35 @@
-from project import User, Player, ClubMember, Referee
+import threading
+from project import User, Player, ClubMember, Referee, Position
 from .auth_service import AuthService
-from database.repository import RepositoryProvider
+from .team_service import TeamService
+from database.repository import RepositoryProvider, apply_fields
 
 class PlayerManagementService:
     _instance = None
+    _lock = threading.Lock()
+    UPDATABLE_FIELDS = ("name", "age", "goals", "assists", "shots", "shots_on_target", "clearances")
 
     def __init__(self):
         self.auth_service: AuthService = AuthService.get_instance()
+        self.team_service: TeamService = TeamService.get_instance()
 
-    def get_player_stats(self, player_id=None):
-        if player_id and isinstance(self.auth_service.get_current_user(), Player):
+    def get_player_stats(self, player_id=None, session=None):
+        current_user = self.auth_service.get_current_user(session)
+        if player_id and isinstance(current_user, Player):
             raise ValueError("No tienes permisos")
         players_repo = self.auth_service.players_repo
-        player = players_repo.find(player_id) if player_id else self.auth_service.get_current_user()
+        player = players_repo.find(player_id) if player_id else current_user
         if not isinstance(player, Player):
             return False
         return player.serialize()
 
-    def update_player_profile(self, player_id=None, **updates):
-        current_user = self.auth_service.get_current_user()
+    def update_player_profile(self, player_id=None, updates=None, session=None):
+        updates = updates or {}
+        # Un campo desconocido o mal escrito es un error, no se descarta en silencio
+        rejected = sorted(set(updates) - set(self.UPDATABLE_FIELDS) - {"team", "position"})
+        if rejected:
+            raise ValueError(f"Campos no permitidos: {', '.join(rejected)}")
+        current_user = self.auth_service.get_current_user(session)
         players_repo = self.auth_service.players_repo
         teams_repo = self.auth_service.teams_repo
 
@@ -26,9 +37,9 @@ class PlayerManagementService:
             player = players_repo.find(player_id)
             if not player:
                 return False
-            if isinstance(current_user, Player):
+            if isinstance(current_user, Player) or current_user is None:
                 raise ValueError("No tienes permisos")
-            if player.get_team() != current_user.get_team():
+            if isinstance(current_user, ClubMember) and player.get_team_id() != current_user.get_team_id():
                 raise ValueError("No tienes permisos")
         else:
             player = current_user
@@ -36,41 +47,49 @@ class PlayerManagementService:
         if not isinstance(player, Player):
             return False
 
-        player.set_name(updates.get("name"))
-        player.set_age(updates.get("age"))
-        player.set_goals(updates.get("goals", 0))
-        player.set_assists(updates.get("assists", 0))
-        player.set_clearances(updates.get("clearances", 0))
-        player.set_shots(updates.get("shots", 0))
-        player.set_shots_on_target(updates.get("shots_on_target", 0))
-        player.set_team(teams_repo.find(updates.get("team")))
+        # Solo se escriben los campos recibidos; el resto conserva su valor
+        fields = {key: updates[key] for key in self.UPDATABLE_FIELDS if updates.get(key) is not None}
+        team_id = player.get_team_id()
+        if "team" in updates:
+            team_id = updates.get("team") or None
+            if team_id and not teams_repo.find(team_id):
+                raise ValueError("El equipo no existe")
         if updates.get("position"):
-            player.set_position(updates.get("position"))
-
-        players_repo.replace(player.get_id(), player)
+            position = updates.get("position")
+            if not isinstance(position, Position) and position not in Position.__members__:
+                raise ValueError("Posición inválida")
+            fields["position"] = Position(position)
+        if fields and not players_repo.patch(player.get_id(), fields):
+            return False
+        # El cambio de equipo también actualiza las plantillas de los equipos
+        if team_id != player.get_team_id():
+            self.team_service.assign_player(player.get_id(), team_id)
+            fields["team"] = team_id
+        if player is current_user:
+            apply_fields(player, fields)
         return True
 
-    def get_all_players(self, team_id=None):
+    def get_all_players(self, team_id=None, session=None):
         players_repo = self.auth_service.players_repo
-        current_user = self.auth_service.get_current_user()
+        current_user = self.auth_service.get_current_user(session)
         if isinstance(current_user, Player):
             raise ValueError("No tienes permisos")
         if isinstance(current_user, ClubMember):
-            if not current_user.get_team():
+            team_id = current_user.get_team_id()
+            if not team_id:
                 return []
-            return [p.serialize() for p in players_repo.findAll() if 
-                    (p.get_team().get_id() if p.get_team() else p.get_team()) == current_user.get_team().get_id()]
+            return [p.serialize() for p in self.team_service.get_team_players(team_id)]
         if isinstance(current_user, Referee):
             if team_id:
-                return [p.serialize() for p in players_repo.findAll() if p.get_team() and p.get_team().get_id() == team_id]
+                return [p.serialize() for p in self.team_service.get_team_players(team_id)]
             return [p.serialize() for p in players_repo.findAll()]
 
         raise ValueError("No tienes permisos")
 
 
-    def search_players(self, filters):
+    def search_players(self, filters, session=None):
         players_repo = self.auth_service.players_repo
-        current_user = self.auth_service.get_current_user()
+        current_user = self.auth_service.get_current_user(session)
 
         if isinstance(current_user, Player):
             raise ValueError("No tienes permisos")
@@ -93,5 +112,7 @@ class PlayerManagementService:
 
     def get_instance():
         if PlayerManagementService._instance is None:
-            PlayerManagementService._instance = PlayerManagementService()
+            with PlayerManagementService._lock:
+                if PlayerManagementService._instance is None:
+                    PlayerManagementService._instance = PlayerManagementService()
         return PlayerManagementService._instance
\ No newline at end of file
@@ -0,0 +1,127 @@
+import threading
+from project import Match, TeamRating
+from database.repository import RepositoryProvider
+
+class RatingService:
+    _instance = None
+    _lock = threading.Lock()
+
+    # Parámetros del modelo Elo (variante World Football Elo)
+    DEFAULT_RATING = 1500.0
+    K_FACTOR = 20
+    HOME_ADVANTAGE = 100
+
+    def __init__(self):
+        pass
+
+    @property
+    def ratings_repo(self):
+        return RepositoryProvider.get("TeamRating")
+
+    @property
+    def matches_repo(self):
+        return RepositoryProvider.get("Match")
+
+    def expected_score(self, home_rating, away_rating):
+        # Probabilidad esperada de victoria local, incluyendo la ventaja de jugar en casa
+        return 1 / (1 + 10 ** ((away_rating - home_rating - self.HOME_ADVANTAGE) / 400))
+
+    def _margin(self, goal_diff):
+        # Multiplicador por diferencia de goles
+        goal_diff = abs(goal_diff)
+        if goal_diff <= 1:
+            return 1.0
+        if goal_diff == 2:
+            return 1.5
+        return (11 + goal_diff) / 8
+
+    def _delta(self, home_rating, away_rating, home_score, away_score):
+        if home_score > away_score:
+            result = 1.0
+        elif home_score < away_score:
+            result = 0.0
+        else:
+            result = 0.5
+        expected = self.expected_score(home_rating, away_rating)
+        return self.K_FACTOR * self._margin(home_score - away_score) * (result - expected)
+
+    def get_rating(self, team_id):
+        rating = self.ratings_repo.find(team_id)
+        return rating.get_rating() if rating else self.DEFAULT_RATING
+
+    def get_rankings(self):
+        ratings = self.ratings_repo.findAll()
+        ratings.sort(key=lambda r: r.get_rating(), reverse=True)
+        return [r.serialize() for r in ratings]
+
+    def replay(self, matches=None):
+        """
+        Recalcula todas las puntuaciones desde cero procesando los partidos
+        validados en orden cronológico, en una sola pasada.
+        """
+        if matches is None:
+            matches = self.matches_repo.findAll()
+        matches = sorted((m for m in matches if m.get_status() == "validated"),
+                         key=lambda m: (m.get_date(), m.get_id()))
+
+        ratings = {}
+        for m in matches:
+            home = ratings.get(m.get_home_team())
+            if home is None:
+                home = ratings[m.get_home_team()] = TeamRating(m.get_home_team(), self.DEFAULT_RATING)
+            away = ratings.get(m.get_away_team())
+            if away is None:
+                away = ratings[m.get_away_team()] = TeamRating(m.get_away_team(), self.DEFAULT_RATING)
+            delta = self._delta(home.get_rating(), away.get_rating(), m.get_home_score(), m.get_away_score())
+            home.apply(m.get_id(), m.get_date(), delta)
+            away.apply(m.get_id(), m.get_date(), -delta)
+
+        existing = {r.get_id() for r in self.ratings_repo.findAll()}
+        for team_id in existing - ratings.keys():
+            self.ratings_repo.delete(team_id)
+        for team_id, rating in ratings.items():
+            if team_id in existing:
+                self.ratings_repo.replace(team_id, rating)
+            else:
+                self.ratings_repo.save(rating)
+        return len(matches)
+
+    def update_from_match(self, match: Match):
+        """
+        Aplica de forma incremental el resultado de un partido validado.
+        Si el partido es anterior al último aplicado se recalcula la temporada.
+        """
+        if match.get_status() != "validated":
+            return False
+        home = self.ratings_repo.find(match.get_home_team())
+        away = self.ratings_repo.find(match.get_away_team())
+
+        for rating in (home, away):
+            if rating and any(h["match"] == match.get_id() for h in rating.get_history()):
+                return False
+
+        last_dates = [r.get_last_date() for r in (home, away) if r and r.get_last_date()]
+        if last_dates and match.get_date() < max(last_dates):
+            self.replay()
+            return True
+
+        new_home, new_away = home is None, away is None
+        home = home or TeamRating(match.get_home_team(), self.DEFAULT_RATING)
+        away = away or TeamRating(match.get_away_team(), self.DEFAULT_RATING)
+        delta = self._delta(home.get_rating(), away.get_rating(), match.get_home_score(), match.get_away_score())
+        home.apply(match.get_id(), match.get_date(), delta)
+        away.apply(match.get_id(), match.get_date(), -delta)
+
+        for rating, new in ((home, new_home), (away, new_away)):
+            if new:
+                self.ratings_repo.save(rating)
+            else:
+                self.ratings_repo.replace(rating.get_id(), rating)
+        return True
+
+    def get_instance():
+        if RatingService._instance is None:
+            with RatingService._lock:
+                if RatingService._instance is None:
+                    RatingService._instance = RatingService()
+        return RatingService._instance
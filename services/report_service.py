@@ -1,19 +1,51 @@
-from project import User
+import csv
+import threading
+from project import ClubMember, Referee
+from .auth_service import AuthService
 from database.repository import RepositoryProvider
 
 class ReportService:
     _instance = None
+    _lock = threading.Lock()
+    LEADERBOARD_STATS = ("_goals", "_assists", "_shots", "_shots_on_target", "_clearances")
 
     def __init__(self):
-        pass
+        self.auth_service: AuthService = AuthService.get_instance()
 
-    def generate_player_report():
-        pass
+    def generate_player_report(self, team_id=None, top=5, session=None):
+        current_user = self.auth_service.get_current_user(session)
+        if not isinstance(current_user, (ClubMember, Referee)):
+            raise ValueError("No tienes permisos")
+        if isinstance(current_user, ClubMember):
+            team_id = current_user.get_team_id()
+            if not team_id:
+                return None
+
+        players = [p.serialize() for p in self.auth_service.players_repo.findAll()]
+        if team_id:
+            players = [p for p in players if p["_team"] == team_id]
+
+        report = {"team": team_id, "players": len(players), "leaderboards": {}}
+        for stat in self.LEADERBOARD_STATS:
+            ranking = sorted(players, key=lambda p: p.get(stat) or 0, reverse=True)[:top]
+            report["leaderboards"][stat.lstrip("_")] = [
+                {"_id": p["_id"], "_name": p["_name"], "value": p.get(stat) or 0} for p in ranking
+            ]
+        return report
 
     def export_to_csv(self, data, fileName):
-        pass
+        if not data:
+            return False
+        fields = [k for k in data[0].keys() if k != "_password"]
+        with open(fileName, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+            writer.writeheader()
+            writer.writerows(data)
+        return True
 
     def get_instance():
         if ReportService._instance is None:
-            ReportService._instance = ReportService()
-        return ReportService._instance
\ No newline at end of file
+            with ReportService._lock:
+                if ReportService._instance is None:
+                    ReportService._instance = ReportService()
+        return ReportService._instance
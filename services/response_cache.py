@@ -0,0 +1,54 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+# Respuesta cuando el token del cliente coincide con la versión actual
+NOT_MODIFIED = object()
+
+
+class ResponseCache:
+    """
+    Caché LRU de respuestas serializadas indexada por consulta. Cada entrada
+    guarda el token (ETag) calculado a partir de las versiones de los
+    registros de los que depende; si las versiones cambian la entrada se
+    recalcula.
+    """
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def make_token(self, key, versions):
+        digest = hashlib.blake2b(repr((key, versions)).encode("utf-8"), digest_size=8).hexdigest()
+        return f'"{digest}"'
+
+    def get(self, key, versions, compute, if_none_match=None):
+        """
+        Retorna (token, valor). Si `if_none_match` coincide con el token actual
+        retorna NOT_MODIFIED sin calcular ni serializar nada.
+        """
+        token = self.make_token(key, versions)
+        if if_none_match is not None and if_none_match == token:
+            with self._lock:
+                self.hits += 1
+            return token, NOT_MODIFIED
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] == token:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry
+            self.misses += 1
+        value = compute()
+        with self._lock:
+            self._entries[key] = (token, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return token, value
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,139 @@
+import heapq
+import threading
+from collections import defaultdict
+from datetime import datetime, timedelta
+from project import Match, Referee
+from database.repository import RepositoryProvider
+
+class ScheduleService:
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        pass
+
+    @property
+    def matches_repo(self):
+        return RepositoryProvider.get("Match")
+
+    @property
+    def referee_repo(self):
+        return RepositoryProvider.get("Referee")
+
+    @property
+    def teams_repo(self):
+        return RepositoryProvider.get("Team")
+
+    def generate_round_robin(self, team_ids, start_date: datetime, days_between_rounds=7,
+                             matches_per_day=None, double_round=True, prefix="M", max_rounds=None):
+        """
+        Genera el calendario todos contra todos con el método del círculo.
+        Cada jornada se juega en `start_date + n * days_between_rounds`; si se
+        indica `matches_per_day`, la jornada se reparte en días consecutivos.
+        Con `max_rounds` solo se generan las primeras jornadas.
+        """
+        teams = list(team_ids)
+        if len(teams) < 2:
+            return []
+        if len(teams) % 2:
+            teams.append(None)  # Descanso
+        n = len(teams)
+        rounds = []
+        rotation = teams[:]
+        half = n - 1 if max_rounds is None else min(n - 1, max_rounds)
+        for r in range(half):
+            pairs = []
+            for i in range(n // 2):
+                home, away = rotation[i], rotation[n - 1 - i]
+                if home is None or away is None:
+                    continue
+                # Alterna local y visitante para equilibrar partidos en casa
+                if (r + i) % 2:
+                    home, away = away, home
+                pairs.append((home, away))
+            rounds.append(pairs)
+            rotation = [rotation[0], rotation[-1]] + rotation[1:-1]
+
+        if double_round:
+            rounds += [[(away, home) for home, away in pairs] for pairs in rounds]
+        if max_rounds is not None:
+            rounds = rounds[:max_rounds]
+
+        matches = []
+        for r, pairs in enumerate(rounds):
+            round_date = start_date + timedelta(days=r * days_between_rounds)
+            for i, (home, away) in enumerate(pairs):
+                day = i // matches_per_day if matches_per_day else 0
+                matches.append(Match(f"{prefix}-R{r + 1:03d}-{i + 1:04d}", round_date + timedelta(days=day), home, away))
+        return matches
+
+    def assign_referees(self, matches, referees, conflicts=None):
+        """
+        Asigna árbitros de forma voraz: por cada día se toma el árbitro con menos
+        partidos asignados que no haya dirigido ese día y que no tenga conflicto
+        con ninguno de los dos equipos. Retorna la lista de partidos sin árbitro.
+        """
+        conflicts = conflicts or {}
+        blocked = {}
+        for ref in referees:
+            teams = set(conflicts.get(ref.get_id(), ()))
+            if isinstance(ref, Referee) and ref.get_club():
+                teams.add(ref.get_club())
+            blocked[ref.get_id()] = teams
+
+        # Montículo global ordenado por carga de trabajo
+        heap = [(0, ref.get_id()) for ref in referees]
+        heapq.heapify(heap)
+
+        by_day = defaultdict(list)
+        for match in matches:
+            by_day[match.get_date().date()].append(match)
+
+        unassigned = []
+        for day in sorted(by_day):
+            used_today = []
+            for match in by_day[day]:
+                teams = {match.get_home_team(), match.get_away_team()}
+                skipped = []
+                chosen = None
+                while heap:
+                    load, ref_id = heapq.heappop(heap)
+                    if blocked[ref_id] & teams:
+                        skipped.append((load, ref_id))
+                        continue
+                    chosen = (load, ref_id)
+                    break
+                for item in skipped:
+                    heapq.heappush(heap, item)
+                if chosen is None:
+                    match.set_referee(None)
+                    unassigned.append(match)
+                    continue
+                match.set_referee(chosen[1])
+                used_today.append((chosen[0] + 1, chosen[1]))
+            # Los árbitros usados vuelven a estar disponibles al día siguiente
+            for item in used_today:
+                heapq.heappush(heap, item)
+        return unassigned
+
+    def create_season(self, start_date: datetime, team_ids=None, days_between_rounds=7,
+                      matches_per_day=None, double_round=True, prefix="M"):
+        if team_ids is None:
+            team_ids = [t.get_id() for t in self.teams_repo.findAll()]
+        matches = self.generate_round_robin(team_ids, start_date, days_between_rounds,
+                                            matches_per_day, double_round, prefix)
+        # Se verifica antes de escribir para no dejar una temporada a medias
+        existing = self.matches_repo.find_many([match.get_id() for match in matches])
+        if existing:
+            raise ValueError(f"Ya existen partidos con estos IDs: {', '.join(sorted(existing))}")
+        unassigned = self.assign_referees(matches, self.referee_repo.findAll())
+        if self.matches_repo.save_many(matches) != len(matches):
+            raise ValueError("Otro proceso guardó partidos con los mismos IDs mientras se creaba la temporada")
+        return matches, unassigned
+
+    def get_instance():
+        if ScheduleService._instance is None:
+            with ScheduleService._lock:
+                if ScheduleService._instance is None:
+                    ScheduleService._instance = ScheduleService()
+        return ScheduleService._instance
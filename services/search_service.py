@@ -0,0 +1,86 @@
+import threading
+from project import ClubMember, Referee
+from .auth_service import AuthService
+from database.name_index import TrigramIndex
+from database.repository import RepositoryProvider
+
+class SearchService:
+    _instance = None
+    _lock = threading.Lock()
+    USER_TYPES = ("Player", "ClubMember", "Referee")
+
+    def __init__(self):
+        self.auth_service: AuthService = AuthService.get_instance()
+        self._index = None
+        self._generations = {}
+        self._index_lock = threading.Lock()
+
+    @property
+    def index(self):
+        # El índice se arma con la primera búsqueda y en las siguientes se
+        # ponen al día los tipos que otro proceso modificó
+        if self._index is None:
+            with self._index_lock:
+                if self._index is None:
+                    self._index = self._build_index()
+        self._sync()
+        return self._index
+
+    def _build_index(self):
+        index = TrigramIndex()
+        for type_name in self.USER_TYPES:
+            repo = RepositoryProvider.get(type_name)
+            if repo is None:
+                continue
+            self._rebuild(index, type_name, repo)
+            repo.subscribe(self._listener(index, type_name, repo))
+        return index
+
+    def _rebuild(self, index, type_name, repo):
+        # Como UserDirectory._rebuild: la generación se toma antes de leer, y
+        # solo se reindexan los nombres que cambiaron
+        generation = repo.get_generation()
+        names = {user.get_id(): user.get_name() for user in repo.findAll()}
+        indexed = {key[1]: label for key, label in index.items() if key[0] == type_name}
+        for id in indexed.keys() - names.keys():
+            index.remove((type_name, id))
+        for id, name in names.items():
+            if indexed.get(id) != name:
+                index.add((type_name, id), name)
+        self._generations[type_name] = generation
+
+    def _sync(self):
+        # Las escrituras de otros procesos no pasan por los listeners: se
+        # detectan con get_generation(), que incluye la marca del almacenamiento
+        for type_name in self.USER_TYPES:
+            repo = RepositoryProvider.get(type_name)
+            if repo is not None and self._generations.get(type_name) != repo.get_generation():
+                with self._index_lock:
+                    if self._generations.get(type_name) != repo.get_generation():
+                        self._rebuild(self._index, type_name, repo)
+
+    def _listener(self, index, type_name, repo):
+        def on_change(event, id, element):
+            if event == "delete":
+                index.remove((type_name, id))
+            else:
+                index.add((type_name, id), element.get_name())
+            # La escritura propia ya está en el índice: no obliga a releer el tipo
+            self._generations[type_name] = repo.get_generation()
+        return on_change
+
+    def search_by_name(self, query, types=None, limit=10, prefix=False, session=None):
+        current_user = self.auth_service.get_current_user(session)
+        if not isinstance(current_user, (ClubMember, Referee)):
+            raise ValueError("No tienes permisos")
+        types = set(types or self.USER_TYPES)
+        results = self.index.search(query, limit=limit, prefix=prefix, keys_filter=lambda key: key[0] in types)
+        return [{"type": key[0], "_id": key[1], "_name": name, "score": round(score, 3)}
+                for key, name, score in results]
+
+    def get_instance():
+        if SearchService._instance is None:
+            with SearchService._lock:
+                if SearchService._instance is None:
+                    SearchService._instance = SearchService()
+        return SearchService._instance
@@ -0,0 +1,67 @@
+import secrets
+import threading
+import time
+from collections import OrderedDict
+
+class Session:
+    def __init__(self, token, user, expires_at):
+        self.token = token
+        self.user = user
+        self.expires_at = expires_at
+
+    def get_user(self):
+        return self.user
+
+
+class SessionStore:
+    """
+    Sesiones indexadas por token con expiración por inactividad (TTL).
+    El OrderedDict se mantiene ordenado por último acceso, así que las
+    sesiones vencidas siempre están al principio y se eliminan en O(1).
+    """
+    def __init__(self, ttl=1800, clock=time.monotonic):
+        self.ttl = ttl
+        self._clock = clock
+        self._sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._sessions)
+
+    def create(self, user):
+        self.evict_expired()
+        token = secrets.token_urlsafe(32)
+        session = Session(token, user, self._clock() + self.ttl)
+        with self._lock:
+            self._sessions[token] = session
+        return session
+
+    def get(self, token):
+        with self._lock:
+            session = self._sessions.get(token)
+            if session is None:
+                return None
+            now = self._clock()
+            if session.expires_at <= now:
+                del self._sessions[token]
+                return None
+            # Renueva el TTL y mueve la sesión al final
+            session.expires_at = now + self.ttl
+            self._sessions.move_to_end(token)
+            return session
+
+    def revoke(self, token):
+        with self._lock:
+            return self._sessions.pop(token, None)
+
+    def evict_expired(self):
+        now = self._clock()
+        evicted = 0
+        with self._lock:
+            while self._sessions:
+                token, session = next(iter(self._sessions.items()))
+                if session.expires_at > now:
+                    break
+                del self._sessions[token]
+                evicted += 1
+        return evicted
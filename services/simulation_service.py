@@ -0,0 +1,185 @@
+import math
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from database.repository import RepositoryProvider
+from .rating_service import RatingService
+
+# Promedio de goles por partido para el local y el visitante cuando ambos equipos
+# tienen la misma puntuación
+HOME_GOALS = 1.45
+AWAY_GOALS = 1.15
+# Escala que convierte diferencia de puntuación Elo en multiplicador de goles
+GOAL_SCALE = 800
+Z_95 = 1.959964
+
+
+def _poisson(rng, threshold):
+    # Algoritmo de Knuth; threshold = exp(-lambda) precalculado por partido
+    k = 0
+    p = rng.random()
+    while p > threshold:
+        k += 1
+        p *= rng.random()
+    return k
+
+
+def _simulate_chunk(args):
+    """
+    Simula un bloque independiente de temporadas. Se ejecuta en un proceso
+    del pool, por lo que solo recibe y devuelve tipos básicos serializables.
+    """
+    table, fixtures, simulations, seed, relegation_spots = args
+    rng = random.Random(seed)
+    n = len(table)
+    titles = [0] * n
+    relegations = [0] * n
+    # Umbrales de Poisson calculados una sola vez para todo el bloque
+    thresholds = [(h, a, math.exp(-lh), math.exp(-la)) for h, a, lh, la in fixtures]
+
+    for _ in range(simulations):
+        points = [t[0] for t in table]
+        goal_diff = [t[1] for t in table]
+        goals_for = [t[2] for t in table]
+        for h, a, th, ta in thresholds:
+            hg = _poisson(rng, th)
+            ag = _poisson(rng, ta)
+            goals_for[h] += hg
+            goals_for[a] += ag
+            goal_diff[h] += hg - ag
+            goal_diff[a] += ag - hg
+            if hg > ag:
+                points[h] += 3
+            elif hg < ag:
+                points[a] += 3
+            else:
+                points[h] += 1
+                points[a] += 1
+        order = sorted(range(n), key=lambda i: (points[i], goal_diff[i], goals_for[i], rng.random()), reverse=True)
+        titles[order[0]] += 1
+        for i in order[n - relegation_spots:]:
+            relegations[i] += 1
+    return titles, relegations
+
+
+def wilson_interval(successes, total, z=Z_95):
+    if total == 0:
+        return (0.0, 0.0)
+    p = successes / total
+    denominator = 1 + z * z / total
+    center = (p + z * z / (2 * total)) / denominator
+    margin = z * math.sqrt(p * (1 - p) / total + z * z / (4 * total * total)) / denominator
+    return (max(0.0, center - margin), min(1.0, center + margin))
+
+
+class SimulationService:
+    _instance = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.rating_service: RatingService = RatingService.get_instance()
+
+    @property
+    def matches_repo(self):
+        return RepositoryProvider.get("Match")
+
+    def _expected_goals(self, home_rating, away_rating):
+        diff = home_rating + RatingService.HOME_ADVANTAGE - away_rating
+        factor = 10 ** (diff / GOAL_SCALE)
+        return HOME_GOALS * factor, AWAY_GOALS / factor
+
+    def _build_season(self, matches):
+        teams = sorted({t for m in matches for t in (m.get_home_team(), m.get_away_team())})
+        index = {team: i for i, team in enumerate(teams)}
+        # Tabla actual: [puntos, diferencia de goles, goles a favor]
+        table = [[0, 0, 0] for _ in teams]
+        fixtures = []
+        ratings = {team: self.rating_service.get_rating(team) for team in teams}
+
+        for m in matches:
+            h, a = index[m.get_home_team()], index[m.get_away_team()]
+            if m.get_status() == "scheduled":
+                lh, la = self._expected_goals(ratings[m.get_home_team()], ratings[m.get_away_team()])
+                fixtures.append((h, a, lh, la))
+                continue
+            hg, ag = m.get_home_score(), m.get_away_score()
+            table[h][1] += hg - ag
+            table[a][1] += ag - hg
+            table[h][2] += hg
+            table[a][2] += ag
+            if hg > ag:
+                table[h][0] += 3
+            elif hg < ag:
+                table[a][0] += 3
+            else:
+                table[h][0] += 1
+                table[a][0] += 1
+        return teams, [tuple(t) for t in table], fixtures
+
+    def simulate_season(self, simulations=10000, seed=0, workers=None, chunk_size=1000, relegation_spots=3, matches=None):
+        """
+        Estima probabilidades de título y descenso simulando los partidos
+        pendientes. Los bloques usan semillas derivadas de `seed`, por lo que
+        el resultado es reproducible sin importar el número de procesos.
+        """
+        if simulations < 1:
+            raise ValueError("Se necesita al menos una simulación")
+        if chunk_size < 1:
+            raise ValueError("El tamaño de bloque debe ser al menos 1")
+        if matches is None:
+            matches = self.matches_repo.findAll()
+        teams, table, fixtures = self._build_season(matches)
+        if not teams:
+            return None
+        relegation_spots = min(relegation_spots, len(teams))
+
+        chunks = []
+        remaining, i = simulations, 0
+        while remaining > 0:
+            size = min(chunk_size, remaining)
+            chunks.append((table, fixtures, size, f"{seed}:{i}", relegation_spots))
+            remaining -= size
+            i += 1
+
+        start = time.perf_counter()
+        if workers == 1:
+            results = [_simulate_chunk(chunk) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(_simulate_chunk, chunks))
+        elapsed = time.perf_counter() - start
+
+        titles = [0] * len(teams)
+        relegations = [0] * len(teams)
+        for chunk_titles, chunk_relegations in results:
+            for i in range(len(teams)):
+                titles[i] += chunk_titles[i]
+                relegations[i] += chunk_relegations[i]
+
+        probabilities = []
+        for i, team in enumerate(teams):
+            probabilities.append({
+                "team": team,
+                "points": table[i][0],
+                "title": titles[i] / simulations,
+                "title_ci": wilson_interval(titles[i], simulations),
+                "relegation": relegations[i] / simulations,
+                "relegation_ci": wilson_interval(relegations[i], simulations),
+            })
+        probabilities.sort(key=lambda p: (p["title"], -p["relegation"]), reverse=True)
+        return {
+            "simulations": simulations,
+            "remaining_matches": len(fixtures),
+            "seed": seed,
+            "elapsed": elapsed,
+            "simulations_per_sec": simulations / elapsed if elapsed > 0 else float("inf"),
+            "teams": probabilities
+        }
+
+    def get_instance():
+        if SimulationService._instance is None:
+            with SimulationService._lock:
+                if SimulationService._instance is None:
+                    SimulationService._instance = SimulationService()
+        return SimulationService._instance
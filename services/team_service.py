@@ -1,65 +1,132 @@
-from project import User, Player, ClubMember, Referee
+import threading
+from project import User, Player, ClubMember, Referee, Team
 from .auth_service import AuthService
 from database.repository import RepositoryProvider
+from database.membership_index import MembershipIndex
 
 class TeamService:
     _instance = None
+    _lock = threading.Lock()
 
     def __init__(self):
         self.auth_service: AuthService = AuthService.get_instance()
-        self.teams_repo = RepositoryProvider.get("Team")
-        self.players_repo = RepositoryProvider.get("Player")
+        self._membership = None
+        self._membership_lock = threading.Lock()
+        self._index_lock = threading.Lock()
 
-    def create_team(self, team_id, name=None):
-        current_user = self.auth_service.get_current_user()
+    @property
+    def membership(self):
+        # El índice se construye con la primera consulta de plantillas
+        if self._membership is None:
+            with self._index_lock:
+                if self._membership is None:
+                    self._membership = MembershipIndex()
+        return self._membership
+
+    @property
+    def teams_repo(self):
+        return RepositoryProvider.get("Team")
+
+    @property
+    def players_repo(self):
+        return RepositoryProvider.get("Player")
+
+    def create_team(self, team_id, name=None, session=None):
+        current_user = self.auth_service.get_current_user(session)
         if not isinstance(current_user, ClubMember) or current_user.get_role() != "coach":
             raise ValueError("No tienes permisos")
         if self.teams_repo.find(team_id):
             raise ValueError("El equipo ya existe")
-        team = {"id": team_id, "name": name, "players": []}
+        team = Team(team_id, name or team_id, coach=current_user.get_id())
         self.teams_repo.save(team)
         return team
 
-    def get_team_info(self, team_id=None):
+    def get_team_info(self, team_id=None, session=None):
         team = self.teams_repo.find(team_id) if team_id else None
         if not team:
             return None
         return team
 
-    def add_player_to_team(self, team_id, player_id):
-        current_user = self.auth_service.get_current_user()
+    def get_team_roster(self, team_id, session=None):
+        # Equipo con jugadores, staff y entrenador cargados en una consulta por repositorio
+        team = self.teams_repo.find(team_id) if team_id else None
+        if not team:
+            return None
+        team.load_graph()
+        coach = team.get_coach()
+        return {
+            "team": team.serialize(),
+            "coach": coach.serialize() if isinstance(coach, ClubMember) else None,
+            "players": [p.serialize() for p in team.get_players()],
+            "staff": [s.serialize() for s in team.get_staff()],
+        }
+
+    def add_player_to_team(self, team_id, player_id, session=None):
+        current_user = self.auth_service.get_current_user(session)
         if not isinstance(current_user, ClubMember) or current_user.get_role() != "coach":
             raise ValueError("No tienes permisos")
-        team = self.teams_repo.find(team_id)
-        if not team:
-            return False
-        player = self.players_repo.find(player_id)
-        if not isinstance(player, Player):
+        if not self.teams_repo.find(team_id):
             return False
-        player.set_team(team)
-        self.players_repo.replace(player.get_id(), player)
-        return True
+        return self.assign_player(player_id, team_id)
 
-    def remove_player_to_team(self, team_id, player_id):
-        current_user = self.auth_service.get_current_user()
+    def remove_player_to_team(self, team_id, player_id, session=None):
+        current_user = self.auth_service.get_current_user(session)
         if not isinstance(current_user, ClubMember) or current_user.get_role() != "coach":
             raise ValueError("No tienes permisos")
-        team = self.teams_repo.find(team_id)
-        if not team:
+        if not self.teams_repo.find(team_id):
             return False
+        # Se consulta el jugador almacenado, no el índice, justo antes de modificarlo
         player = self.players_repo.find(player_id)
-        if not isinstance(player, Player):
+        if not isinstance(player, Player) or player.get_team_id() != team_id:
             return False
-        if player.get_team() and player.get_team().get_id() == team_id:
-            player.set_team(None)
-            self.players_repo.replace(player.get_id(), player)
+        return self.assign_player(player_id, None)
+
+    def assign_player(self, player_id, team_id):
+        # Cambia el equipo de un jugador manteniendo sincronizados Player._team,
+        # las plantillas de ambos equipos y el índice de pertenencia
+        with self._membership_lock:
+            player = self.players_repo.find(player_id)
+            if not isinstance(player, Player):
+                return False
+            previous = player.get_team_id()
+            if previous == team_id:
+                self._sync_roster(team_id, player_id, True)
+                return True
+            self.players_repo.update(player_id, lambda p: p.set_team(team_id))
+            try:
+                self._sync_roster(previous, player_id, False)
+                self._sync_roster(team_id, player_id, True)
+            except Exception:
+                # Revierte el jugador para no dejar las plantillas a medias
+                self.players_repo.update(player_id, lambda p: p.set_team(previous))
+                self._sync_roster(team_id, player_id, False)
+                self._sync_roster(previous, player_id, True)
+                raise
             return True
-        return False
 
-    def get_all_teams(self):
-        return self.teams_repo.find_all()
+    def _sync_roster(self, team_id, player_id, present):
+        if not team_id:
+            return
+        def change(team):
+            if present:
+                team.add_player(player_id)
+            else:
+                team.remove_player(player_id)
+        self.teams_repo.update(team_id, change)
+
+    def get_team_players(self, team_id):
+        # Plantilla servida desde el índice: una consulta por los IDs del equipo
+        ids = self.membership.roster(team_id)
+        found = self.players_repo.find_many(ids) if ids else {}
+        # Descarta jugadores que cambiaron de equipo después de consultar el índice
+        return [found[i] for i in ids if i in found and found[i].get_team_id() == team_id]
+
+    def get_all_teams(self, session=None):
+        return self.teams_repo.findAll()
 
     def get_instance():
         if TeamService._instance is None:
-            TeamService._instance = TeamService()
+            with TeamService._lock:
+                if TeamService._instance is None:
+                    TeamService._instance = TeamService()
         return TeamService._instance
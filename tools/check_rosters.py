@@ -0,0 +1,32 @@
+import argparse
+import sys
+from main import setup_repositories
+from database.membership_index import MembershipIndex
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica que las plantillas de los equipos coincidan con el equipo de cada jugador")
+    parser.add_argument("--repair", action="store_true", help="Corrige las diferencias encontradas")
+    parser.add_argument("--source", choices=("players", "teams"), default="players",
+                        help="Fuente de verdad al reparar: el _team de los jugadores o las plantillas de los equipos")
+    args = parser.parse_args()
+
+    setup_repositories()
+    index = MembershipIndex()
+    issues = index.check()
+    for issue in issues:
+        team = issue["team"] if issue["exists"] else f"{issue['team']} (no existe)"
+        print(f"{team}: faltan {issue['missing']} | sobran {issue['extra']}")
+    if not issues:
+        print("Plantillas consistentes")
+        return
+    if not args.repair:
+        sys.exit(1)
+    fixed = index.repair(args.source)
+    remaining = index.check()
+    print(f"Reparaciones aplicadas: {fixed} | diferencias restantes: {len(remaining)}")
+    sys.exit(1 if remaining else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,252 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from database.lsm_repository import LSMRepository
+from database.sharded_repository import ShardedRepository, shard_of
+from project import Player
+from tools.generate_league import generate_league
+
+
+def _players(teams=6, players_per_team=20):
+    return generate_league(0, teams=teams, players_per_team=players_per_team, staff_per_team=1, rounds=1)["Player"]
+
+
+def _snapshot(repository):
+    return {player.get_id(): (player.serialize(), player._version) for player in repository.findAll()}
+
+
+def _shard_problems(repository):
+    # Cada registro debe estar una sola vez y en el shard que le toca según el manifiesto
+    manifest = repository._manifest()
+    problems, seen = [], set()
+    for shard in range(manifest["shards"]):
+        for record in repository._load(repository._path(manifest, shard)):
+            if record["_id"] in seen:
+                problems.append(f"{record['_id']} está duplicado")
+            seen.add(record["_id"])
+            expected = repository._target(manifest, record)
+            if expected != shard:
+                problems.append(f"{record['_id']} está en el shard {shard} y debería estar en el {expected}")
+    leftovers = sorted(name for name in os.listdir(repository.folder)
+                       if name.startswith("shard-") and not name.startswith(f"shard-{manifest['generation']:04d}-"))
+    if leftovers:
+        problems.append(f"quedaron shards de generaciones anteriores: {leftovers}")
+    return problems
+
+
+def check_reshard():
+    """Un reshard (cambio de número de shards y de partición) conserva todos los registros y sus versiones."""
+    repository = ShardedRepository(Player, 4, "_id", workers=1)
+    repository.save_many(_players())
+    repository.patch("T00001-P01", {"goals": 3})
+    expected = _snapshot(repository)
+    problems = []
+    for shards, partition in ((7, "_team"), (3, "_id"), (1, "_team")):
+        repository.reshard(shards, partition)
+        step = f"{shards} shards por {partition}"
+        current = _snapshot(repository)
+        if current != expected:
+            missing = sorted(set(expected) - set(current))
+            changed = sorted(id for id in set(expected) & set(current) if expected[id] != current[id])
+            problems.append(f"{step}: faltan {missing} | cambiaron {changed}")
+        problems += [f"{step}: {problem}" for problem in _shard_problems(repository)]
+        found = repository.find_many(expected)
+        if len(found) != len(expected) or any(repository.find(id) is None for id in expected):
+            problems.append(f"{step}: find/find_many no encuentran todos los registros")
+        # Otra instancia (otro proceso) ve lo mismo a partir de los archivos
+        if _snapshot(ShardedRepository(Player, workers=1)) != expected:
+            problems.append(f"{step}: otra instancia no ve los mismos registros")
+    return problems
+
+
+def check_cross_shard_move():
+    """Cambiar el campo de partición mueve el registro de shard sin duplicarlo ni perderlo."""
+    repository = ShardedRepository(Player, 4, "_team", workers=1)
+    players = _players()
+    repository.save_many(players)
+    manifest = repository._manifest()
+    problems = []
+    moves = 0
+    for player in players[::7]:
+        id = player.get_id()
+        old = shard_of(player.get_team_id(), manifest["shards"])
+        team = next(p.get_team_id() for p in players if shard_of(p.get_team_id(), manifest["shards"]) != old)
+        version = repository.find(id)._version
+        if not repository.patch(id, {"team": team}, expected_version=version):
+            problems.append(f"{id}: patch retornó False")
+            continue
+        moves += 1
+        moved = repository.find(id)
+        if moved is None or moved.get_team_id() != team or moved._version != version + 1:
+            problems.append(f"{id}: después de moverlo find retorna {moved and moved.serialize()}")
+        other = ShardedRepository(Player, workers=1).find(id)
+        if other is None or other.get_team_id() != team:
+            problems.append(f"{id}: otra instancia no lo encuentra en su nuevo shard")
+    problems += _shard_problems(repository)
+    if len(repository.findAll()) != len(players):
+        problems.append(f"findAll retorna {len(repository.findAll())} registros, se esperaban {len(players)}")
+    # Borrar un registro movido lo quita de su shard nuevo
+    moved_id = players[0].get_id()
+    repository.delete(moved_id)
+    if repository.find(moved_id) is not None or ShardedRepository(Player, workers=1).find(moved_id) is not None:
+        problems.append(f"{moved_id}: sigue existiendo después de borrarlo")
+    if not moves:
+        problems.append("no se movió ningún registro")
+    return problems
+
+
+def _crash_writer():
+    # Se ejecuta en un proceso aparte que termina sin close(): parte de los
+    # registros queda en un segmento y el resto solo en el WAL
+    repository = LSMRepository(Player, memtable_limit=50, merge_threshold=100)
+    players = _players()
+    repository.save_many(players[:60])
+    repository.save_many(players[60:])
+    for player in players[::5]:
+        repository.increment_fields(player.get_id(), {"goals": 1})
+    repository.patch(players[1].get_id(), {"name": "Renombrado"})
+    repository.delete(players[2].get_id())
+    repository.delete(players[61].get_id())
+    with open("expected.json", "w", encoding="utf-8") as f:
+        json.dump(_snapshot(repository), f)
+    os._exit(0)
+
+
+def _lsm_snapshot(repository):
+    # Mismo formato que expected.json (las tuplas pasan a listas en JSON)
+    return {id: [record, version] for id, (record, version) in _snapshot(repository).items()}
+
+
+def check_wal_replay():
+    """Tras una caída se recupera todo lo escrito, y una última línea cortada del WAL no se aplica."""
+    root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [root, os.environ.get("PYTHONPATH")])))
+    subprocess.run([sys.executable, "-c", "from tools.check_storage import _crash_writer; _crash_writer()"],
+                   env=env, check=True)
+    with open("expected.json", encoding="utf-8") as f:
+        expected = json.load(f)
+    wal_file = os.path.join("data", "players.lsm", "wal.log")
+    problems = []
+    if not os.path.getsize(wal_file):
+        problems.append("el WAL quedó vacío: la verificación no ejercita la recuperación")
+    # Escritura interrumpida: JSON completo pero sin el salto de línea final
+    torn = Player("TORN-1", "Cortado", 20, "1234", None, "GK").serialize()
+    with open(wal_file, "ab") as f:
+        f.write(json.dumps(["TORN-1", dict(torn, _version=1)], separators=(",", ":")).encode("utf-8"))
+
+    repository = LSMRepository(Player, memtable_limit=50, merge_threshold=100)
+    if _lsm_snapshot(repository) != expected:
+        problems.append("los registros recuperados no coinciden con los escritos antes de la caída")
+    if repository.find("TORN-1") is not None:
+        problems.append("se aplicó la última línea cortada del WAL")
+    with open(wal_file, "rb") as f:
+        wal = f.read()
+    if b"TORN-1" in wal or (wal and not wal.endswith(b"\n")):
+        problems.append("la línea cortada no se quitó del WAL")
+    # Lo que se escriba después no debe quedar pegado a la línea cortada
+    repository.save(Player("AFTER-1", "Después", 21, "1234", None, "DC"))
+    repository.close()
+    repository = LSMRepository(Player, memtable_limit=50, merge_threshold=100)
+    if repository.find("AFTER-1") is None:
+        problems.append("se perdió la escritura posterior a la recuperación")
+    if len(repository.findAll()) != len(expected) + 1:
+        problems.append(f"findAll retorna {len(repository.findAll())} registros, se esperaban {len(expected) + 1}")
+    repository.close()
+    return problems
+
+
+def check_compaction():
+    """La compactación deja un solo segmento con la última versión de cada registro y sin los borrados."""
+    repository = LSMRepository(Player, memtable_limit=25, merge_threshold=1000)
+    players = _players()
+    repository.save_many(players)
+    # Varias versiones de los mismos registros repartidas en distintos segmentos
+    for _ in range(3):
+        for player in players[::3]:
+            repository.increment_fields(player.get_id(), {"goals": 1})
+        repository.flush()
+    deleted = [player.get_id() for player in players[::10]]
+    for id in deleted:
+        repository.delete(id)
+    repository.flush()
+    expected = _snapshot(repository)
+    old_segments = [segment.name for segment in repository._segments]
+    problems = []
+    if len(old_segments) < 2:
+        problems.append(f"solo hay {len(old_segments)} segmentos: la verificación no ejercita la fusión")
+
+    repository.compact()
+    if len(repository._segments) != 1:
+        problems.append(f"quedaron {len(repository._segments)} segmentos después de compactar")
+    entries = list(repository._segments[0].scan())
+    ids = [id for id, _ in entries]
+    if len(ids) != len(set(ids)):
+        problems.append("el segmento compactado tiene IDs repetidos")
+    if any(record is None for _, record in entries):
+        problems.append("el segmento compactado conserva lápidas")
+    if set(ids) != set(expected):
+        problems.append(f"el segmento compactado tiene {len(ids)} registros, se esperaban {len(expected)}")
+    stale = sorted(id for id, record in entries
+                   if id in expected and record.get("_version") != expected[id][1])
+    if stale:
+        problems.append(f"versiones viejas después de compactar: {stale}")
+    if any(repository.find(id) is not None for id in deleted):
+        problems.append("un registro borrado reapareció después de compactar")
+    if _snapshot(repository) != expected:
+        problems.append("findAll cambió después de compactar")
+    leftovers = sorted(set(old_segments) & set(os.listdir(repository.folder)))
+    if leftovers:
+        problems.append(f"quedaron los segmentos fusionados: {leftovers}")
+    repository.close()
+    repository = LSMRepository(Player, memtable_limit=25, merge_threshold=1000)
+    if _snapshot(repository) != expected:
+        problems.append("al reabrir no se ven los mismos registros")
+    repository.close()
+    return problems
+
+
+CHECKS = {
+    "reshard": check_reshard,
+    "cross-shard-move": check_cross_shard_move,
+    "wal-replay": check_wal_replay,
+    "compaction": check_compaction,
+}
+
+
+def run(name):
+    # Cada verificación usa su propio data/ en un directorio temporal
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as folder:
+        os.chdir(folder)
+        try:
+            return CHECKS[name]()
+        except Exception as e:
+            return [f"error inesperado: {type(e).__name__}: {e}"]
+        finally:
+            os.chdir(cwd)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verifica el comportamiento de los almacenamientos por shards y LSM "
+                                                 "en un directorio temporal (no toca data/)")
+    parser.add_argument("checks", nargs="*", help=f"Verificaciones a ejecutar (por defecto todas): {', '.join(CHECKS)}")
+    args = parser.parse_args()
+    unknown = [name for name in args.checks if name not in CHECKS]
+    if unknown:
+        parser.error(f"verificaciones desconocidas: {', '.join(unknown)}")
+
+    failed = 0
+    for name in args.checks or CHECKS:
+        problems = run(name)
+        print(f"{name}: {'OK' if not problems else 'FALLA'}")
+        for problem in problems:
+            print(f"  {problem}")
+        failed += bool(problems)
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,38 @@
+import argparse
+import os
+from database.json_repository import JSONRepository
+from database.storage_codecs import CODEC_NAMES, detect
+from main import REPOSITORIES
+
+
+def convert(cls, codec):
+    """
+    Reescribe el archivo de una entidad con `codec`. Se lee con el formato que
+    indique su cabecera y se escribe bajo el lock de escritura del repositorio,
+    así que es seguro aunque la aplicación esté abierta en otro proceso.
+    Retorna (formato anterior, bytes antes, bytes después).
+    """
+    repository = JSONRepository(cls, codec=codec)
+    with repository._writing():
+        with open(repository.filename, "rb") as f:
+            previous = detect(f.read(64))[0].name
+        before = os.path.getsize(repository.filename)
+        repository._save(repository._load())
+    return previous, before, os.path.getsize(repository.filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convierte los archivos de data/ a otro formato de almacenamiento")
+    parser.add_argument("codec", choices=CODEC_NAMES)
+    parser.add_argument("--only", nargs="+", choices=sorted(REPOSITORIES), help="Entidades a convertir (por defecto todas)")
+    args = parser.parse_args()
+
+    for name, cls in REPOSITORIES.items():
+        if args.only and name not in args.only:
+            continue
+        previous, before, after = convert(cls, args.codec)
+        print(f"{name:<12} {previous:>14} -> {args.codec:<14} {before / 1024:>12.1f} KB -> {after / 1024:>10.1f} KB")
+
+
+if __name__ == "__main__":
+    main()
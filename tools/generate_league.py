@@ -0,0 +1,200 @@
+import argparse
+import math
+import random
+import time
+from datetime import datetime
+from main import setup_repositories
+from database.repository import RepositoryProvider
+from database.storage_codecs import CODEC_NAMES
+from project import Player, ClubMember, Referee, Team, Position
+from services.schedule_service import ScheduleService
+
+
+FIRST_NAMES = ["Juan", "Carlos", "Andrés", "Luis", "Santiago", "Mateo", "Diego", "Sebastián", "Julián",
+               "Felipe", "David", "Daniel", "Miguel", "Alejandro", "Nicolás", "Samuel", "Tomás", "Pablo",
+               "Martín", "Gabriel", "Jorge", "Iván", "Óscar", "Camilo", "Esteban", "Hugo", "Lucas", "Adrián"]
+LAST_NAMES = ["García", "Rodríguez", "Martínez", "López", "González", "Pérez", "Sánchez", "Ramírez",
+              "Torres", "Flores", "Rivera", "Gómez", "Díaz", "Reyes", "Morales", "Ortiz", "Castro",
+              "Vargas", "Romero", "Herrera", "Medina", "Aguilar", "Rojas", "Navarro", "Jiménez", "Ruiz"]
+CITIES = ["Bogotá", "Medellín", "Cali", "Barranquilla", "Cartagena", "Bucaramanga", "Pereira", "Manizales",
+          "Santa Marta", "Ibagué", "Pasto", "Cúcuta", "Villavicencio", "Neiva", "Armenia", "Tunja",
+          "Montería", "Popayán", "Valledupar", "Sincelejo"]
+SUFFIXES = ["FC", "United", "Atlético", "Deportivo", "Real", "Independiente", "Club", "Sporting"]
+
+# Plantilla tipo de 25 jugadores; equipos más grandes repiten el ciclo
+SQUAD = [Position.GK, Position.DFC, Position.DFC, Position.LD, Position.LI, Position.MCD, Position.MC,
+         Position.MC, Position.MCO, Position.LW, Position.RW, Position.DC,
+         Position.GK, Position.DFC, Position.DFC, Position.LD, Position.LI, Position.MCD, Position.MC,
+         Position.MCO, Position.LW, Position.RW, Position.DC, Position.DC, Position.GK]
+# Peso ofensivo (goles, asistencias, disparos) y despejes esperados por partido
+ATTACK = {Position.GK: 0.01, Position.DFC: 0.15, Position.LD: 0.25, Position.LI: 0.25, Position.MCD: 0.3,
+          Position.MC: 0.5, Position.MCO: 0.9, Position.LW: 1.0, Position.RW: 1.0, Position.DC: 1.6}
+CLEARANCES = {Position.GK: 1.0, Position.DFC: 4.0, Position.LD: 2.0, Position.LI: 2.0, Position.MCD: 2.0,
+              Position.MC: 1.0, Position.MCO: 0.4, Position.LW: 0.3, Position.RW: 0.3, Position.DC: 0.3}
+STAFF_ROLES = ["staff", "physio", "manager"]
+STAT_FIELDS = ("goals", "assists", "shots", "shots_on_target", "clearances")
+
+
+def _poisson(rng, lam):
+    # Algoritmo de Knuth: suficiente para las medias pequeñas de un partido
+    threshold = math.exp(-lam)
+    k = 0
+    p = rng.random()
+    while p > threshold:
+        k += 1
+        p *= rng.random()
+    return k
+
+
+def _name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _age(rng, mean, sd, low, high):
+    return max(low, min(high, int(round(rng.gauss(mean, sd)))))
+
+
+def _lineup(rng, squad):
+    # Once inicial con un portero y tres cambios tomados del resto
+    keepers = [p for p in squad if p.get_position() == Position.GK]
+    outfield = [p for p in squad if p.get_position() != Position.GK]
+    starters = keepers[:1] + rng.sample(outfield, min(10, len(outfield)))
+    bench = [p for p in outfield if p not in starters]
+    return starters + rng.sample(bench, min(3, len(bench)))
+
+
+def _team_stats(rng, lineup, goals):
+    stats = {p.get_id(): dict.fromkeys(STAT_FIELDS, 0) for p in lineup}
+    weights = [ATTACK[p.get_position()] for p in lineup]
+    for _ in range(goals):
+        scorer = rng.choices(lineup, weights)[0]
+        stats[scorer.get_id()]["goals"] += 1
+        if rng.random() < 0.7:
+            others = [p for p in lineup if p is not scorer]
+            assistant = rng.choices(others, [ATTACK[p.get_position()] for p in others])[0]
+            stats[assistant.get_id()]["assists"] += 1
+    for player in lineup:
+        s = stats[player.get_id()]
+        position = player.get_position()
+        on_target = s["goals"] + _poisson(rng, 0.6 * ATTACK[position])
+        s["shots_on_target"] = on_target
+        s["shots"] = on_target + _poisson(rng, 0.8 * ATTACK[position])
+        s["clearances"] = _poisson(rng, CLEARANCES[position])
+    return stats
+
+
+def generate_league(seed=0, teams=20, players_per_team=25, staff_per_team=3, referees=None,
+                    start_date=datetime(2025, 1, 4), rounds=None, played=1.0, password="1234"):
+    """
+    Genera una liga sintética y determinista: la misma semilla produce
+    exactamente los mismos registros. Los totales de cada jugador son la
+    suma de sus estadísticas en los partidos jugados. Retorna un dict
+    {nombre del repositorio: lista de entidades}.
+    """
+    rng = random.Random(seed)
+    league = {"Team": [], "Player": [], "ClubMember": [], "Referee": [], "Match": []}
+    squads = {}
+    strength = {}
+
+    for t in range(teams):
+        team_id = f"T{t + 1:05d}"
+        name = f"{CITIES[t % len(CITIES)]} {SUFFIXES[(t // len(CITIES)) % len(SUFFIXES)]}"
+        if t >= len(CITIES) * len(SUFFIXES):
+            name += f" {t // (len(CITIES) * len(SUFFIXES)) + 1}"
+        squad = [Player(f"{team_id}-P{i + 1:02d}", _name(rng), _age(rng, 26, 4, 17, 38), password,
+                        team_id, SQUAD[i % len(SQUAD)]) for i in range(players_per_team)]
+        staff = [ClubMember(f"{team_id}-S{i + 1:02d}", _name(rng), _age(rng, 45, 8, 28, 70), password,
+                            team_id, "coach" if i == 0 else STAFF_ROLES[(i - 1) % len(STAFF_ROLES)])
+                 for i in range(staff_per_team)]
+        coach = staff[0].get_id() if staff else None
+        league["Team"].append(Team(team_id, name, coach, [p.get_id() for p in squad],
+                                   [s.get_id() for s in staff[1:]]))
+        league["Player"] += squad
+        league["ClubMember"] += staff
+        squads[team_id] = squad
+        # Ataque y defensa relativos, en escala logarítmica
+        strength[team_id] = (rng.gauss(0, 0.2), rng.gauss(0, 0.2))
+
+    team_ids = list(squads)
+    if referees is None:
+        referees = teams // 2 + 2
+    for r in range(referees):
+        # Algunos árbitros pertenecen a un club y no pueden dirigir sus partidos
+        club = rng.choice(team_ids) if team_ids and rng.random() < 0.1 else None
+        league["Referee"].append(Referee(f"R{r + 1:05d}", _name(rng), _age(rng, 38, 6, 25, 55), password,
+                                         f"LIC-{r + 1:05d}", club))
+
+    schedule = ScheduleService.get_instance()
+    matches = schedule.generate_round_robin(team_ids, start_date, max_rounds=rounds)
+    schedule.assign_referees(matches, league["Referee"])
+    dates = sorted({m.get_date() for m in matches})
+    cutoff = dates[int(len(dates) * played) - 1] if dates and played > 0 else None
+
+    players = {p.get_id(): p for p in league["Player"]}
+    for match in matches:
+        if cutoff is None or match.get_date() > cutoff:
+            continue
+        home, away = match.get_home_team(), match.get_away_team()
+        home_goals = _poisson(rng, 1.45 * math.exp(strength[home][0] - strength[away][1]))
+        away_goals = _poisson(rng, 1.15 * math.exp(strength[away][0] - strength[home][1]))
+        stats = _team_stats(rng, _lineup(rng, squads[home]), home_goals)
+        stats.update(_team_stats(rng, _lineup(rng, squads[away]), away_goals))
+        match._home_score = home_goals
+        match._away_score = away_goals
+        match._player_stats = stats
+        match.set_status("validated" if match.get_referee() else "finished")
+        match._created_by = match.get_referee()
+        match.set_validated_by(match.get_referee())
+        for player_id, s in stats.items():
+            player = players[player_id]
+            for field in STAT_FIELDS:
+                setattr(player, f"_{field}", getattr(player, f"_{field}") + s[field])
+    league["Match"] = matches
+    return league
+
+
+def write_league(league, batch_size=0):
+    # Escribe en los repositorios registrados con save_many, por lotes si se indica
+    written = {}
+    for name, elements in league.items():
+        repo = RepositoryProvider.get(name)
+        size = batch_size or len(elements) or 1
+        written[name] = sum(repo.save_many(elements[i:i + size]) for i in range(0, len(elements), size))
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Genera una liga sintética determinista para pruebas de escala")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--teams", type=int, default=20)
+    parser.add_argument("--players-per-team", type=int, default=25)
+    parser.add_argument("--staff-per-team", type=int, default=3)
+    parser.add_argument("--referees", type=int, default=None, help="Por defecto, la mitad de los equipos más dos")
+    parser.add_argument("--rounds", type=int, default=None, help="Jornadas a generar (por defecto ida y vuelta completas)")
+    parser.add_argument("--played", type=float, default=1.0, help="Fracción de las jornadas ya jugadas (0 a 1)")
+    parser.add_argument("--start-date", type=datetime.fromisoformat, default=datetime(2025, 1, 4))
+    parser.add_argument("--password", default="1234")
+    parser.add_argument("--batch-size", type=int, default=0, help="Registros por save_many (0: todo en una escritura)")
+    # Mismas opciones de almacenamiento que main.py, para sembrar cualquier backend
+    parser.add_argument("--warm-cache", action="store_true", help="Escribe también la caché binaria de los registros")
+    parser.add_argument("--codec", default="json", choices=CODEC_NAMES, help="Formato con el que se escriben los archivos de datos")
+    parser.add_argument("--shards", type=int, metavar="N", help="Reparte cada entidad en N archivos (data/<entidad>s/)")
+    parser.add_argument("--lsm", action="store_true", help="Usa el motor LSM (data/<entidad>s.lsm/)")
+    args = parser.parse_args()
+
+    setup_repositories(warm_cache=args.warm_cache, codec=args.codec, shards=args.shards, lsm=args.lsm)
+    start = time.perf_counter()
+    league = generate_league(args.seed, args.teams, args.players_per_team, args.staff_per_team, args.referees,
+                             args.start_date, args.rounds, args.played, args.password)
+    generated = time.perf_counter()
+    written = write_league(league, args.batch_size)
+    finished = time.perf_counter()
+
+    for name, elements in league.items():
+        print(f"{name}: {written[name]} guardados de {len(elements)} generados")
+    print(f"Generación: {generated - start:.2f}s | Escritura: {finished - generated:.2f}s")
+    print("Las puntuaciones Elo se recalculan con RatingService.replay()")
+
+
+if __name__ == "__main__":
+    main()
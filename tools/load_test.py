@@ -0,0 +1,114 @@
+import argparse
+import asyncio
+import json
+import time
+
+
+def percentile(sorted_values, p):
+    if not sorted_values:
+        return 0.0
+    k = (len(sorted_values) - 1) * p / 100
+    low = int(k)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (k - low)
+
+
+class Connection:
+    # Conexión keep-alive que reutiliza el mismo socket para todas las peticiones
+    def __init__(self, host, port):
+        self.host = host
+        self.port = port
+        self.reader = None
+        self.writer = None
+
+    async def open(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def request(self, method, path, body=None, token=None):
+        payload = json.dumps(body).encode("utf-8") if body is not None else b""
+        lines = [f"{method} {path} HTTP/1.1", f"Host: {self.host}", f"Content-Length: {len(payload)}"]
+        if token:
+            lines.append(f"Authorization: Bearer {token}")
+        self.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + payload)
+        await self.writer.drain()
+
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        status_line, *header_lines = head.decode("latin-1").split("\r\n")
+        status = int(status_line.split(" ")[1])
+        length = 0
+        for line in header_lines:
+            if line.lower().startswith("content-length:"):
+                length = int(line.split(":", 1)[1])
+        data = await self.reader.readexactly(length) if length else b""
+        return status, json.loads(data) if data else None
+
+    async def close(self):
+        if self.writer:
+            self.writer.close()
+            await self.writer.wait_closed()
+
+
+async def worker(args, token, latencies, errors, deadline):
+    conn = Connection(args.host, args.port)
+    await conn.open()
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            status, _ = await conn.request(args.method, args.path, token=token)
+            latencies.append(time.perf_counter() - start)
+            if status >= 400:
+                errors.append(status)
+    finally:
+        await conn.close()
+
+
+async def run(args):
+    token = None
+    if args.user:
+        conn = Connection(args.host, args.port)
+        await conn.open()
+        status, data = await conn.request("POST", "/login", {"id": args.user, "password": args.password,
+                                                              "user_type": args.user_type})
+        await conn.close()
+        if status != 200:
+            raise SystemExit(f"No se pudo iniciar sesión: {data}")
+        token = data["token"]
+
+    latencies, errors = [], []
+    start = time.perf_counter()
+    deadline = start + args.duration
+    await asyncio.gather(*(worker(args, token, latencies, errors, deadline) for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    result = {
+        "path": args.path,
+        "concurrency": args.concurrency,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "requests_per_sec": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 50) * 1000,
+        "p95_ms": percentile(latencies, 95) * 1000,
+        "p99_ms": percentile(latencies, 99) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0) * 1000,
+    }
+    print(json.dumps(result, indent=2))
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de carga local para server.py")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--method", default="GET")
+    parser.add_argument("--path", default="/players")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=10.0, help="Segundos de prueba")
+    parser.add_argument("--user", help="ID para iniciar sesión antes de la prueba")
+    parser.add_argument("--password")
+    parser.add_argument("--user-type", default="referee")
+    asyncio.run(run(parser.parse_args()))
+
+
+if __name__ == "__main__":
+    main()
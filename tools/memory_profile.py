@@ -0,0 +1,54 @@
+import argparse
+import json
+import os
+import tempfile
+from benchmarks.suite import BACKENDS, BENCHMARKS, Context, prepare, register_backend
+from monitoring import profiling
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Perfil de memoria por operación de repositorios y servicios (tracemalloc)")
+    parser.add_argument("--size", type=int, default=10000, help="Jugadores en la liga sintética")
+    parser.add_argument("--backend", default="json", choices=sorted(BACKENDS))
+    parser.add_argument("--only", nargs="+", choices=[name for name, _ in BENCHMARKS])
+    parser.add_argument("--repeat", type=int, default=3, help="Veces que se ejecuta cada operación")
+    parser.add_argument("--site-depth", type=int, default=2, help="Niveles de anidamiento con sitios de asignación")
+    parser.add_argument("--top", type=int, default=5, help="Sitios de asignación por operación")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Guarda el reporte en JSON")
+    parser.add_argument("--compare", help="Reporte JSON anterior para mostrar la variación del pico")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["operations"]
+
+    previous = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix="memprof-") as folder:
+        os.chdir(folder)
+        try:
+            register_backend(args.backend)
+            league = prepare(args.size, args.seed)
+            ctx = Context(league, args.seed)
+            profiler = profiling.enable(site_depth=args.site_depth)
+            try:
+                for name, fn in BENCHMARKS:
+                    if args.only and name not in args.only:
+                        continue
+                    for _ in range(args.repeat):
+                        fn(ctx)
+                report = profiler.report(args.top)
+            finally:
+                profiling.disable()
+        finally:
+            os.chdir(previous)
+
+    profiling.print_report(report, args.top, baseline)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"size": args.size, "backend": args.backend, "operations": report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,30 @@
+import argparse
+import time
+from database.sharded_repository import ShardedRepository
+from database.storage_codecs import CODEC_NAMES
+from main import REPOSITORIES, SHARD_PARTITIONS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cambia el número de shards o el campo de partición de una entidad. "
+                                                 "Se puede ejecutar con la aplicación abierta: las lecturas siguen "
+                                                 "y las escrituras esperan a que termine.")
+    parser.add_argument("entity", choices=sorted(REPOSITORIES))
+    parser.add_argument("--shards", type=int, help="Nuevo número de shards (por defecto el actual)")
+    parser.add_argument("--partition", help="Campo serializado por el que repartir, p. ej. _id o _team")
+    parser.add_argument("--codec", default="json", choices=CODEC_NAMES, help="Formato con el que se escriben los shards")
+    args = parser.parse_args()
+
+    cls = REPOSITORIES[args.entity]
+    # Si la entidad aún no está repartida, se crea con los valores por defecto de main.py
+    repository = ShardedRepository(cls, args.shards or 8, SHARD_PARTITIONS.get(args.entity, "_id"), args.codec)
+    before = repository._manifest()
+    start = time.perf_counter()
+    after = repository.reshard(args.shards, args.partition)
+    print(f"{args.entity}: {before['shards']} shards por {before['partition']} (generación {before['generation']}) -> "
+          f"{after['shards']} shards por {after['partition']} (generación {after['generation']}) "
+          f"en {time.perf_counter() - start:.2f} s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+import argparse
+import os
+import sys
+import tempfile
+import threading
+from multiprocessing import Process
+from database.json_repository import JSONRepository
+from project import Player
+
+
+def run(threads, iterations, readers):
+    """
+    Cada hilo escritor es dueño de un jugador y lo reemplaza `iterations`
+    veces incrementando sus goles, además de guardar jugadores nuevos.
+    Como todos escriben sobre el mismo archivo, cualquier read-modify-write
+    sin sincronizar pierde cambios de los demás hilos.
+    """
+    repo = JSONRepository(Player)
+    for t in range(threads):
+        repo.save(Player(f"w{t}", f"Writer {t}", 20, position="MC"))
+
+    errors = []
+    stop = threading.Event()
+
+    def writer(t):
+        player = repo.find(f"w{t}")
+        for i in range(iterations):
+            player.set_goals(i + 1)
+            repo.replace(player.get_id(), player)
+            repo.save(Player(f"n{t}-{i}", f"New {t}-{i}", 20))
+
+    def reader():
+        while not stop.is_set():
+            try:
+                repo.findAll()
+            except Exception as e:
+                errors.append(f"lectura: {e!r}")
+                return
+
+    reader_threads = [threading.Thread(target=reader) for _ in range(readers)]
+    writer_threads = [threading.Thread(target=writer, args=(t,)) for t in range(threads)]
+    for th in reader_threads + writer_threads:
+        th.start()
+    for th in writer_threads:
+        th.join()
+    stop.set()
+    for th in reader_threads:
+        th.join()
+
+    players = {p.get_id(): p for p in repo.findAll()}
+    for t in range(threads):
+        goals = players[f"w{t}"].get_goals()
+        if goals != iterations:
+            errors.append(f"w{t}: {goals} goles, se esperaban {iterations}")
+        for i in range(iterations):
+            if f"n{t}-{i}" not in players:
+                errors.append(f"n{t}-{i} no fue guardado")
+    return len(players), errors
+
+
+def _increment_worker(folder, iterations):
+    os.chdir(folder)
+    repo = JSONRepository(Player)
+    for _ in range(iterations):
+        repo.update("shared", lambda p: p.set_goals(p.get_goals() + 1), retries=1000)
+
+
+def run_processes(processes, iterations):
+    """
+    Varios procesos incrementan el mismo registro con update(): el lock de
+    archivo y la comparación de versiones deben detectar cada conflicto y
+    reintentar, de modo que el total final sea exacto.
+    """
+    repo = JSONRepository(Player)
+    repo.save(Player("shared", "Shared", 20))
+    workers = [Process(target=_increment_worker, args=(os.getcwd(), iterations)) for _ in range(processes)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    goals = repo.find("shared").get_goals()
+    expected = processes * iterations
+    return (1, []) if goals == expected else (1, [f"shared: {goals} goles, se esperaban {expected}"])
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Prueba de estrés de escrituras concurrentes en JSONRepository")
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--processes", type=int, default=0,
+                        help="Si es mayor que 0, prueba incrementos concurrentes desde varios procesos")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        cwd = os.getcwd()
+        os.chdir(tmp)
+        try:
+            if args.processes:
+                total, errors = run_processes(args.processes, args.iterations)
+            else:
+                total, errors = run(args.threads, args.iterations, args.readers)
+        finally:
+            os.chdir(cwd)
+
+    if errors:
+        print(f"FALLÓ: {len(errors)} actualizaciones perdidas o errores")
+        for error in errors[:20]:
+            print(f"  {error}")
+        sys.exit(1)
+    print(f"OK: {total} registros, sin actualizaciones perdidas")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+import argparse
+import json
+from collections import defaultdict
+from tools.load_test import percentile
+
+
+def load_traces(path):
+    traces = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                traces.append(json.loads(line))
+    return traces
+
+
+def critical_path(trace):
+    """
+    Las llamadas son síncronas y anidadas, así que la duración de cada span
+    la determina su hijo más largo más su tiempo propio. Se baja desde la
+    raíz por el hijo más largo; cada paso incluye su tiempo propio (sin
+    hijos) para ver en qué capa se va realmente el tiempo.
+    """
+    children = defaultdict(list)
+    root = None
+    for span in trace["spans"]:
+        if span["parent"] is None:
+            root = span
+        else:
+            children[span["parent"]].append(span)
+    path = []
+    span = root
+    while span is not None:
+        kids = children.get(span["id"], [])
+        self_ms = span["duration_ms"] - sum(k["duration_ms"] for k in kids)
+        loads = sum(1 for k in _subtree(span, children) if k["method"] == "_load")
+        path.append((span, self_ms, loads))
+        span = max(kids, key=lambda k: k["duration_ms"]) if kids else None
+    return path
+
+
+def _subtree(span, children):
+    stack = [span]
+    while stack:
+        current = stack.pop()
+        yield current
+        stack.extend(children.get(current["id"], []))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resume un archivo de trazas JSONL")
+    parser.add_argument("path")
+    parser.add_argument("--top", type=int, default=5, help="Trazas más lentas a detallar")
+    parser.add_argument("--name", help="Solo trazas con este nombre (p. ej. MenuSystem.view_all_players)")
+    args = parser.parse_args()
+
+    traces = load_traces(args.path)
+    if args.name:
+        traces = [t for t in traces if t["name"] == args.name]
+    if not traces:
+        print("No hay trazas")
+        return
+
+    by_name = defaultdict(list)
+    for trace in traces:
+        by_name[trace["name"]].append(trace)
+    print(f"{'operación':<42}{'n':>6}{'p50 ms':>11}{'p95 ms':>11}{'max ms':>11}{'_load prom.':>13}")
+    for name, group in sorted(by_name.items(), key=lambda item: -max(t["duration_ms"] for t in item[1])):
+        durations = sorted(t["duration_ms"] for t in group)
+        loads = sum(t["load_calls"] for t in group) / len(group)
+        print(f"{name:<42}{len(group):>6}{percentile(durations, 50):>11.2f}{percentile(durations, 95):>11.2f}"
+              f"{durations[-1]:>11.2f}{loads:>13.1f}")
+
+    for trace in sorted(traces, key=lambda t: -t["duration_ms"])[:args.top]:
+        attrs = " ".join(f"{k}={v}" for k, v in trace.get("attrs", {}).items())
+        print(f"\n{trace['name']} {trace['duration_ms']:.2f} ms | {trace['load_calls']} _load | "
+              f"{len(trace['spans'])} spans | {trace['trace_id']} {attrs}".rstrip())
+        for depth, (span, self_ms, loads) in enumerate(critical_path(trace)):
+            error = f" [{span['error']}]" if span["error"] else ""
+            print(f"{'  ' * (depth + 1)}{span['target']}.{span['method']} {span['duration_ms']:.2f} ms "
+                  f"(propio {self_ms:.2f} ms, {loads} _load){error}")
+
+
+if __name__ == "__main__":
+    main()